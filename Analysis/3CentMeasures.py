@@ -1,53 +1,49 @@
-import networkx as nx
+import os
+import sys
+import argparse
+import numpy as np
 
-# Load graph from gpickle
-G = nx.read_gpickle("hewiki_basegraph.gpickle")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph, compute, add_backend_argument
 
-# Ensure directed
-if not G.is_directed():
-    G = G.to_directed()
+GRAPH_PATH = "hewiki_basegraph.gpickle"
+BACKEND = "networkx"
+TOP_K = 200
 
-def get_title(node):
-    return G.nodes[node].get("title", str(node))
+ap = argparse.ArgumentParser(description="PageRank, eigenvector and Katz centrality")
+ap.add_argument("--graph", default=GRAPH_PATH, help="gpickle, GraphML or CSR bundle")
+add_backend_argument(ap, ("pagerank", "eigenvector", "katz"), BACKEND)
+args = ap.parse_args()
 
+# Load graph (file name matched case-insensitively)
+src = open_graph(args.graph).load(args.backend)
 print("loaded")
+titles = src.titles()
+
+
+def report(name, values, titles):
+    top = np.argsort(-values, kind="stable")[:TOP_K]
+    print(f"\n=== {name} ===")
+    print("Average:", values.mean())
+    print(f"\nTop {TOP_K} nodes:\n")
+    for i, v in enumerate(top, start=1):
+        print(f"{i}. {titles[v]} ({v}) — {values[v]}")
+
 
 # ------------------------
 # PageRank
 # ------------------------
-pagerank = nx.pagerank(G, alpha=0.85, max_iter=1000, tol=1e-06)
-avg_pr = sum(pagerank.values()) / len(pagerank)
-top200_pr = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)[:200]
-
-print("\n=== PageRank ===")
-print("Average:", avg_pr)
-print("\nTop 200 nodes:\n")
-for i, (node, val) in enumerate(top200_pr, start=1):
-    print(f"{i}. {get_title(node)} ({node}) — {val}")
+pagerank = compute("pagerank", args.backend, src, alpha=0.85, max_iter=1000, tol=1e-06)
+report("PageRank", pagerank, titles)
 
 # ------------------------
 # Eigenvector Centrality
 # ------------------------
-eigen = nx.eigenvector_centrality(G, max_iter=1000, tol=1e-06)
-avg_eigen = sum(eigen.values()) / len(eigen)
-top200_eigen = sorted(eigen.items(), key=lambda x: x[1], reverse=True)[:200]
-
-print("=== Eigenvector Centrality ===")
-print("Average:", avg_eigen)
-print("\nTop 200 nodes:\n")
-for i, (node, val) in enumerate(top200_eigen, start=1):
-    print(f"{i}. {get_title(node)} ({node}) — {val}")
+eigen = compute("eigenvector", args.backend, src, max_iter=1000, tol=1e-06)
+report("Eigenvector Centrality", eigen, titles)
 
 # ------------------------
 # Katz Centrality
 # ------------------------
-katz = nx.katz_centrality(G, alpha=0.1, beta=1.0, max_iter=1000, tol=1e-06)
-avg_katz = sum(katz.values()) / len(katz)
-top200_katz = sorted(katz.items(), key=lambda x: x[1], reverse=True)[:200]
-
-print("\n=== Katz Centrality ===")
-print("Average:", avg_katz)
-print("\nTop 200 nodes:\n")
-for i, (node, val) in enumerate(top200_katz, start=1):
-    print(f"{i}. {get_title(node)} ({node}) — {val}")
-    
+katz = compute("katz", args.backend, src, alpha=0.1, beta=1.0, max_iter=1000, tol=1e-06)
+report("Katz Centrality", katz, titles)
@@ -1,113 +1,64 @@
-import networkx as nx
+import os
+import sys
 import time
-import heapq
-from collections import defaultdict
-from networkx.algorithms.centrality.betweenness import _single_source_shortest_path_basic
+import argparse
+import numpy as np
 
-GRAPH_PATH = "hewiki_basegraph.gpickle"
-TIME_LIMIT = 60 * 60      # שעה
-REPORT_EVERY = 5 * 60
-TOP_K = 50
-
-print("Loading graph...")
-G = nx.read_gpickle(GRAPH_PATH)
-nodes = list(G.nodes())
-N = len(nodes)
-
-bet = defaultdict(float)
-
-start = time.time()
-last_report = start
-done = 0
-
-print("\n=== Starting exact time-bounded betweenness ===")
-
-for s in nodes:
-    S, P, sigma, _ = _single_source_shortest_path_basic(G, s)
-    delta = dict.fromkeys(S, 0.0)
-
-    while S:
-        w = S.pop()
-        for v in P[w]:
-            delta_v = (sigma[v] / sigma[w]) * (1 + delta[w])
-            delta[v] += delta_v
-        if w != s:
-            bet[w] += delta[w]
-
-    done += 1
-    now = time.time()
-
-    if now - last_report >= REPORT_EVERY:
-        pct = 100 * (now - start) / TIME_LIMIT
-        print(f"[Betweenness] ~{pct:.1f}% time used | sources: {done}")
-        last_report = now
-
-    if now - start >= TIME_LIMIT:
-        break
-
-# Top 50
-top = heapq.nlargest(TOP_K, bet.items(), key=lambda x: x[1])
-
-print("\nTop 50 Betweenness:\n")
-for i, (v, score) in enumerate(top, 1):
-    title = G.nodes[v].get("title", str(v))
-    print(f"{i}. {title} — {score}")
-
-print("\nSources processed:", done)
-
-
-
-
-
-
-import networkx as nx
-import time
-import heapq
-from collections import defaultdict
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph, compute, add_backend_argument, add_kcore_argument
+from Common.Instrument import Monitor
 
 GRAPH_PATH = "hewiki_basegraph.gpickle"
+BACKEND = "networkx"
 TIME_LIMIT = 60 * 60      # שעה
 REPORT_EVERY = 5 * 60
+SOURCE_BATCH = 16         # sources per backend call (time limit checked between batches)
 TOP_K = 50
+METRICS_LOG = "BetweennessXHarmonic.metrics.jsonl"
+
+ap = argparse.ArgumentParser(description="Time-bounded exact betweenness and harmonic closeness")
+ap.add_argument("--graph", default=GRAPH_PATH, help="gpickle, GraphML or CSR bundle")
+add_backend_argument(ap, ("betweenness", "harmonic"), BACKEND)
+add_kcore_argument(ap)
+ap.add_argument("--time-limit", type=float, default=TIME_LIMIT, help="seconds per measure")
+args = ap.parse_args()
 
 print("Loading graph...")
-G = nx.read_gpickle(GRAPH_PATH)
-nodes = list(G.nodes())
-N = len(nodes)
+src = open_graph(args.graph, kcore=args.kcore, core_mode=args.core_mode)
+N = src.n
+
+
+def time_bounded(metric, job, prom_path):
+    """Accumulate `metric` over source batches until every source is done or the time limit hits."""
+    mon = Monitor(job, jsonl_path=METRICS_LOG, prom_path=prom_path, interval=REPORT_EVERY)
+    total = np.zeros(N)
+    deadline = time.time() + args.time_limit
+    done = 0
+    with mon.stage(metric, total=N, unit="sources", deadline=deadline) as st:
+        while done < N and time.time() < deadline:
+            batch = np.arange(done, min(done + SOURCE_BATCH, N))
+            total += compute(metric, args.backend, src, sources=batch)
+            done += len(batch)
+            st.count("sources", len(batch))
+    mon.close()
+    return total, done
+
+
+def report(name, values, done):
+    titles = src.titles()
+    print(f"\nTop {TOP_K} {name}:\n")
+    for i, v in enumerate(np.argsort(-values, kind="stable")[:TOP_K], 1):
+        print(f"{i}. {titles[v]} — {values[v]}")
+    print("\nSources processed:", done)
+    if done < N:
+        print("Time limit reached before all sources; Analysis/CentralityJobs.py runs this "
+              "as a resumable, sharded job.")
 
-harmonic = defaultdict(float)
 
-start = time.time()
-last_report = start
-done = 0
+print("\n=== Starting exact time-bounded betweenness ===")
+bet, done = time_bounded("betweenness", "Betweenness", "Betweenness.prom")
+report("Betweenness", bet, done)
 
 print("\n=== Starting exact time-bounded harmonic closeness ===")
-
-for s in nodes:
-    # exact shortest paths from s
-    lengths = nx.single_source_shortest_path_length(G, s)
-
-    for t, d in lengths.items():
-        if d > 0:
-            harmonic[s] += 1.0 / d
-
-    done += 1
-    now = time.time()
-
-    if now - last_report >= REPORT_EVERY:
-        pct = 100 * (now - start) / TIME_LIMIT
-        print(f"[Harmonic] ~{pct:.1f}% time used | sources: {done}")
-        last_report = now
-
-    if now - start >= TIME_LIMIT:
-        break
-
-# Top 50
-top = heapq.nlargest(TOP_K, harmonic.items(), key=lambda x: x[1])
-
-print("\nTop 50 Harmonic Closeness:\n")
-for i, (v, score) in enumerate(top, 1):
-    title = G.nodes[v].get("title", str(v))
-    print(f"{i}. {title} — {score}")
-
-print("\nSources processed:", done)
+harmonic, done = time_bounded("harmonic", "Harmonic", "Harmonic.prom")
+report("Harmonic Closeness", harmonic, done)
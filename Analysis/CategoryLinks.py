@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Category-level link graph via sparse matrix products.
+
+With C the (articles × categories) membership matrix and A the article
+adjacency, the category → category link counts are one product:
+
+    M = Cᵀ · A · C        M[i, j] = links from articles in i to articles in j
+
+For the hierarchy (Build/CategoryTreeBuild.py), the tree is first closed
+upwards one level at a time, H* = I ∨ H ∨ H² ∨ …, where H is the
+child → parent matrix; each level is one sparse product and only entries not
+seen before are carried on, so cycles in the category graph terminate. The
+article memberships C* = C ∨ C·H* are made ROW_BLOCK articles at a time:
+a first pass only counts articles per category (and reports the size of C*
+before anything big is built), the second keeps just the categories with at
+least MIN_ROLLUP_ARTICLES articles, so the full C* never exists. Then
+
+    M* = Σ_b C*_bᵀ · A_b · C*     links between everything under i and everything under j
+
+is summed over the same row blocks b. Each article link is counted once per category pair,
+however many paths connect an article to an ancestor.
+
+Outputs (in the bundle): category_links.npz, category_links_rollup.npz
+(scipy.sparse, ids index cat_names) and a printed summary.
+
+Run:
+  python Analysis/CategoryLinks.py --graph Hewiki_CSR
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from scipy import sparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, load_categories, load_category_tree
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+MAX_DEPTH = 50                 # levels of the category tree to roll up
+MIN_ROLLUP_ARTICLES = 100      # keep rolled-up categories with at least this many articles
+ROW_BLOCK = 100_000            # articles per block of the rolled-up membership matrix
+TOP_K = 30
+# =========================================
+
+
+def membership_matrix(n, cat_indptr, cat_indices, n_cats):
+    data = np.ones(len(cat_indices), dtype=np.int64)
+    return sparse.csr_matrix((data, np.asarray(cat_indices), np.asarray(cat_indptr)), shape=(n, n_cats))
+
+
+def parent_matrix(tree_indptr, tree_indices, n_cats):
+    k = len(tree_indptr) - 1
+    H = sparse.csr_matrix((np.ones(len(tree_indices), dtype=np.int64), tree_indices, tree_indptr),
+                          shape=(k, k))
+    # article categories may have been added after the tree was built
+    H.resize((n_cats, n_cats))
+    return H
+
+
+def link_counts(A, C):
+    return (C.T @ A @ C).tocsr()
+
+
+def ancestor_closure(H, max_depth=MAX_DEPTH):
+    """Boolean I ∨ H ∨ H² ∨ … over categories, computed level by level."""
+    closure = sparse.identity(H.shape[0], dtype=np.int8, format="csr")
+    frontier = closure
+    for depth in range(max_depth):
+        step = (frontier @ H).astype(bool).astype(np.int8)
+        # keep only (category, ancestor) pairs not reached before
+        new = step - step.multiply(closure)
+        new.eliminate_zeros()
+        if new.nnz == 0:
+            break
+        closure = closure + new
+        frontier = new
+        print(f"  depth {depth + 1}: +{new.nnz:,} ancestor pairs")
+    return closure.tocsr()
+
+
+def rolled_up_blocks(C, Hs, block=ROW_BLOCK):
+    """Row blocks of C·Hs as 0/1 int64 CSR, `block` articles at a time."""
+    for lo in range(0, C.shape[0], block):
+        yield (C[lo:lo + block] @ Hs).astype(bool).astype(np.int64).tocsr()
+
+
+def top_pairs(M, names, k=TOP_K, label=""):
+    coo = (M - sparse.diags(M.diagonal(), dtype=M.dtype)).tocoo()
+    coo.eliminate_zeros()
+    if coo.nnz == 0:
+        return
+    best = np.argsort(-coo.data)[:k]
+    print(f"\nTop {k} category pairs by links{label}:\n")
+    for i, j in enumerate(best, start=1):
+        print(f"{i}. {names[coo.row[j]]} → {names[coo.col[j]]} — {int(coo.data[j]):,}")
+
+
+def cohesion(M, out, sizes, names, min_articles=MIN_ROLLUP_ARTICLES, k=TOP_K, label=""):
+    """Share of a category's outgoing links (out = links leaving its articles) that stay inside it."""
+    inner = M.diagonal()
+    ok = (out > 0) & (sizes >= min_articles)
+    share = np.zeros(len(out))
+    share[ok] = inner[ok] / out[ok]
+    best = np.argsort(-share)[:k]
+    print(f"\nMost self-contained categories{label} (≥{min_articles} articles):\n")
+    for i, c in enumerate(best, start=1):
+        if share[c] == 0:
+            break
+        print(f"{i}. {names[c]} — {share[c]:.1%} of {int(out[c]):,} links stay inside ({int(sizes[c]):,} articles)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Category-level link counts via Cᵀ·A·C")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--max-depth", type=int, default=MAX_DEPTH)
+    ap.add_argument("--min-articles", type=int, default=MIN_ROLLUP_ARTICLES)
+    ap.add_argument("--row-block", type=int, default=ROW_BLOCK, help="articles per roll-up block")
+    args = ap.parse_args()
+
+    G = load_graph(args.graph)
+    cats = load_categories(args.graph)
+    if cats is None:
+        sys.exit(f"{args.graph} has no categories; build it with Build/CsrBuild.py")
+    cat_indptr, cat_indices, names = cats
+    n_cats = len(names)
+    print(f"Articles: {G.n:,} | links: {G.m:,} | categories: {n_cats:,}")
+
+    A = G.to_scipy(dtype=np.int64)
+    C = membership_matrix(G.n, cat_indptr, cat_indices, n_cats)
+
+    t0 = time.time()
+    M = link_counts(A, C)
+    sparse.save_npz(os.path.join(args.graph, "category_links.npz"), M)
+    sizes = np.asarray(C.sum(axis=0)).ravel()
+    print(f"\nDirect category links: {M.nnz:,} non-zero pairs ({time.time() - t0:.1f}s)")
+    top_pairs(M, names)
+    out_deg = G.out_degree().astype(np.int64)
+    cohesion(M, C.T @ out_deg, sizes, names, args.min_articles)
+
+    tree = load_category_tree(args.graph)
+    if tree is None:
+        print("\nNo category tree in the bundle (Build/CategoryTreeBuild.py); skipping roll-up.")
+        return
+
+    t0 = time.time()
+    print("\nRolling memberships up the category tree…")
+    Hs = ancestor_closure(parent_matrix(*tree, n_cats), args.max_depth)
+    sizes_all = np.zeros(n_cats, dtype=np.int64)
+    nnz = 0
+    for Cb in rolled_up_blocks(C, Hs, args.row_block):
+        sizes_all += np.asarray(Cb.sum(axis=0)).ravel()
+        nnz += Cb.nnz
+    keep = np.nonzero(sizes_all >= args.min_articles)[0]
+    kept_nnz = int(sizes_all[keep].sum())
+    print(f"Closure: {nnz:,} memberships; {kept_nnz:,} over {len(keep):,} categories "
+          f"with ≥{args.min_articles} articles (~{kept_nnz * 12 / 2**20:,.0f} MB as CSR)")
+
+    Cs = sparse.vstack(list(rolled_up_blocks(C, Hs[:, keep], args.row_block)), format="csr")
+    Mr = sparse.csr_matrix((len(keep), len(keep)), dtype=np.int64)
+    for lo in range(0, G.n, args.row_block):
+        # A_b · C* is the large intermediate; only one block of it exists at a time
+        Mr = Mr + (Cs[lo:lo + args.row_block].T @ (A[lo:lo + args.row_block] @ Cs)).tocsr()
+    # store in full category ids
+    P = sparse.csr_matrix((np.ones(len(keep), dtype=np.int64), (np.arange(len(keep)), keep)),
+                          shape=(len(keep), n_cats))
+    sparse.save_npz(os.path.join(args.graph, "category_links_rollup.npz"), (P.T @ Mr @ P).tocsr())
+    print(f"Rolled-up category links: {Mr.nnz:,} non-zero pairs ({time.time() - t0:.1f}s)")
+
+    kept_names = [names[int(c)] for c in keep]
+    top_pairs(Mr, kept_names, label=" (rolled up)")
+    cohesion(Mr, Cs.T @ out_deg, sizes_all[keep], kept_names, args.min_articles, label=" (rolled up)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Exact betweenness / harmonic closeness / distance sampling as sharded,
+resumable jobs (Common/Jobs.py), for graphs where one sitting is not enough.
+
+BetweennessXHarmonic.py stops at its time limit and keeps its sums in memory;
+here the sources are split into deterministic shards, every shard checkpoints
+its partial sums to the job directory, a new run resumes where the last one
+stopped, and shards run on different hosts are merged at the end.
+
+Commands:
+  create  fix the graph, metrics, shard count and source lists in a job dir
+  run     work on shards (all, --shards 0-15, or every --hosts-th shard
+          starting at --host-index) until done or --time-limit; --graph
+          points at the graph when this host keeps it at another path
+  status  progress per metric
+  merge   combine the shards of one or more copies of the job dir; prints the
+          top articles / distance summary, and with --write stores betweenness
+          and harmonic in the bundle's metric store (or as .npy in the job dir)
+
+Run:
+  python Analysis/CentralityJobs.py create --job bh_job --graph Hewiki_CSR --shards 64
+  python Analysis/CentralityJobs.py run --job bh_job --hosts 4 --host-index 0 --time-limit 36000
+  python Analysis/CentralityJobs.py merge --job bh_job --from /mnt/host1/bh_job /mnt/host2/bh_job --write
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import add_backend_argument
+from Common.GraphStore import write_metric
+from Common.Instrument import Monitor
+from Common.Jobs import (METRICS, CHECKPOINT_EVERY, JobError, create_job, load_job, open_job_graph,
+                         parse_shards, shard_sources, checkpoint_path, load_checkpoint, run_shard, merge)
+
+# ================= CONFIG =================
+JOB_DIR = "centrality_job"
+GRAPH_PATH = "Hewiki_CSR"
+BACKEND = "native"
+SHARDS = 64
+SEED = 0
+DISTANCE_SAMPLES = 25000
+TOP_K = 50
+METRICS_LOG = "CentralityJobs.metrics.jsonl"
+PROM_PATH = "CentralityJobs.prom"
+REPORT_EVERY = 5 * 60
+# =========================================
+
+
+def cmd_create(args):
+    job = create_job(args.job, args.graph, args.metrics, args.shards, args.seed,
+                     args.samples or None, args.backend)
+    print(f"Job {job['id']} in {args.job}: {job['nodes']:,} nodes, {', '.join(job['metrics'])}, "
+          f"{job['shards']} shards")
+
+
+def cmd_run(args):
+    job = load_job(args.job)
+    if args.shards:
+        shards = parse_shards(args.shards, job["shards"])
+    else:
+        shards = [k for k in range(job["shards"]) if k % args.hosts == args.host_index]
+    deadline = time.time() + args.time_limit if args.time_limit else None
+    src = open_job_graph(job, args.graph)
+
+    mon = Monitor(f"CentralityJobs-{job['id']}", jsonl_path=METRICS_LOG, prom_path=PROM_PATH,
+                  interval=REPORT_EVERY)
+    for metric in job["metrics"]:
+        todo = sum(len(shard_sources(args.job, job, metric, k)) for k in shards)
+        with mon.stage(metric, total=todo, unit="sources", deadline=deadline) as st:
+            for k in shards:
+                if deadline is not None and time.time() >= deadline:
+                    break
+                result = run_shard(args.job, job, src, metric, k, args.backend, stage=st,
+                                   deadline=deadline, checkpoint_every=args.checkpoint_every,
+                                   steal_locks=args.steal_locks)
+                if result is None:
+                    print(f"  {metric} shard {k}: locked by another process, skipped")
+    mon.close()
+    if deadline is not None and time.time() >= deadline:
+        print("Time limit reached; checkpoints saved, run again to continue.")
+
+
+def cmd_status(args):
+    job = load_job(args.job)
+    print(f"Job {job['id']}: {job['graph']} ({job['nodes']:,} nodes), {job['shards']} shards")
+    for metric in job["metrics"]:
+        done = total = complete = 0
+        for k in range(job["shards"]):
+            sources = np.asarray(shard_sources(args.job, job, metric, k))
+            state = load_checkpoint(checkpoint_path(args.job, metric, k), sources)
+            total += len(sources)
+            if state:
+                done += state[1]
+                complete += state[1] == len(sources)
+        print(f"  {metric:<20} {done:>12,} / {total:,} sources ({done / max(total, 1):.1%}), "
+              f"{complete}/{job['shards']} shards complete")
+
+
+def report_top(name, values, titles, k=TOP_K):
+    print(f"\nTop {k} {name}:\n")
+    for i, v in enumerate(np.argsort(-values, kind="stable")[:k], 1):
+        print(f"{i}. {titles[v]} — {values[v]}")
+
+
+def report_distances(hist):
+    d = np.arange(len(hist))
+    count = int(hist.sum())
+    if not count:
+        return
+    mean = (d * hist).sum() / count
+    print(f"\nSampled pairs: {count:,} | average distance ≈ {mean:.4f} | longest seen: {len(hist) - 1}")
+    for dist, c in enumerate(hist):
+        if c:
+            print(f"  d={dist}: {int(c):,} ({c / count:.2%})")
+
+
+def cmd_merge(args):
+    dirs = [args.job] + (args.from_dirs or [])
+    job = load_job(args.job)
+    src = open_job_graph(job, args.graph)
+    titles = src.titles()
+    for metric in job["metrics"]:
+        accum, done, total, complete = merge(dirs, metric)
+        exact = done == total
+        print(f"\n=== {metric}: {done:,} / {total:,} sources, {complete}/{job['shards']} shards "
+              f"complete{' (exact)' if exact else ''} ===")
+        if accum is None:
+            continue
+        if metric == "distance_histogram":
+            report_distances(accum)
+            if args.write:
+                np.save(os.path.join(args.job, "distance_histogram.npy"), accum)
+            continue
+        if metric == "betweenness" and not exact and args.extrapolate:
+            # shards are uniform samples of the sources, so done/total scales the sum
+            accum = accum * (total / done)
+            print("(partial betweenness scaled up by sources total/done)")
+        report_top(metric.capitalize(), accum, titles)
+        if args.write:
+            if src.kind == "bundle":
+                write_metric(src.path, metric if exact else f"{metric}_partial", accum)
+            else:
+                np.save(os.path.join(args.job, f"{metric}.npy"), accum)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sharded, checkpointed betweenness / harmonic / distance jobs")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("create", help="define a job")
+    p.add_argument("--job", default=JOB_DIR)
+    p.add_argument("--graph", default=GRAPH_PATH, help="gpickle, GraphML or CSR bundle")
+    p.add_argument("--metrics", nargs="*", choices=METRICS, default=list(METRICS))
+    p.add_argument("--shards", type=int, default=SHARDS)
+    p.add_argument("--seed", type=int, default=SEED)
+    p.add_argument("--samples", type=int, default=DISTANCE_SAMPLES,
+                   help="distance_histogram sources (0 = every node of the component)")
+    add_backend_argument(p, ("largest_component",), BACKEND)
+
+    p = sub.add_parser("run", help="work on shards")
+    p.add_argument("--job", default=JOB_DIR)
+    p.add_argument("--shards", help="e.g. 0-7,12 (default: all, or this host's share)")
+    p.add_argument("--hosts", type=int, default=1)
+    p.add_argument("--host-index", type=int, default=0)
+    p.add_argument("--time-limit", type=float, help="seconds for this run")
+    p.add_argument("--checkpoint-every", type=float, default=CHECKPOINT_EVERY)
+    p.add_argument("--steal-locks", action="store_true", help="ignore locks left by a crashed run")
+    p.add_argument("--graph", help="the job's graph at another path (e.g. on this host)")
+    add_backend_argument(p, ("betweenness", "harmonic", "distance_histogram"), BACKEND)
+
+    p = sub.add_parser("status", help="progress per metric")
+    p.add_argument("--job", default=JOB_DIR)
+
+    p = sub.add_parser("merge", help="combine shards from one or more hosts")
+    p.add_argument("--job", default=JOB_DIR)
+    p.add_argument("--from", dest="from_dirs", nargs="*", help="other copies of the job directory")
+    p.add_argument("--write", action="store_true", help="store the merged results")
+    p.add_argument("--extrapolate", action="store_true", help="scale partial betweenness to all sources")
+    p.add_argument("--graph", help="the job's graph at another path (e.g. on this host)")
+
+    args = ap.parse_args()
+    try:
+        {"create": cmd_create, "run": cmd_run, "status": cmd_status, "merge": cmd_merge}[args.command](args)
+    except JobError as e:
+        sys.exit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
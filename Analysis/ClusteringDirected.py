@@ -1,42 +1,27 @@
-from igraph import Graph
-import numpy as np
+import os
+import sys
+import argparse
 
-g = Graph.Read_GraphML("hewiki_BaseGraph.graphml")
-g.to_directed()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph, compute, add_backend_argument, add_kcore_argument, backends_for
 
-n = g.vcount()
-local_C = np.zeros(n, dtype=float)
+GRAPH_FILE = "hewiki_BaseGraph.graphml"
+BACKEND = "numba" if "numba" in backends_for("clustering_directed") else "native"
 
-sum_num = 0   # sum of numerators (closed ordered pairs over all nodes)
-sum_den = 0   # sum of denominators (k*(k-1) over all nodes)
+ap = argparse.ArgumentParser(description="Directed clustering (in- and out-neighbours together)")
+ap.add_argument("--graph", default=GRAPH_FILE, help="GraphML, gpickle or CSR bundle")
+add_backend_argument(ap, ("clustering_directed",), BACKEND)
+add_kcore_argument(ap)
+args = ap.parse_args()
 
-for v in range(n):
-    # neighbors in/out (as python sets for fast intersection)
-    nin = set(g.neighbors(v, mode="IN"))
-    nout = set(g.neighbors(v, mode="OUT"))
-    neigh = nin.union(nout)
-    k = len(neigh)
-    if k < 2:
-        local_C[v] = 0.0
-        continue
+src = open_graph(args.graph, kcore=args.kcore, core_mode=args.core_mode)
 
-    # numerator: count ordered neighbor pairs (u->w) where both u and w are neighbors of v
-    triangles = 0
-    for u in neigh:
-        # outgoing neighbors of u that are among v's neighbors
-        out_u = set(g.neighbors(u, mode="OUT"))
-        triangles += len(neigh.intersection(out_u))
-
-    denom = k * (k - 1)   # ordered pairs among neighbors
-    local = triangles / denom if denom > 0 else 0.0
-    local_C[v] = local
-
-    sum_num += triangles
-    sum_den += denom
+# local C_v = closed ordered neighbour pairs (u -> w) / k(k-1), k = |in ∪ out|;
+# global = ratio of the sums over all nodes (see Common/Backends.py)
+local_C, global_transitivity = compute("clustering_directed", args.backend, src)
 
 # results
-avg_local = float(np.mean(local_C))
-global_transitivity = (sum_num / sum_den) if sum_den > 0 else 0.0
+avg_local = float(local_C.mean())
 
 print("Global (directed) transitivity (ratio of sums):", global_transitivity)
 print("Average local directed clustering (mean of C_i):", avg_local)
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Community detection over the CSR bundle (Build/CsrBuild.py).
+
+networkx's Louvain walks the dict-of-dict adjacency one node at a time and is
+impractical on the full article graph. Both methods here work on the
+symmetrized CSR with whole-array operations:
+
+- label propagation: every node takes the most frequent label among its
+  neighbors. Row chunks are processed in parallel threads (NumPy releases the
+  GIL while sorting); a random half of the nodes update per sweep, which stops
+  the two-colour oscillation of fully synchronous LPA.
+- Louvain: modularity gains for all (node, neighbouring community) pairs are
+  computed at once from the sparse node×community weight matrix A·P; a random
+  batch of the improving moves is applied per sweep. After each level,
+  communities are split into their connected components (Leiden's
+  connectivity guarantee) and the graph is aggregated as Pᵀ·A·P.
+
+Community ids are written to the metric store ("community_lpa",
+"community_louvain") and compared against the dump categories through a
+sparse community × category contingency table.
+
+Run:
+  python Analysis/Communities.py --graph Hewiki_CSR --method louvain
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, load_categories, write_metric
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+WORKERS = os.cpu_count() or 1
+MAX_SWEEPS = 50
+MOVE_FRACTION = 0.5       # share of improving nodes allowed to move per sweep
+MIN_CHANGED = 1e-4        # stop sweeping when fewer than this share of nodes move
+SEED = 0
+TOP_COMMUNITIES = 30
+# =========================================
+
+
+def compact(labels):
+    """Relabel to 0..c-1 (by first appearance in sorted order)."""
+    _, out = np.unique(labels, return_inverse=True)
+    return out.astype(np.int64)
+
+
+# ---------- label propagation ----------
+
+def _majority_labels(indptr, indices, labels, lo, hi, rng_seed):
+    """Most frequent neighbor label for rows lo..hi (ties broken at random)."""
+    a, b = indptr[lo], indptr[hi]
+    rows = np.repeat(np.arange(lo, hi, dtype=np.int64), np.diff(indptr[lo:hi + 1]))
+    nl = labels[indices[a:b]]
+    n = len(labels)
+    key, cnt = np.unique(rows * n + nl, return_counts=True)
+    krow = key // n
+    jitter = np.random.default_rng(rng_seed).random(len(cnt))
+    order = np.lexsort((cnt + 0.5 * jitter, krow))
+    last = np.r_[krow[order][1:] != krow[order][:-1], True]
+    best = order[last]
+    return krow[best], key[best] - krow[best] * n
+
+
+def label_propagation(U, max_sweeps=MAX_SWEEPS, workers=WORKERS, seed=SEED):
+    """U is the symmetrized graph (CSRGraph.symmetrized())."""
+    n = U.n
+    indptr, indices = U.indptr, U.indices
+    labels = np.arange(n, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    # split rows into chunks of roughly equal edge count
+    n_chunks = max(1, workers * 4)
+    bounds = np.searchsorted(indptr, np.linspace(0, indptr[-1], n_chunks + 1))
+    bounds[0], bounds[-1] = 0, n
+    bounds = np.unique(bounds)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for sweep in range(max_sweeps):
+            t0 = time.time()
+            seeds = rng.integers(0, 2**63 - 1, size=len(bounds) - 1)
+            results = pool.map(lambda i: _majority_labels(indptr, indices, labels,
+                                                          bounds[i], bounds[i + 1], seeds[i]),
+                               range(len(bounds) - 1))
+            new = labels.copy()
+            for rows, best in results:
+                new[rows] = best
+            active = rng.random(n) < MOVE_FRACTION
+            changed = active & (new != labels)
+            labels[changed] = new[changed]
+            n_changed = int(changed.sum())
+            print(f"[LPA] sweep {sweep + 1}: {n_changed:,} changed ({time.time() - t0:.1f}s)")
+            if n_changed <= MIN_CHANGED * n:
+                break
+
+    return compact(labels)
+
+
+# ---------- Louvain / Leiden-style ----------
+
+def modularity(A, comm):
+    k = np.asarray(A.sum(axis=1)).ravel()
+    m2 = k.sum()
+    P = sparse.csr_matrix((np.ones(len(comm)), (np.arange(len(comm)), comm)))
+    internal = (P.T @ A @ P).diagonal()
+    tot = np.bincount(comm, weights=k)
+    return float(internal.sum() / m2 - np.square(tot / m2).sum())
+
+
+def _quality(A, rows, comm, k, m2):
+    internal = A.data[comm[rows] == comm[A.indices]].sum()
+    tot = np.bincount(comm, weights=k)
+    return internal / m2 - np.square(tot / m2).sum()
+
+
+def _local_moving(A, k, m2, rng, max_sweeps):
+    n = A.shape[0]
+    comm = np.arange(n, dtype=np.int64)
+    self_w = A.diagonal()
+    rows = np.repeat(np.arange(n), np.diff(A.indptr))
+    q = _quality(A, rows, comm, k, m2)
+    fraction = MOVE_FRACTION
+    moved_any = False
+
+    for sweep in range(max_sweeps):
+        tot = np.bincount(comm, weights=k, minlength=n)
+
+        # w[i, c] = weight from i into community c
+        W = sparse.csr_matrix((A.data, (rows, comm[A.indices])), shape=(n, n))
+        W.sum_duplicates()
+        wrow = np.repeat(np.arange(n), np.diff(W.indptr))
+        wcol = W.indices
+
+        own = comm[wrow] == wcol
+        gain = W.data - k[wrow] * tot[wcol] / m2
+        # staying: i's own community without i itself
+        own_w = np.zeros(n)
+        own_w[wrow[own]] = W.data[own]
+        stay = (own_w - self_w) - k * (tot[comm] - k) / m2
+        gain[own] = -np.inf
+
+        # best candidate per row
+        order = np.lexsort((gain, wrow))
+        last = np.r_[wrow[order][1:] != wrow[order][:-1], True]
+        best = order[last]
+        cand_rows, cand_comm, cand_gain = wrow[best], wcol[best], gain[best]
+
+        improving = cand_gain > stay[cand_rows] + 1e-12
+        cand_rows, cand_comm = cand_rows[improving], cand_comm[improving]
+        take = rng.random(len(cand_rows)) < fraction
+        cand_rows, cand_comm = cand_rows[take], cand_comm[take]
+
+        if len(cand_rows) <= MIN_CHANGED * n:
+            break
+
+        # gains assume the rest of the graph stays put; a batch of
+        # simultaneous moves can still lose modularity, so verify it
+        trial = comm.copy()
+        trial[cand_rows] = cand_comm
+        q_trial = _quality(A, rows, trial, k, m2)
+        if q_trial <= q:
+            fraction /= 2
+            if fraction * improving.sum() < 1:
+                break
+            continue
+        comm, q = trial, q_trial
+        moved_any = True
+
+    return comm, moved_any
+
+
+def _split_disconnected(A, comm):
+    """Leiden refinement light: each community becomes its connected pieces."""
+    coo = A.tocoo()
+    keep = comm[coo.row] == comm[coo.col]
+    inner = sparse.csr_matrix((np.ones(int(keep.sum())), (coo.row[keep], coo.col[keep])), shape=A.shape)
+    _, pieces = connected_components(inner, directed=False)
+    return compact(pieces)
+
+
+def louvain(U, max_sweeps=MAX_SWEEPS, seed=SEED, max_levels=20):
+    """U is the symmetrized graph (CSRGraph.symmetrized())."""
+    A = U.to_scipy()
+    k = np.asarray(A.sum(axis=1)).ravel()
+    m2 = k.sum()
+    rng = np.random.default_rng(seed)
+    membership = np.arange(U.n, dtype=np.int64)
+
+    for level in range(max_levels):
+        t0 = time.time()
+        comm, moved = _local_moving(A, k, m2, rng, max_sweeps)
+        if not moved:
+            break
+        comm = _split_disconnected(A, compact(comm))
+        membership = comm[membership]
+
+        P = sparse.csr_matrix((np.ones(len(comm)), (np.arange(len(comm)), comm)))
+        A = (P.T @ A @ P).tocsr()
+        k = np.asarray(A.sum(axis=1)).ravel()
+        # on the aggregated graph every node is its own community
+        q = A.diagonal().sum() / m2 - np.square(k / m2).sum()
+        print(f"[Louvain] level {level + 1}: {A.shape[0]:,} communities | Q={q:.4f} "
+              f"({time.time() - t0:.1f}s)")
+
+    return compact(membership)
+
+
+# ---------- categories ----------
+
+def category_contingency(comm, cat_indptr, cat_indices, n_cats):
+    """Sparse (community × category) count matrix."""
+    nodes = np.repeat(np.arange(len(comm)), np.diff(cat_indptr))
+    data = np.ones(len(nodes), dtype=np.int64)
+    T = sparse.csr_matrix((data, (comm[nodes], cat_indices)), shape=(comm.max() + 1, n_cats))
+    T.sum_duplicates()
+    return T
+
+
+def report_categories(G, comm, top=TOP_COMMUNITIES):
+    cats = load_categories(G.path)
+    if cats is None:
+        print("Bundle has no categories; skipping category comparison.")
+        return
+    cat_indptr, cat_indices, cat_names = cats
+    T = category_contingency(comm, cat_indptr, cat_indices, len(cat_names))
+
+    sizes = np.bincount(comm)
+    cat_sizes = np.asarray(T.sum(axis=0)).ravel()
+    best_count = T.max(axis=1).toarray().ravel()
+    best_cat = np.asarray(T.argmax(axis=1)).ravel()
+
+    # purity: share of a community's nodes carrying its dominant category
+    purity = best_count.sum() / sizes.sum()
+    # coverage: share of a category's members that sit in its best community
+    cover = T.max(axis=0).toarray().ravel()
+    used = cat_sizes > 0
+    coverage = cover[used].sum() / cat_sizes[used].sum()
+
+    print(f"\nCommunities: {len(sizes):,} | Categories: {len(cat_names):,}")
+    print(f"Weighted purity (dominant category share): {purity:.4f}")
+    print(f"Weighted category coverage (best community share): {coverage:.4f}")
+
+    print(f"\nTop {top} communities by size:\n")
+    for i, c in enumerate(np.argsort(-sizes)[:top], start=1):
+        name = cat_names[best_cat[c]] if best_count[c] > 0 else "-"
+        print(f"{i}. community {c} — {sizes[c]:,} nodes | top category: {name} "
+              f"({best_count[c]:,}, {best_count[c] / sizes[c]:.1%})")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Community detection over the CSR bundle")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--method", choices=["lpa", "louvain", "both"], default="both")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+
+    print("Loading graph...")
+    G = load_graph(args.graph)
+    print(f"Nodes: {G.n:,}, Edges: {G.m:,}")
+    U = G.symmetrized()
+
+    if args.method in ("lpa", "both"):
+        start = time.time()
+        comm = label_propagation(U, workers=args.workers, seed=args.seed)
+        print(f"\n=== Label propagation: {comm.max() + 1:,} communities ({time.time() - start:.1f}s) ===")
+        print(f"Modularity: {modularity(U.to_scipy(), comm):.4f}")
+        write_metric(G.path, "community_lpa", comm)
+        report_categories(G, comm)
+
+    if args.method in ("louvain", "both"):
+        start = time.time()
+        comm = louvain(U, seed=args.seed)
+        print(f"\n=== Louvain: {comm.max() + 1:,} communities ({time.time() - start:.1f}s) ===")
+        print(f"Modularity: {modularity(U.to_scipy(), comm):.4f}")
+        write_metric(G.path, "community_louvain", comm)
+        report_categories(G, comm)
+
+
+if __name__ == "__main__":
+    main()
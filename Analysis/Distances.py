@@ -1,83 +1,84 @@
 #!/usr/bin/env python3
-import igraph as ig
-import random
+import os
+import sys
 import math
-import statistics
+import random
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph, compute, add_backend_argument
 
 GRAPH_FILE = "Hewiki_BaseGraph.graphml"
+BACKEND = "igraph"
 
 INITIAL_SAMPLES = 2000
 MAX_SAMPLES = 25000
 TARGET_REL_ERROR = 0.00001
 BATCH_SIZE = 250
 
-print("Loading graph...")
-g = ig.Graph.Read_GraphML(GRAPH_FILE)
-g.to_directed()
+ap = argparse.ArgumentParser(description="Directed distance sampling inside the largest SCC")
+ap.add_argument("--graph", default=GRAPH_FILE, help="GraphML, gpickle or CSR bundle")
+add_backend_argument(ap, ("largest_component", "distance_histogram"), BACKEND)
+args = ap.parse_args()
 
-print(f"Nodes: {g.vcount()}, Edges: {g.ecount()}")
+print("Loading graph...")
+src = open_graph(args.graph)
 
 # -------- TRY STRONG FIRST --------
 print("Extracting largest SCC...")
-sccs = g.connected_components(mode="STRONG")
-largest_scc = sccs[0]
-print(f"Largest SCC size: {len(largest_scc)}")
+component = compute("largest_component", args.backend, src, mode="strong")
+print(f"Nodes: {src.n}")
+print(f"Largest SCC size: {int(component.sum())}")
 
 # -------- IF SCC TOO SMALL → USE WCC --------
-if len(largest_scc) <= 10:
+if component.sum() <= 10:
     print("SCC is trivial; switching to largest WCC (directed distances within it).")
-    wccs = g.connected_components(mode="WEAK")
-    largest_wcc = wccs[0]
-    g = g.subgraph(largest_wcc)
-else:
-    g = g.subgraph(largest_scc)
+    component = compute("largest_component", args.backend, src, mode="weak")
 
-n = g.vcount()
+# shortest paths between two nodes of a component never leave it, so
+# whole-graph distances restricted to the component are the subgraph's
+nodes = np.nonzero(component)[0].tolist()
+n = len(nodes)
 print(f"Working component size: {n}")
 
 # -------- SAMPLING --------
+hist = np.zeros(1, dtype=np.int64)   # hist[d] = sampled pairs at distance d
+
+
 def sample_sources(k):
+    global hist
     k = min(k, n)   # avoid oversampling
-    vertices = random.sample(range(n), k)
-    all_d = []
-    longest = 0
-
-    for v in vertices:
-        drow = g.distances(v)[0]
-        for d in drow:
-            if d != math.inf and d != 0:
-                all_d.append(d)
-                if d > longest:
-                    longest = d
-    return all_d, longest
+    vertices = random.sample(nodes, k)
+    d = compute("distance_histogram", args.backend, src, sources=vertices, within=component)
+    if len(d) > len(hist):
+        hist = np.pad(hist, (0, len(d) - len(hist)))
+    hist[:len(d)] += d
 
-print("Sampling distances...")
 
-samples = []
-best_longest = 0
+print("Sampling distances...")
 
 # initial batch
-d, L = sample_sources(INITIAL_SAMPLES)
-samples.extend(d)
-best_longest = max(best_longest, L)
+sample_sources(INITIAL_SAMPLES)
 
 while True:
-    mean_est = statistics.mean(samples)
-    sd_est = statistics.pstdev(samples)
-    rse = sd_est / math.sqrt(len(samples)) / mean_est
+    k = np.arange(len(hist))
+    count = int(hist.sum())
+    mean_est = (k * hist).sum() / count
+    sd_est = math.sqrt(((k - mean_est) ** 2 * hist).sum() / count)
+    rse = sd_est / math.sqrt(count) / mean_est
+    best_longest = len(hist) - 1
 
-    print(f"Samples={len(samples)}  mean≈{mean_est:.4f}  RSE≈{rse:.3%}  longest={best_longest}")
+    print(f"Samples={count}  mean≈{mean_est:.4f}  RSE≈{rse:.3%}  longest={best_longest}")
 
-    if rse < TARGET_REL_ERROR or len(samples) >= MAX_SAMPLES:
+    if rse < TARGET_REL_ERROR or count >= MAX_SAMPLES:
         break
 
-    d, L = sample_sources(BATCH_SIZE)
-    samples.extend(d)
-    best_longest = max(best_longest, L)
+    sample_sources(BATCH_SIZE)
 
-avg_path_len = statistics.mean(samples)
+avg_path_len = mean_est
 
 print("\n===== FINAL RESULTS (DIRECTED) =====")
 print(f"Average directed shortest-path length (reachable pairs): {avg_path_len}")
 print(f"Estimated directed diameter (longest shortest path found): {best_longest}")
-print(f"Samples used: {len(samples)}")
+print(f"Samples used: {count}")
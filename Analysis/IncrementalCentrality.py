@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Incremental degree / PageRank / Katz maintenance between two snapshots.
+
+3CentMeasures.py recomputes everything from scratch even when two monthly
+dumps differ in a small share of their links. Given the previous bundle (with
+"pagerank" / "katz" in its metric store) and the new one, this script:
+
+1. aligns node ids by title and takes the edge diff as a set difference of
+   sorted (src * n + dst) keys;
+2. updates in/out degree exactly from the diff;
+3. corrects PageRank and Katz by residual pushing from the previous vectors.
+   Both are solutions of x = b + α·Mᵀx (PageRank with M = D⁻¹A and dangling
+   rows left empty, which after normalisation equals networkx's uniform
+   dangling redistribution; Katz with M = A). The residual of the old vector
+   on the new graph is non-zero only around changed edges, and pushing it
+   only visits the nodes it actually reaches.
+
+It reports how many nodes/edges the update touched and, with --check, the
+error against a full recompute. The alphas a bundle's vectors were computed
+with are kept in its meta.json ("centrality"); an update with different
+--pr-alpha / --katz-alpha is refused.
+
+Run:
+  python Analysis/IncrementalCentrality.py --full Hewiki_CSR_2024_01
+  python Analysis/IncrementalCentrality.py --old Hewiki_CSR_2024_01 --new Hewiki_CSR_2024_02 --check
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, read_metric, write_metric, list_metrics, load_meta, update_meta
+from Common.Traversal import expand
+
+# ================= CONFIG =================
+PR_ALPHA = 0.85
+KATZ_ALPHA = 0.1
+KATZ_BETA = 1.0
+TOL = 1e-10               # L1 change per iteration, on the normalised vector
+MAX_ITER = 1000
+DIVERGE_PASSES = 10       # Katz gives up once its change has grown this many iterations in a row
+MAX_PUSH_ROUNDS = 1000
+PUSH_TOL = 1e-4           # residual per node, relative to the right-hand side b
+RHS_SAMPLE = 2000         # nodes used to recover b from a stored (normalised) vector
+TOP_K = 100
+SEED = 0
+# =========================================
+
+
+# ---------- full computations (networkx-compatible normalisation) ----------
+# The stopping rule is stricter than networkx's (L1 < n * tol), which on a
+# graph this size leaves errors far larger than any monthly change.
+
+def pagerank_full(G, alpha=PR_ALPHA, tol=TOL, max_iter=MAX_ITER):
+    n = G.n
+    AT = G.to_scipy().T.tocsr()
+    out = G.out_degree().astype(np.float64)
+    dangling = out == 0
+    inv_out = np.divide(1.0, out, out=np.zeros(n), where=~dangling)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        last = x
+        x = alpha * (AT @ (last * inv_out) + last[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(x - last).sum() < tol:
+            return x / x.sum()
+    raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+
+def katz_full(G, alpha=KATZ_ALPHA, beta=KATZ_BETA, tol=TOL, max_iter=MAX_ITER):
+    """The change per iteration grows by a factor tending to α·ρ, so a series
+    that keeps growing is reported after DIVERGE_PASSES iterations."""
+    n = G.n
+    AT = G.to_scipy().T.tocsr()
+    x = np.zeros(n)
+    change, growing = None, 0
+    for _ in range(max_iter):
+        last = x
+        x = alpha * (AT @ last) + beta
+        delta = np.abs(x - last).sum()
+        if delta < tol * np.abs(x).sum():
+            return x / np.linalg.norm(x)
+        growing = growing + 1 if change is not None and delta > change else 0
+        if growing >= DIVERGE_PASSES or not np.isfinite(delta):
+            rho = delta / change / alpha
+            raise RuntimeError(f"Katz diverges: alpha={alpha} is not below 1 / largest eigenvalue "
+                               f"(≈ 1/{rho:.3g} = {1 / rho:.3g}); pass a smaller --katz-alpha")
+        change = delta
+    raise RuntimeError(f"Katz did not converge in {max_iter} iterations "
+                       f"(alpha={alpha} must be below 1 / largest eigenvalue)")
+
+
+# ---------- diff ----------
+
+def align_nodes(old_titles, new_titles):
+    """old id -> new id (-1 if the title is gone)."""
+    new_index = {t: i for i, t in enumerate(new_titles)}
+    return np.fromiter((new_index.get(t, -1) for t in old_titles), dtype=np.int64, count=len(old_titles))
+
+
+def edge_diff(old, new, old_to_new):
+    """Added / removed edges in new ids, as sorted-key set differences."""
+    n = new.n
+    osrc, odst = old_to_new[old.sources()], old_to_new[np.asarray(old.indices)]
+    alive = (osrc >= 0) & (odst >= 0)
+    old_keys = np.sort(osrc[alive] * n + odst[alive])
+    new_keys = new.sources().astype(np.int64) * n + np.asarray(new.indices, dtype=np.int64)
+    added = np.setdiff1d(new_keys, old_keys, assume_unique=True)
+    removed = np.setdiff1d(old_keys, new_keys, assume_unique=True)
+    # edges that disappeared together with one endpoint still change the other
+    return {
+        "added": (added // n, added % n),
+        "removed": (removed // n, removed % n),
+        "orphaned_targets": odst[(osrc < 0) & (odst >= 0)],
+        "orphaned_sources": osrc[(osrc >= 0) & (odst < 0)],
+        "dropped_with_node": int((~alive).sum()),
+    }
+
+
+def update_degrees(old_in, old_out, new_n, old_to_new, diff):
+    """Exact in/out degrees of the new graph from the old ones plus the diff."""
+    keep = old_to_new >= 0
+    out_deg = np.zeros(new_n, dtype=np.int64)
+    in_deg = np.zeros(new_n, dtype=np.int64)
+    out_deg[old_to_new[keep]] = old_out[keep]
+    in_deg[old_to_new[keep]] = old_in[keep]
+    (a_src, a_dst), (r_src, r_dst) = diff["added"], diff["removed"]
+    out_deg += (np.bincount(a_src, minlength=new_n) - np.bincount(r_src, minlength=new_n)
+                - np.bincount(diff["orphaned_sources"], minlength=new_n))
+    in_deg += (np.bincount(a_dst, minlength=new_n) - np.bincount(r_dst, minlength=new_n)
+               - np.bincount(diff["orphaned_targets"], minlength=new_n))
+    return in_deg, out_deg
+
+
+# ---------- push ----------
+
+def implied_rhs(G, y, w, alpha, sample=RHS_SAMPLE, seed=SEED):
+    """Recover the constant b that a stored vector y solves y = b + α·Mᵀy for."""
+    T = G.transpose()
+    nodes = np.random.default_rng(seed).choice(G.n, size=min(sample, G.n), replace=False)
+    nbrs, owner = expand(T.indptr, T.indices, nodes)
+    inflow = np.zeros(G.n)
+    np.add.at(inflow, owner, w[nbrs] * y[nbrs])
+    return float(np.median(y[nodes] - alpha * inflow[nodes]))
+
+
+def residual_at(G, x, w, alpha, b, nodes):
+    T = G.transpose()
+    nbrs, owner = expand(T.indptr, T.indices, nodes)
+    inflow = np.zeros(G.n)
+    np.add.at(inflow, owner, w[nbrs] * x[nbrs])
+    return b - x[nodes] + alpha * inflow[nodes]
+
+
+def push(G, x, r, w, alpha, eps):
+    """Jacobi-style residual pushing: every round moves the residual of all
+    active nodes into x and onto their out-neighbors, visiting nothing else."""
+    touched = r != 0
+    edges = 0
+    rounds = 0
+    active = np.nonzero(np.abs(r) > eps)[0]
+    while active.size:
+        rounds += 1
+        if rounds > MAX_PUSH_ROUNDS:
+            raise RuntimeError("residual pushing did not converge (alpha too large for this graph?)")
+        mass = r[active]
+        x[active] += mass
+        r[active] = 0.0
+        nbrs, owner = expand(G.indptr, G.indices, active)
+        lens = np.asarray(G.indptr[active + 1] - G.indptr[active], dtype=np.int64)
+        np.add.at(r, nbrs, alpha * w[owner] * np.repeat(mass, lens))
+        edges += len(nbrs)
+        touched[active] = True
+        touched[nbrs] = True
+        cand = np.unique(nbrs)
+        active = cand[np.abs(r[cand]) > eps]
+    return x, {"touched_nodes": int(touched.sum()), "pushed_edges": edges, "rounds": rounds}
+
+
+def incremental_update(old, new, y_old, w_old, w_new, alpha, old_to_new, diff, affected_sources):
+    """Correct a stored solution of x = b + α·Mᵀx for the edge diff."""
+    b = implied_rhs(old, y_old, w_old, alpha)
+
+    x = np.zeros(new.n)
+    keep = old_to_new >= 0
+    x[old_to_new[keep]] = y_old[keep]
+
+    is_new = np.ones(new.n, dtype=bool)
+    is_new[old_to_new[keep]] = False
+    (a_src, a_dst), (r_src, r_dst) = diff["added"], diff["removed"]
+    changed_out, _ = expand(new.indptr, new.indices, affected_sources)
+    affected = np.unique(np.concatenate([
+        a_dst, r_dst, diff["orphaned_targets"], changed_out, np.nonzero(is_new)[0],
+    ]).astype(np.int64))
+
+    r = np.zeros(new.n)
+    r[affected] = residual_at(new, x, w_new, alpha, b, affected)
+    x, stats = push(new, x, r, w_new, alpha, PUSH_TOL * abs(b))
+    stats["affected_nodes"] = len(affected)
+    return x, stats
+
+
+def incremental_pagerank(old, new, pr_old, old_to_new, diff, alpha=PR_ALPHA):
+    out_old = old.out_degree().astype(np.float64)
+    out_new = new.out_degree().astype(np.float64)
+    w_old = np.divide(1.0, out_old, out=np.zeros(old.n), where=out_old > 0)
+    w_new = np.divide(1.0, out_new, out=np.zeros(new.n), where=out_new > 0)
+    # nodes whose out-degree changed send a different share to every target
+    mapped = np.zeros(new.n)
+    keep = old_to_new >= 0
+    mapped[old_to_new[keep]] = out_old[keep]
+    changed = np.nonzero(mapped != out_new)[0]
+    x, stats = incremental_update(old, new, np.asarray(pr_old, dtype=np.float64),
+                                  w_old, w_new, alpha, old_to_new, diff, changed)
+    return x / x.sum(), stats
+
+
+def incremental_katz(old, new, katz_old, old_to_new, diff, alpha=KATZ_ALPHA):
+    w_old, w_new = np.ones(old.n), np.ones(new.n)
+    x, stats = incremental_update(old, new, np.asarray(katz_old, dtype=np.float64),
+                                  w_old, w_new, alpha, old_to_new, diff, np.empty(0, dtype=np.int64))
+    return x / np.linalg.norm(x), stats
+
+
+# ---------- reporting ----------
+
+def compare(name, approx, exact, top_k=TOP_K):
+    l1 = np.abs(approx - exact).sum() / np.abs(exact).sum()
+    rel = np.abs(approx - exact).max() / np.abs(exact).max()
+    top_a = set(np.argsort(-approx)[:top_k].tolist())
+    top_e = set(np.argsort(-exact)[:top_k].tolist())
+    print(f"  {name}: relative L1 error {l1:.3e} | max error (relative to max) {rel:.3e} | "
+          f"top-{top_k} overlap {len(top_a & top_e)}/{top_k}")
+
+
+def centrality_params(pr_alpha, katz_alpha):
+    return {"pagerank_alpha": pr_alpha, "katz_alpha": katz_alpha}
+
+
+def write_full(path, pr_alpha=PR_ALPHA, katz_alpha=KATZ_ALPHA):
+    """Everything is computed before anything is written, so a Katz failure
+    leaves the bundle as it was."""
+    G = load_graph(path)
+    print(f"Nodes: {G.n:,}, Edges: {G.m:,}")
+    t0 = time.time()
+    pr = pagerank_full(G, pr_alpha)
+    katz = katz_full(G, katz_alpha)
+    write_metric(path, "in_degree", G.in_degree())
+    write_metric(path, "out_degree", G.out_degree())
+    write_metric(path, "pagerank", pr)
+    write_metric(path, "katz", katz)
+    update_meta(path, centrality=centrality_params(pr_alpha, katz_alpha))
+    print(f"Full degree / PageRank / Katz written to {path}/metrics ({time.time() - t0:.1f}s)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Incremental degree / PageRank / Katz between snapshots")
+    ap.add_argument("--full", metavar="BUNDLE", help="compute everything from scratch for one bundle")
+    ap.add_argument("--old", help="previous snapshot bundle (with pagerank/katz metrics)")
+    ap.add_argument("--new", help="new snapshot bundle; results are written to its metric store")
+    ap.add_argument("--check", action="store_true", help="also recompute from scratch and report the error")
+    ap.add_argument("--pr-alpha", type=float, default=PR_ALPHA)
+    ap.add_argument("--katz-alpha", type=float, default=KATZ_ALPHA)
+    args = ap.parse_args()
+
+    if args.full:
+        try:
+            write_full(args.full, args.pr_alpha, args.katz_alpha)
+        except RuntimeError as e:
+            sys.exit(f"nothing written: {e}")
+        return
+    if not (args.old and args.new):
+        ap.error("either --full or both --old and --new are required")
+
+    old, new = load_graph(args.old), load_graph(args.new)
+    missing = {"pagerank", "katz"} - set(list_metrics(args.old))
+    if missing:
+        sys.exit(f"{args.old} has no {', '.join(sorted(missing))}; run --full on it first")
+    params = centrality_params(args.pr_alpha, args.katz_alpha)
+    stored_params = load_meta(args.old).get("centrality")
+    if stored_params is None:
+        sys.exit(f"{args.old} does not record the alphas of its pagerank/katz; run --full on it first")
+    if stored_params != params:
+        sys.exit(f"{args.old} was computed with {stored_params}, not {params}; "
+                 f"pass the same --pr-alpha / --katz-alpha or run --full on it again")
+
+    t0 = time.time()
+    old_to_new = align_nodes(old.titles, new.titles)
+    diff = edge_diff(old, new, old_to_new)
+    t_diff = time.time() - t0
+    n_add, n_rem = len(diff["added"][0]), len(diff["removed"][0])
+    print(f"Old: {old.n:,} nodes / {old.m:,} edges | New: {new.n:,} nodes / {new.m:,} edges")
+    print(f"Nodes added: {int((~np.isin(np.arange(new.n), old_to_new)).sum()):,} | "
+          f"removed: {int((old_to_new < 0).sum()):,}")
+    print(f"Edges added: {n_add:,} | removed: {n_rem:,} | dropped with a removed node: "
+          f"{diff['dropped_with_node']:,} ({(n_add + n_rem) / max(new.m, 1):.2%} of the graph, {t_diff:.1f}s)")
+
+    stored = set(list_metrics(args.old))
+    old_in = read_metric(args.old, "in_degree") if "in_degree" in stored else old.in_degree()
+    old_out = read_metric(args.old, "out_degree") if "out_degree" in stored else old.out_degree()
+    in_deg, out_deg = update_degrees(old_in, old_out, new.n, old_to_new, diff)
+    write_metric(new.path, "in_degree", in_deg)
+    write_metric(new.path, "out_degree", out_deg)
+    print(f"\nDegrees updated | in-degree 0: {int((in_deg == 0).sum()):,} | "
+          f"out-degree 0: {int((out_deg == 0).sum()):,}")
+
+    results = {}
+    alphas = {"pagerank": args.pr_alpha, "katz": args.katz_alpha}
+    for name, fn in (("pagerank", incremental_pagerank), ("katz", incremental_katz)):
+        t0 = time.time()
+        vec, stats = fn(old, new, read_metric(args.old, name), old_to_new, diff, alphas[name])
+        results[name] = vec
+        write_metric(new.path, name, vec)
+        print(f"\n=== {name} (incremental, {time.time() - t0:.2f}s) ===")
+        print(f"  affected: {stats['affected_nodes']:,} | touched nodes: {stats['touched_nodes']:,} "
+              f"({stats['touched_nodes'] / new.n:.2%}) | pushed edges: {stats['pushed_edges']:,} "
+              f"({stats['pushed_edges'] / max(new.m, 1):.2%} of m) | rounds: {stats['rounds']}")
+    update_meta(new.path, centrality=params)
+
+    if args.check:
+        print("\n=== Check against full recompute ===")
+        wrong = int(((in_deg != new.in_degree()) | (out_deg != new.out_degree())).sum())
+        if wrong:
+            sys.exit(f"  degrees: {wrong:,} nodes differ from a full recount")
+        print("  degrees: exact")
+        t0 = time.time()
+        compare("pagerank", results["pagerank"], pagerank_full(new, args.pr_alpha))
+        compare("katz", results["katz"], katz_full(new, args.katz_alpha))
+        print(f"  (full recompute took {time.time() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
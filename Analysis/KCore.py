@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+k-core decomposition: coreness per article by total, in- and out-degree
+(Common/Cores.py; O(n + m) bucket algorithm with numba, level peeling without).
+
+Stores core_total / core_in / core_out in the bundle's metric store (for other
+graph files, as core_<mode>.npy in the working directory) and prints the
+degeneracy, how much of the graph each k-core keeps, and the articles of the
+innermost core. The stored values are what open_graph(…, kcore=k) and the
+--kcore option of the expensive scripts (BetweennessXHarmonic.py,
+ClusteringDirected.py) use to restrict themselves to the k-core.
+
+Run:
+  python Analysis/KCore.py --graph Hewiki_CSR
+  python Analysis/BetweennessXHarmonic.py --graph Hewiki_CSR --backend native --kcore 20
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph
+from Common.Cores import MODES, ENGINES, core_numbers
+from Common.GraphStore import write_metric
+
+# ================= CONFIG =================
+GRAPH_PATH = "Hewiki_CSR"
+ENGINE = "numba" if "numba" in ENGINES else "native"
+LEVELS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+TOP_K = 20
+# =========================================
+
+
+def core_table(C, core):
+    """Nodes and edges kept by each k-core in LEVELS (and the innermost one)."""
+    src = C.sources()
+    edge_core = np.minimum(core[src], core[np.asarray(C.indices)])
+    kmax = int(core.max())
+    print(f"\n{'k':>6}{'nodes':>14}{'share':>9}{'edges':>16}{'share':>9}")
+    for k in sorted(set(l for l in LEVELS if l <= kmax) | {kmax}):
+        nodes = int((core >= k).sum())
+        edges = int((edge_core >= k).sum())
+        print(f"{k:>6}{nodes:>14,}{nodes / C.n:>9.1%}{edges:>16,}{edges / max(C.m, 1):>9.1%}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="k-core decomposition (total / in / out degree)")
+    ap.add_argument("--graph", default=GRAPH_PATH, help="CSR bundle, gpickle or GraphML")
+    ap.add_argument("--modes", nargs="*", choices=MODES, default=list(MODES))
+    ap.add_argument("--engine", choices=sorted(ENGINES), default=ENGINE)
+    args = ap.parse_args()
+
+    src = open_graph(args.graph)
+    C = src.csr()
+    titles = src.titles()
+    degree = C.out_degree() + C.in_degree()
+    print(f"Articles: {C.n:,} | links: {C.m:,}")
+
+    for mode in args.modes:
+        t0 = time.time()
+        core = core_numbers(C.indptr, C.indices, mode, engine=args.engine)
+        print(f"\n=== {mode}-degree cores: degeneracy {int(core.max())} ({time.time() - t0:.2f}s) ===")
+        if src.kind == "bundle":
+            write_metric(src.path, f"core_{mode}", core)
+        else:
+            np.save(f"core_{mode}.npy", core)
+        core_table(C, core)
+
+        inner = np.nonzero(core == core.max())[0]
+        inner = inner[np.argsort(-degree[inner], kind="stable")]
+        print(f"\nInnermost core ({len(inner):,} articles), highest degree first:")
+        for i, v in enumerate(inner[:TOP_K], start=1):
+            print(f"{i}. {titles[v]} — degree {int(degree[v]):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Semi-external analyses for graphs whose edges do not fit in RAM (enwiki:
+~7M articles, a few hundred million links).
+
+The bundle is opened with load_graph(mmap=True). Node-sized arrays (degrees,
+rank vectors, labels, masks) live in memory; edges are only ever touched as
+blocks of BLOCK_EDGES streamed from the memory-mapped CSR, or as bounded
+chunks of a BFS frontier. Mapped pages show up in RSS but are clean page
+cache that the kernel drops under pressure.
+
+Tasks:
+  degrees    in/out degree (one streamed pass), summary + top titles
+  pagerank   power iteration, one streamed pass per iteration
+  katz       idem, x = α·Aᵀx + β; stops early (and only this task fails) when
+             alpha is not below 1 / largest eigenvalue
+  scc        strongly connected components: trimming, forward/backward reach
+             from a pivot (peels the giant SCC), then max-label colouring
+             with backward marking for the rest
+  distances  BFS distance sampling inside the largest SCC (largest WCC is not
+             available semi-externally, so trivial SCCs mean sampling from
+             nodes with out-links instead)
+
+Per-node results go to the metric store (in_degree, out_degree, pagerank,
+katz, scc). The normalisation and stopping rules match
+Analysis/IncrementalCentrality.py.
+
+Run:
+  python Analysis/OutOfCore.py --graph Enwiki_CSR
+  python Analysis/OutOfCore.py --graph Enwiki_CSR --tasks degrees,scc --block-edges 20000000
+"""
+
+import os
+import sys
+import math
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, iter_edge_blocks, write_metric, BLOCK_EDGES
+from Common.Traversal import bfs_levels
+from Common.Instrument import Monitor
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+TASKS = ("degrees", "pagerank", "katz", "scc", "distances")
+PR_ALPHA = 0.85
+KATZ_ALPHA = 0.1
+KATZ_BETA = 1.0
+TOL = 1e-10
+MAX_ITER = 1000
+DIVERGE_PASSES = 10   # Katz gives up once its change has grown this many passes in a row
+MAX_TRIM_PASSES = 5
+INITIAL_SAMPLES = 200
+MAX_SAMPLES = 2000
+BATCH_SIZE = 50
+TARGET_REL_ERROR = 0.001
+TOP_K = 20
+SEED = 0
+REPORT_INTERVAL = 60  # seconds
+METRICS_LOG = "OutOfCore.metrics.jsonl"
+PROM_PATH = "OutOfCore.prom"
+# =========================================
+
+
+def show_top(G, values, label, k=TOP_K):
+    print(f"\nTop {k} by {label}:\n")
+    for i, v in enumerate(np.argsort(-values)[:k], start=1):
+        print(f"{i}. {G.title(v)} — {values[v]:.6g}")
+
+
+# ---------- degrees ----------
+
+def degrees(G, block_edges, st):
+    out_deg = np.diff(np.asarray(G.indptr))
+    in_deg = np.zeros(G.n, dtype=np.int64)
+    for _, dst in iter_edge_blocks(G, block_edges):
+        in_deg += np.bincount(dst, minlength=G.n)
+        st.count("edges", len(dst))
+    return in_deg, out_deg
+
+
+def degree_summary(name, deg):
+    print(f"{name}: mean {deg.mean():.2f} | median {np.median(deg):.0f} | "
+          f"max {deg.max():,} | zero {int((deg == 0).sum()):,}")
+
+
+# ---------- power iteration ----------
+
+def streamed_product(G, x, block_edges):
+    """Aᵀx, one streamed pass over the edges."""
+    y = np.zeros(G.n)
+    for src, dst in iter_edge_blocks(G, block_edges):
+        y += np.bincount(dst, weights=x[src], minlength=G.n)
+    return y
+
+
+def pagerank(G, out_deg, block_edges, st, alpha=PR_ALPHA, tol=TOL, max_iter=MAX_ITER):
+    n = G.n
+    dangling = out_deg == 0
+    inv_out = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        last = x
+        x = alpha * (streamed_product(G, last * inv_out, block_edges) + last[dangling].sum() / n) \
+            + (1 - alpha) / n
+        err = np.abs(x - last).sum()
+        st.count("iterations")
+        st.set("l1_change", float(err))
+        if err < tol:
+            return x / x.sum()
+    raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+
+def katz(G, block_edges, st, alpha=KATZ_ALPHA, beta=KATZ_BETA, tol=TOL, max_iter=MAX_ITER):
+    """Raises RuntimeError as soon as the series visibly diverges.
+
+    The change between passes is β·(αAᵀ)ᵏ1, so its growth factor per pass
+    tends to α·ρ (ρ = largest eigenvalue): it keeps growing exactly when
+    alpha ≥ 1/ρ, and the last factor over alpha estimates ρ.
+    """
+    x = np.zeros(G.n)
+    change, growing = None, 0
+    for _ in range(max_iter):
+        last = x
+        x = alpha * streamed_product(G, last, block_edges) + beta
+        delta = np.abs(x - last).sum()
+        err = delta / np.abs(x).sum()
+        st.count("iterations")
+        st.set("rel_change", float(err))
+        if err < tol:
+            return x / np.linalg.norm(x)
+        growing = growing + 1 if change is not None and delta > change else 0
+        if growing >= DIVERGE_PASSES or not np.isfinite(delta):
+            rho = delta / change / alpha
+            raise RuntimeError(f"Katz diverges: alpha={alpha} is not below 1 / largest eigenvalue "
+                               f"(≈ 1/{rho:.3g} = {1 / rho:.3g}); pass a smaller --katz-alpha")
+        change = delta
+    raise RuntimeError(f"Katz did not converge in {max_iter} iterations "
+                       f"(alpha={alpha} must be below 1 / largest eigenvalue)")
+
+
+# ---------- strongly connected components ----------
+
+def trim(G, active, in_deg, out_deg, label, block_edges, st, passes=MAX_TRIM_PASSES):
+    """Nodes without an in- or out-edge inside the active set are their own SCC."""
+    indeg, outdeg = in_deg.copy(), out_deg.copy()
+    for _ in range(passes):
+        dead = active & ((indeg == 0) | (outdeg == 0))
+        if not dead.any():
+            break
+        label[dead] = np.nonzero(dead)[0]
+        active &= ~dead
+        st.count("trimmed", int(dead.sum()))
+        indeg = np.zeros(G.n, dtype=np.int64)
+        outdeg = np.zeros(G.n, dtype=np.int64)
+        for src, dst in iter_edge_blocks(G, block_edges):
+            keep = active[src] & active[dst]
+            indeg += np.bincount(dst[keep], minlength=G.n)
+            outdeg += np.bincount(src[keep], minlength=G.n)
+        st.count("passes")
+    return indeg, outdeg
+
+
+def mark_backward(G, marked, allowed, block_edges, st, same=None):
+    """Grow `marked` along reversed edges inside `allowed` until nothing changes.
+
+    With `same` (a colour per node) only edges between equal colours count.
+    The out-CSR has no reverse index, so every round is a streamed pass.
+    """
+    changed = True
+    while changed:
+        changed = False
+        for src, dst in iter_edge_blocks(G, block_edges):
+            hit = allowed[src] & ~marked[src] & marked[dst]
+            if same is not None:
+                hit &= same[src] == same[dst]
+            if hit.any():
+                marked[src[hit]] = True
+                changed = True
+        st.count("passes")
+    return marked
+
+
+def scc(G, in_deg, out_deg, block_edges, mon):
+    """SCC label (a representative node id) per node."""
+    n = G.n
+    label = np.full(n, -1, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+
+    with mon.stage("scc_trim") as st:
+        indeg, outdeg = trim(G, active, in_deg, out_deg, label, block_edges, st)
+
+    if active.any():
+        with mon.stage("scc_pivot") as st:
+            pivot = int(np.argmax(np.where(active, indeg * outdeg, -1)))
+            forward = bfs_levels(G.indptr, G.indices, pivot, block_edges=block_edges) >= 0
+            marked = np.zeros(n, dtype=bool)
+            marked[pivot] = True
+            giant = mark_backward(G, marked, forward & active, block_edges, st)
+            label[giant] = pivot
+            active &= ~giant
+            st.set("giant", int(giant.sum()))
+
+    with mon.stage("scc_colouring") as st:
+        ids = np.arange(n, dtype=np.int64)
+        while active.any():
+            # forward: every node takes the largest id that reaches it
+            colour = np.where(active, ids, -1)
+            changed = True
+            while changed:
+                changed = False
+                for src, dst in iter_edge_blocks(G, block_edges):
+                    c = colour[src]
+                    better = active[dst] & (c > colour[dst])
+                    if better.any():
+                        np.maximum.at(colour, dst[better], c[better])
+                        changed = True
+                st.count("passes")
+            # backward: each colour's root reaches back to exactly its SCC
+            roots = active & (colour == ids)
+            done = mark_backward(G, roots.copy(), active, block_edges, st, same=colour)
+            label[done] = colour[done]
+            active &= ~done
+            st.count("rounds")
+            st.count("resolved", int(done.sum()))
+    return label
+
+
+def scc_summary(label):
+    sizes = np.bincount(label, minlength=len(label))
+    sizes = sizes[sizes > 0]
+    print(f"SCCs: {len(sizes):,} | largest: {sizes.max():,} | singletons: {int((sizes == 1).sum()):,}")
+
+
+# ---------- distance sampling ----------
+
+def sample_distances(G, within, block_edges, st, rng):
+    """Histogram of directed BFS distances between sampled sources and `within`.
+
+    Sources and targets are both taken from `within`; when that is an SCC the
+    whole-graph distances equal the distances inside it.
+    """
+    nodes = np.nonzero(within)[0]
+    hist = np.zeros(1, dtype=np.int64)
+
+    def run(k):
+        nonlocal hist
+        for v in rng.choice(nodes, size=min(k, len(nodes)), replace=False):
+            dist = bfs_levels(G.indptr, G.indices, int(v), block_edges=block_edges)
+            d = np.bincount(dist[within & (dist > 0)])
+            if len(d) > len(hist):
+                hist = np.pad(hist, (0, len(d) - len(hist)))
+            hist[:len(d)] += d
+            st.count("sources")
+
+    run(INITIAL_SAMPLES)
+    used = INITIAL_SAMPLES
+    while True:
+        k = np.arange(len(hist))
+        count = hist.sum()
+        if count == 0:
+            return hist, float("nan")
+        mean = (k * hist).sum() / count
+        sd = math.sqrt(((k - mean) ** 2 * hist).sum() / count)
+        rse = sd / math.sqrt(count) / mean
+        print(f"Samples={count:,}  mean≈{mean:.4f}  RSE≈{rse:.3%}  longest={len(hist) - 1}")
+        if rse < TARGET_REL_ERROR or used >= MAX_SAMPLES:
+            return hist, mean
+        run(BATCH_SIZE)
+        used += BATCH_SIZE
+
+
+# ---------- main ----------
+
+def main():
+    ap = argparse.ArgumentParser(description="Semi-external analyses over a memory-mapped CSR bundle")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--tasks", default=",".join(TASKS), help=f"comma-separated subset of {TASKS}")
+    ap.add_argument("--block-edges", type=int, default=BLOCK_EDGES)
+    ap.add_argument("--katz-alpha", type=float, default=KATZ_ALPHA)
+    ap.add_argument("--seed", type=int, default=SEED)
+    args = ap.parse_args()
+    tasks = args.tasks.split(",")
+    unknown = set(tasks) - set(TASKS)
+    if unknown:
+        sys.exit(f"unknown tasks: {', '.join(sorted(unknown))}")
+
+    G = load_graph(args.graph, mmap=True)
+    print(f"Nodes: {G.n:,} | edges: {G.m:,} | block: {args.block_edges:,} edges")
+    mon = Monitor("OutOfCore", jsonl_path=METRICS_LOG, prom_path=PROM_PATH, interval=REPORT_INTERVAL)
+
+    with mon.stage("degrees", total=G.m, unit="edges") as st:
+        in_deg, out_deg = degrees(G, args.block_edges, st)
+    if "degrees" in tasks:
+        write_metric(args.graph, "in_degree", in_deg)
+        write_metric(args.graph, "out_degree", out_deg)
+        degree_summary("In-degree", in_deg)
+        degree_summary("Out-degree", out_deg)
+        show_top(G, in_deg, "in-degree")
+
+    if "pagerank" in tasks:
+        with mon.stage("pagerank") as st:
+            pr = pagerank(G, out_deg, args.block_edges, st)
+        write_metric(args.graph, "pagerank", pr)
+        show_top(G, pr, "PageRank")
+
+    failed = []
+    if "katz" in tasks:
+        try:
+            with mon.stage("katz") as st:
+                kz = katz(G, args.block_edges, st, alpha=args.katz_alpha)
+        except RuntimeError as e:
+            print(f"\nKatz skipped: {e}")
+            failed.append("katz")
+        else:
+            write_metric(args.graph, "katz", kz)
+            show_top(G, kz, "Katz")
+
+    within = out_deg > 0
+    if "scc" in tasks:
+        label = scc(G, in_deg, out_deg, args.block_edges, mon)
+        write_metric(args.graph, "scc", label)
+        scc_summary(label)
+        largest = label == np.argmax(np.bincount(label))
+        if largest.sum() > 10:
+            within = largest
+        else:
+            print("SCC is trivial; sampling from all nodes with out-links instead.")
+
+    if "distances" in tasks:
+        print(f"\nSampling distances over {int(within.sum()):,} nodes…")
+        with mon.stage("distances", total=MAX_SAMPLES, unit="sources") as st:
+            hist, mean = sample_distances(G, within, args.block_edges, st, np.random.default_rng(args.seed))
+        print("\n===== FINAL RESULTS (DIRECTED) =====")
+        print(f"Average directed shortest-path length (reachable pairs): {mean}")
+        print(f"Estimated directed diameter (longest shortest path found): {len(hist) - 1}")
+    mon.close()
+    if failed:
+        sys.exit(f"failed tasks: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
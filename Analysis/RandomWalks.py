@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Random-walk corpus for DeepWalk / node2vec embeddings (Common/Walks.py).
+
+Every node starts WALKS_PER_NODE walks of WALK_LENGTH nodes. The walks are cut
+into shards of SHARD_WALKERS and the shards are spread over worker processes;
+shard i always draws from the i-th child of SeedSequence(SEED), so the output
+is the same whatever the number of processes. Within a shard walkers advance
+BATCH_WALKERS at a time in lock-step, and each shard's start nodes are
+shuffled (a trainer reading shards in order sees mixed nodes).
+
+Output directory:
+  walks_00000.npy, …   (walkers × WALK_LENGTH) int32 node ids, -1 after a dead end
+  walks.json           parameters, node count, shard list (titles: the bundle)
+walks.json is written before the first shard. Shards already present are
+skipped, so an interrupted run picks up where it stopped; a run whose
+parameters differ from the stored ones stops instead of mixing corpora
+(--overwrite deletes the old shards and starts over).
+
+Run:
+  python Analysis/RandomWalks.py --graph Hewiki_CSR --out Hewiki_walks
+  python Analysis/RandomWalks.py --graph Hewiki_CSR --undirected --p 0.5 --q 2 --processes 8
+  python Analysis/RandomWalks.py --graph Hewiki_CSR --restart 0.15 --walk-length 20
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import multiprocessing
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, index_dtype
+from Common.Walks import walk_batch, edge_keys
+from Common.Instrument import Monitor
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+OUTPUT_DIR = "Hewiki_walks"
+WALKS_PER_NODE = 10
+WALK_LENGTH = 80
+P = 1.0                    # node2vec return parameter
+Q = 1.0                    # node2vec in-out parameter
+RESTART = 0.0              # probability of jumping back to the start node per step
+UNDIRECTED = False         # walk the symmetrized graph (the usual DeepWalk setting)
+SHARD_WALKERS = 250_000
+BATCH_WALKERS = 100_000
+PROCESSES = os.cpu_count() or 1
+SEED = 0
+METRICS_LOG = "RandomWalks.metrics.jsonl"
+REPORT_INTERVAL = 30
+# =========================================
+
+_WORK = {}
+
+
+def shard_path(out_dir, i):
+    return os.path.join(out_dir, f"walks_{i:05d}.npy")
+
+
+def changed_params(out_dir, meta):
+    """Keys of `meta` that differ from an earlier run's walks.json (none if there is none)."""
+    path = os.path.join(out_dir, "walks.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        old = json.load(f)
+    return [k for k in meta if k != "complete" and old.get(k) != meta[k]]
+
+
+def clear_walks(out_dir):
+    for f in os.listdir(out_dir):
+        if f.startswith("walks_") and f.endswith(".npy"):
+            os.remove(os.path.join(out_dir, f))
+    os.remove(os.path.join(out_dir, "walks.json"))
+
+
+def write_meta(out_dir, meta):
+    path = os.path.join(out_dir, "walks.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def prepare_arrays(args, G, scratch):
+    """Paths of the arrays the workers walk on (read back memory-mapped).
+
+    The bundle's own indptr/indices are used as they are; only the
+    symmetrized graph (--undirected) and node2vec's edge keys (p/q != 1) are
+    written to `scratch`."""
+    arrays = {"indptr": os.path.join(args.graph, "indptr.npy"),
+              "indices": os.path.join(args.graph, "indices.npy"), "keys": None}
+    if args.undirected:
+        G = G.symmetrized()
+        os.makedirs(scratch, exist_ok=True)
+        arrays["indptr"] = os.path.join(scratch, "indptr.npy")
+        arrays["indices"] = os.path.join(scratch, "indices.npy")
+        np.save(arrays["indptr"], np.asarray(G.indptr, dtype=np.int64))
+        np.save(arrays["indices"], G.indices)
+    if args.p != 1.0 or args.q != 1.0:
+        os.makedirs(scratch, exist_ok=True)
+        arrays["keys"] = os.path.join(scratch, "keys.npy")
+        np.save(arrays["keys"], edge_keys(G.indptr, G.indices))
+    return arrays, G.m
+
+
+def init_worker(arrays, params):
+    _WORK["indptr"] = np.load(arrays["indptr"], mmap_mode="r")
+    _WORK["indices"] = np.load(arrays["indices"], mmap_mode="r")
+    _WORK["keys"] = np.load(arrays["keys"], mmap_mode="r") if arrays["keys"] else None
+    _WORK.update(params)
+
+
+def run_shard(job):
+    """Walks [a, b) of the global walk list -> shard file. Walk k starts at node k % n."""
+    i, a, b, seed = job
+    w = _WORK
+    n = len(w["indptr"]) - 1
+    rng = np.random.default_rng(seed)
+    starts = np.arange(a, b, dtype=np.int64) % n
+    rng.shuffle(starts)
+    out = np.empty((b - a, w["length"]), dtype=index_dtype(n))
+    for s in range(0, b - a, w["batch"]):
+        chunk = starts[s:s + w["batch"]]
+        out[s:s + len(chunk)] = walk_batch(w["indptr"], w["indices"], chunk, w["length"], rng,
+                                           p=w["p"], q=w["q"], restart=w["restart"], keys=w["keys"])
+    path = shard_path(w["out"], i)
+    tmp = path[:-4] + ".tmp.npy"
+    np.save(tmp, out)
+    os.replace(tmp, path)
+    return i, b - a, int((out >= 0).sum() - (b - a))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sharded random-walk corpus over a CSR bundle")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--out", default=OUTPUT_DIR)
+    ap.add_argument("--walks-per-node", type=int, default=WALKS_PER_NODE)
+    ap.add_argument("--walk-length", type=int, default=WALK_LENGTH)
+    ap.add_argument("--p", type=float, default=P)
+    ap.add_argument("--q", type=float, default=Q)
+    ap.add_argument("--restart", type=float, default=RESTART)
+    ap.add_argument("--undirected", action="store_true", default=UNDIRECTED)
+    ap.add_argument("--shard-walkers", type=int, default=SHARD_WALKERS)
+    ap.add_argument("--batch-walkers", type=int, default=BATCH_WALKERS)
+    ap.add_argument("--processes", type=int, default=PROCESSES)
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--overwrite", action="store_true", help="discard shards made with other parameters")
+    args = ap.parse_args()
+    if args.p <= 0 or args.q <= 0:
+        sys.exit("--p and --q must be positive")
+
+    os.makedirs(args.out, exist_ok=True)
+    scratch = os.path.join(args.out, "_arrays")
+    G = load_graph(args.graph, mmap=True)
+    n = G.n
+    total = n * args.walks_per_node
+    bounds = list(range(0, total, args.shard_walkers)) + [total]
+    seeds = np.random.SeedSequence(args.seed).spawn(len(bounds) - 1)
+    meta = {"graph": os.path.abspath(args.graph), "nodes": n, "edges": G.m,
+            "undirected": args.undirected, "walks_per_node": args.walks_per_node,
+            "walk_length": args.walk_length, "p": args.p, "q": args.q,
+            "restart": args.restart, "seed": args.seed, "shard_walkers": args.shard_walkers,
+            "batch_walkers": args.batch_walkers,
+            "shards": [os.path.basename(shard_path(args.out, i)) for i in range(len(bounds) - 1)],
+            "complete": False}
+    diff = changed_params(args.out, meta)
+    if diff and not args.overwrite:
+        sys.exit(f"{args.out} holds walks made with other parameters ({', '.join(diff)}); "
+                 f"use another --out or --overwrite")
+    if diff:
+        print(f"Parameters changed ({', '.join(diff)}); deleting the old shards")
+        clear_walks(args.out)
+    write_meta(args.out, meta)
+    jobs = [(i, bounds[i], bounds[i + 1], seeds[i]) for i in range(len(bounds) - 1)
+            if not os.path.exists(shard_path(args.out, i))]
+    if not jobs:
+        meta["complete"] = True
+        write_meta(args.out, meta)
+        print(f"All {len(bounds) - 1} shards already in {args.out}/")
+        return
+
+    mon = Monitor("RandomWalks", jsonl_path=METRICS_LOG, interval=REPORT_INTERVAL)
+    with mon.stage("prepare"):
+        arrays, m = prepare_arrays(args, G, scratch)
+    print(f"{n:,} nodes, {m:,} edges{' (symmetrized)' if args.undirected else ''} | "
+          f"{total:,} walks of {args.walk_length} in {len(bounds) - 1} shards "
+          f"({len(bounds) - 1 - len(jobs)} already done) | p={args.p} q={args.q} restart={args.restart}")
+
+    params = {"out": args.out, "length": args.walk_length, "batch": args.batch_walkers,
+              "p": args.p, "q": args.q, "restart": args.restart}
+    t0 = time.time()
+    with mon.stage("walks", total=len(jobs), unit="shards") as st:
+        if args.processes <= 1:
+            init_worker(arrays, params)
+            results = map(run_shard, jobs)
+        else:
+            pool = multiprocessing.Pool(args.processes, initializer=init_worker, initargs=(arrays, params))
+            results = pool.imap_unordered(run_shard, jobs)
+        for i, walkers, steps in results:
+            st.count("shards")
+            st.count("walks", walkers)
+            st.count("steps", steps)
+        if args.processes > 1:
+            pool.close()
+            pool.join()
+    mon.close()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+    meta["complete"] = True
+    write_meta(args.out, meta)
+    print(f"Done in {time.time() - t0:.1f}s; walks in {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,43 @@
-from igraph import Graph
+import os
+import sys
+import argparse
+import numpy as np
 
-# load graphml
-g = Graph.Read_GraphML("hewiki_BaseGraph.graphml")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph, compute, add_backend_argument
+
+GRAPH_FILE = "hewiki_BaseGraph.graphml"
+BACKEND = "igraph"
+TOP_K = 50
+
+ap = argparse.ArgumentParser(description="Degree-0/1 counts and top in/out-degree articles")
+ap.add_argument("--graph", default=GRAPH_FILE, help="GraphML, gpickle or CSR bundle")
+add_backend_argument(ap, ("degree",), BACKEND)
+args = ap.parse_args()
+
+# load graph (file name matched case-insensitively)
+src = open_graph(args.graph)
 
 # degrees
-in_deg  = g.indegree()
-out_deg = g.outdegree()
+in_deg, out_deg = compute("degree", args.backend, src)
 
 # counts with degree = 1
-num_in1 = sum(1 for d in in_deg if d == 1)
-num_out1 = sum(1 for d in out_deg if d == 1)
-
-print("Nodes with in-degree = 1:", num_in1)
-print("Nodes with out-degree = 1:", num_out1)
+print("Nodes with in-degree = 1:", int((in_deg == 1).sum()))
+print("Nodes with out-degree = 1:", int((out_deg == 1).sum()))
 
 # counts with degree = 0
-num_in0 = sum(1 for d in in_deg if d == 0)
-num_out0 = sum(1 for d in out_deg if d == 0)
-
-print("Nodes with in-degree = 0:", num_in0)
-print("Nodes with out-degree = 0:", num_out0)
+print("Nodes with in-degree = 0:", int((in_deg == 0).sum()))
+print("Nodes with out-degree = 0:", int((out_deg == 0).sum()))
 
 # get names
-names = g.vs["title"]
+names = src.titles()
 
-# top 10 in-degree nodes
-top_in_idx = sorted(range(len(in_deg)), key=lambda i: in_deg[i], reverse=True)[:50]
-print("\nTop 50 highest in-degree:")
-for i in top_in_idx:
+# top in-degree nodes
+print(f"\nTop {TOP_K} highest in-degree:")
+for i in np.argsort(-in_deg, kind="stable")[:TOP_K]:
     print(names[i], in_deg[i])
 
-# top 10 out-degree nodes
-top_out_idx = sorted(range(len(out_deg)), key=lambda i: out_deg[i], reverse=True)[:50]
-print("\nTop 50 highest out-degree:")
-for i in top_out_idx:
+# top out-degree nodes
+print(f"\nTop {TOP_K} highest out-degree:")
+for i in np.argsort(-out_deg, kind="stable")[:TOP_K]:
     print(names[i], out_deg[i])
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Directed triad census and per-node motif counts (Common/Triads.py).
+
+ClusteringDirected.py folds all three-node structure into one coefficient and
+AsymetryXClustringUndirected.py only measures reciprocity; this gives the full
+16-type census (003 … 300, Holland–Leinhardt names as in networkx) and, for
+each of the 13 connected types, how many such triads every article belongs to.
+
+The wedge enumeration is split into --processes ranges of about equal work;
+each process walks its range over memory-mapped copies of the undirected view
+and leaves its partial per-node counts in a scratch directory, which the
+parent sums. The numba engine is used when numba is installed.
+
+Outputs (in the bundle):
+  metrics/triad_<type>.npy   per-node counts, e.g. triad_030C (cycles), triad_300
+  triad_census.json          the 16 totals
+and a printed table with each type's share of the connected triads.
+
+Run:
+  python Analysis/TriadCensus.py --graph Hewiki_CSR
+  python Analysis/TriadCensus.py --graph Hewiki_CSR --engine native --processes 8
+"""
+
+import os
+import sys
+import json
+import tempfile
+import argparse
+import multiprocessing
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, write_metric
+from Common.Triads import TRIAD_NAMES, CONNECTED, ENGINES, UndirectedView, split_slots, finish
+from Common.Instrument import Monitor
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+ENGINE = "numba" if "numba" in ENGINES else "native"
+PROCESSES = os.cpu_count() or 1
+PER_NODE = True
+TOP_K = 10
+TOP_TYPES = ("030C", "300")      # print the articles in most triads of these types
+METRICS_LOG = "TriadCensus.metrics.jsonl"
+REPORT_INTERVAL = 30
+# =========================================
+
+_WORK = {}
+
+
+def init_worker(scratch, engine, per_node):
+    arrays = {name: np.load(os.path.join(scratch, name + ".npy"), mmap_mode="r")
+              for name in ("indptr", "indices", "dirs")}
+    _WORK["U"] = UndirectedView(arrays["indptr"], arrays["indices"], arrays["dirs"])
+    _WORK.update(scratch=scratch, engine=engine, per_node=per_node)
+
+
+def run_range(job):
+    """Census of one slot range; partial arrays go to the scratch directory."""
+    k, lo, hi = job
+    census, counts, common = ENGINES[_WORK["engine"]](_WORK["U"], lo, hi, per_node=_WORK["per_node"])
+    base = os.path.join(_WORK["scratch"], f"part{k:03d}")
+    np.save(base + "_common.npy", common)
+    if counts is not None:
+        np.save(base + "_counts.npy", counts)
+    return census, base
+
+
+def main():
+    ap = argparse.ArgumentParser(description="16-type directed triad census with per-node motif counts")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--engine", choices=sorted(ENGINES), default=ENGINE)
+    ap.add_argument("--processes", type=int, default=PROCESSES)
+    ap.add_argument("--no-per-node", dest="per_node", action="store_false", default=PER_NODE,
+                    help="totals only (skips the 16×n count arrays)")
+    args = ap.parse_args()
+
+    G = load_graph(args.graph, mmap=True)
+    mon = Monitor("TriadCensus", jsonl_path=METRICS_LOG, interval=REPORT_INTERVAL)
+    with mon.stage("undirected"):
+        U = UndirectedView.from_csr(G.indptr, G.indices)
+    wedges = int(U.wedges().sum())
+    print(f"Articles: {G.n:,} | links: {G.m:,} | undirected edges: {len(U.indices) // 2:,} | "
+          f"wedges: {wedges:,} | engine: {args.engine}, {args.processes} process(es)")
+
+    ranges = split_slots(U, max(args.processes, 1))
+    census = np.zeros(16, dtype=np.int64)
+    common = np.zeros(len(U.indices), dtype=np.int64)
+    counts = np.zeros((16, G.n), dtype=np.int64) if args.per_node else None
+    with tempfile.TemporaryDirectory(prefix="triads_") as scratch:
+        for name in ("indptr", "indices", "dirs"):
+            np.save(os.path.join(scratch, name + ".npy"), getattr(U, name))
+        jobs = [(k, lo, hi) for k, (lo, hi) in enumerate(ranges)]
+        with mon.stage("census", total=len(jobs), unit="ranges") as st:
+            if args.processes <= 1:
+                init_worker(scratch, args.engine, args.per_node)
+                results = map(run_range, jobs)
+            else:
+                pool = multiprocessing.Pool(args.processes, initializer=init_worker,
+                                            initargs=(scratch, args.engine, args.per_node))
+                results = pool.imap_unordered(run_range, jobs)
+            for part, base in results:
+                census += part
+                common += np.load(base + "_common.npy")
+                if counts is not None:
+                    counts += np.load(base + "_counts.npy", mmap_mode="r")
+                st.count("ranges")
+            if args.processes > 1:
+                pool.close()
+                pool.join()
+    totals = finish(U, census, common)
+
+    connected = sum(totals[t] for t in CONNECTED)
+    print(f"\n{'type':<6}{'count':>22}{'of connected':>14}")
+    for t, name in enumerate(TRIAD_NAMES):
+        share = f"{totals[t] / connected:.4%}" if t in CONNECTED and connected else ""
+        print(f"{name:<6}{totals[t]:>22,}{share:>14}")
+    with open(os.path.join(args.graph, "triad_census.json"), "w", encoding="utf-8") as f:
+        json.dump(dict(zip(TRIAD_NAMES, totals)), f, indent=1)
+
+    if counts is not None:
+        with mon.stage("save"):
+            for t in CONNECTED:
+                write_metric(args.graph, f"triad_{TRIAD_NAMES[t]}", counts[t])
+        for name in TOP_TYPES:
+            col = counts[TRIAD_NAMES.index(name)]
+            best = np.argsort(-col, kind="stable")[:TOP_K]
+            print(f"\nArticles in the most {name} triads:")
+            if not col.any():
+                print("(none)")
+            for i, v in enumerate(best, start=1):
+                if col[v] == 0:
+                    break
+                print(f"{i}. {G.title(v)} — {int(col[v]):,}")
+    mon.close()
+
+
+if __name__ == "__main__":
+    main()
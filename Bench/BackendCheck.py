@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Cross-backend agreement and speed check (Common/Backends.py).
+
+Runs every metric on every backend that implements it, against one graph,
+compares each result with the networkx reference and records the time per
+backend. Graph representations are built before timing (their load times are
+reported separately), and each backend keeps its best of --repeat runs, so
+the numba column is not charged for compilation.
+
+Path metrics (betweenness, harmonic, distances) run from a fixed sample of
+SOURCES sources; the networkx reference makes full runs impractical beyond a
+few thousand nodes.
+
+Run:
+  python Bench/BackendCheck.py --graph bench_data/a20000/csr
+  python Bench/BackendCheck.py --graph hewiki_basegraph.gpickle --metrics pagerank betweenness
+Exit status is 1 if any backend disagrees with the reference.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from Common.Backends import open_graph, compute, backends_for, IMPLEMENTATIONS
+from Bench.RunBench import git_version
+
+# ================= CONFIG =================
+GRAPH = os.path.join("bench_data", "a20000", "csr")
+RESULTS_PATH = "backend_check.jsonl"
+REFERENCE = "networkx"
+REPEATS = 2
+SOURCES = 200
+SEED = 0
+# max relative L1 difference from the reference; 0 = exact
+TOLERANCE = {
+    "degree": 0,
+    "largest_component": 0,
+    "distance_histogram": 0,
+    "pagerank": 1e-3,      # networkx / native stop at L1 < n·tol, igraph solves exactly
+    "eigenvector": 1e-3,
+    "katz": 1e-3,
+    "betweenness": 1e-9,
+    "harmonic": 1e-9,
+    "clustering_directed": 1e-9,
+    "triad_census": 0,
+    "core_number": 0,
+}
+# =========================================
+
+
+def params_for(metric, src, sources, within):
+    if metric == "katz":
+        # the spectral radius is at most the smallest of the max in/out degrees
+        in_deg, out_deg = compute("degree", "native", src)
+        return {"alpha": 0.5 / max(min(in_deg.max(), out_deg.max()), 1)}
+    if metric in ("betweenness", "harmonic"):
+        return {"sources": sources}
+    if metric == "distance_histogram":
+        return {"sources": sources, "within": within}
+    return {}
+
+
+def flatten(result):
+    parts = result if isinstance(result, tuple) else (result,)
+    return np.concatenate([np.atleast_1d(np.asarray(p, dtype=np.float64)) for p in parts])
+
+
+def difference(result, reference):
+    a, b = flatten(result), flatten(reference)
+    if a.shape != b.shape:
+        # histograms may differ only in trailing zeros
+        size = max(len(a), len(b))
+        a, b = np.pad(a, (0, size - len(a))), np.pad(b, (0, size - len(b)))
+    scale = np.abs(b).sum() or 1.0
+    return float(np.abs(a - b).sum() / scale)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check that the compute backends agree and compare their speed")
+    ap.add_argument("--graph", default=GRAPH, help="gpickle, GraphML or CSR bundle")
+    ap.add_argument("--metrics", nargs="*", default=sorted(IMPLEMENTATIONS))
+    ap.add_argument("--backends", nargs="*", help="default: every registered backend")
+    ap.add_argument("--sources", type=int, default=SOURCES)
+    ap.add_argument("--repeat", type=int, default=REPEATS)
+    ap.add_argument("--out", default=RESULTS_PATH)
+    args = ap.parse_args()
+
+    src = open_graph(args.graph)
+    loads = {}
+    _, loads["csr"] = timed(src.csr)
+    _, loads["networkx"] = timed(src.networkx)
+    _, loads["igraph"] = timed(src.igraph)
+    n = src.n
+    print(f"{src.path}: {n:,} nodes | load csr {loads['csr']:.2f}s, "
+          f"networkx {loads['networkx']:.2f}s, igraph {loads['igraph']:.2f}s\n")
+
+    rng = np.random.default_rng(SEED)
+    sources = np.sort(rng.choice(n, size=min(args.sources, n), replace=False))
+    within = compute("largest_component", "native", src)
+
+    version = git_version()
+    failures = 0
+    print(f"{'metric':<22}{'backend':<10}{'seconds':>10}{'speedup':>10}{'rel diff':>12}  ok")
+    with open(args.out, "a", encoding="utf-8") as log:
+        for metric in args.metrics:
+            backends = [b for b in backends_for(metric) if not args.backends or b in args.backends]
+            params = params_for(metric, src, sources, within)
+            reference = REFERENCE if REFERENCE in backends else backends[0]
+            runs = {}
+            for b in [reference] + [b for b in backends if b != reference]:
+                best = None
+                try:
+                    for _ in range(max(args.repeat, 1)):
+                        result, seconds = timed(lambda: compute(metric, b, src, **params))
+                        best = seconds if best is None else min(best, seconds)
+                except Exception as e:
+                    print(f"{metric:<22}{b:<10}  failed: {e}")
+                    failures += 1
+                    continue
+                runs[b] = (result, best)
+            if reference not in runs:
+                continue
+
+            ref_result, ref_seconds = runs[reference]
+            for b, (result, seconds) in runs.items():
+                diff = difference(result, ref_result)
+                ok = diff <= TOLERANCE.get(metric, 1e-6)
+                failures += not ok
+                speedup = ref_seconds / seconds if seconds > 0 else float("inf")
+                print(f"{metric:<22}{b:<10}{seconds:>10.4f}{speedup:>9.1f}x{diff:>12.2e}  {'yes' if ok else 'NO'}")
+                log.write(json.dumps({
+                    "version": version, "graph": os.path.abspath(src.path), "nodes": n,
+                    "metric": metric, "backend": b, "reference": reference,
+                    "seconds": seconds, "speedup": speedup, "rel_diff": diff, "ok": bool(ok),
+                    "timestamp": time.time(),
+                }) + "\n")
+    print(f"\n{failures} disagreement(s); results appended to {args.out}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Load generator for Serve/QueryServer.py.
+
+Opens --connections keep-alive connections to the server (spread over
+--processes client processes) and has each one issue requests back to back
+for --duration seconds, drawn from a fixed mix of endpoints over random
+articles of the same bundle. Reports requests/second and client-side latency
+percentiles per endpoint, and appends the run (tagged with the git commit and
+the server's worker count) to a JSON-lines history.
+
+With --spawn the server is started on the bundle for the run and stopped
+afterwards, so worker counts can be compared in one go:
+
+  python Bench/QueryLoad.py --graph bench_data/a20000/csr --spawn --workers 1 2 4 8
+  python Bench/QueryLoad.py --graph Hewiki_CSR --port 8765    # server already running
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+import multiprocessing
+from urllib.parse import quote
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from Common.GraphStore import load_graph
+from Bench.RunBench import git_version
+
+# ================= CONFIG =================
+GRAPH_DIR = os.path.join("bench_data", "a20000", "csr")
+HOST = "127.0.0.1"
+PORT = 8765
+CONNECTIONS = 64
+PROCESSES = max(1, (os.cpu_count() or 1) // 2)   # client processes; one Python loop can't saturate many workers
+DURATION = 10.0
+SAMPLE_TITLES = 5000
+SEED = 0
+RESULTS_PATH = "query_load.jsonl"
+STARTUP_TIMEOUT = 120
+# endpoint -> share of requests
+MIX = {"/node": 0.4, "/neighbors": 0.3, "/top": 0.1, "/distance": 0.2}
+# =========================================
+
+
+def make_targets(titles, rng):
+    """Endless stream of request targets following MIX."""
+    endpoints = list(MIX)
+    weights = list(MIX.values())
+    while True:
+        endpoint = rng.choices(endpoints, weights)[0]
+        a, b = quote(rng.choice(titles)), quote(rng.choice(titles))
+        if endpoint == "/node":
+            yield endpoint, f"/node?title={a}"
+        elif endpoint == "/neighbors":
+            yield endpoint, f"/neighbors?title={a}&dir={rng.choice(('out', 'in'))}&limit=50"
+        elif endpoint == "/top":
+            yield endpoint, f"/top?metric={rng.choice(('in_degree', 'out_degree'))}&k=20"
+        else:
+            yield endpoint, f"/distance?from={a}&to={b}&max_depth=6"
+
+
+async def request(reader, writer, host, target):
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        k, _, v = line.decode("latin-1").partition(":")
+        if k.strip().lower() == "content-length":
+            length = int(v)
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def client(host, port, targets, deadline, samples, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            endpoint, target = next(targets)
+            t0 = time.perf_counter()
+            status, _ = await request(reader, writer, host, target)
+            samples[endpoint].append(time.perf_counter() - t0)
+            if status != 200:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+    finally:
+        writer.close()
+
+
+async def fetch(host, port, target):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await request(reader, writer, host, target)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, titles, connections, duration, seed):
+    rng = random.Random(seed)
+    targets = make_targets(titles, rng)
+    samples = {e: [] for e in MIX}
+    errors = {}
+    deadline = time.perf_counter() + duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(host, port, targets, deadline, samples, errors)
+                           for _ in range(connections)))
+    return samples, errors, time.perf_counter() - t0
+
+
+def run_load_process(job):
+    return asyncio.run(run_load(*job))
+
+
+def run_parallel(host, port, titles, connections, duration, processes):
+    """Split the connections over client processes and merge their samples."""
+    processes = max(1, min(processes, connections))
+    jobs = [(host, port, titles, connections // processes + (i < connections % processes), duration, SEED + i)
+            for i in range(processes)]
+    if processes == 1:
+        return run_load_process(jobs[0])
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.map(run_load_process, jobs)
+    samples = {e: [x for p in parts for x in p[0][e]] for e in MIX}
+    errors = {}
+    for _, errs, _ in parts:
+        for e, c in errs.items():
+            errors[e] = errors.get(e, 0) + c
+    return samples, errors, max(p[2] for p in parts)
+
+
+def wait_for_server(host, port, proc, timeout=STARTUP_TIMEOUT):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        if proc is not None and proc.poll() is not None:
+            sys.exit(f"server exited with status {proc.returncode}")
+        try:
+            status, body = asyncio.run(fetch(host, port, "/stats"))
+            if status == 200:
+                return json.loads(body)
+        except OSError:
+            time.sleep(0.2)
+    sys.exit(f"server at {host}:{port} did not come up within {timeout}s")
+
+
+def report(samples, errors, seconds):
+    total = sum(len(s) for s in samples.values())
+    print(f"{'endpoint':<12}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    per_endpoint = {}
+    for endpoint, s in samples.items():
+        if not s:
+            continue
+        ms = np.array(s) * 1000
+        p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+        per_endpoint[endpoint] = {"requests": len(s), "errors": errors.get(endpoint, 0),
+                                  "p50_ms": p50, "p90_ms": p90, "p99_ms": p99, "max_ms": ms.max()}
+        print(f"{endpoint:<12}{len(s):>10,}{errors.get(endpoint, 0):>8}{p50:>10.2f}{p90:>10.2f}{p99:>10.2f}{ms.max():>10.1f}")
+    print(f"{total:,} requests in {seconds:.1f}s = {total / seconds:,.0f} req/s")
+    return total, per_endpoint
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test for Serve/QueryServer.py")
+    ap.add_argument("--graph", default=GRAPH_DIR, help="bundle the server serves (titles are sampled from it)")
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--connections", type=int, default=CONNECTIONS)
+    ap.add_argument("--duration", type=float, default=DURATION)
+    ap.add_argument("--processes", type=int, default=PROCESSES, help="client processes")
+    ap.add_argument("--spawn", action="store_true", help="start the server for each run")
+    ap.add_argument("--workers", type=int, nargs="*", default=[os.cpu_count() or 1],
+                    help="server worker counts to try (with --spawn)")
+    ap.add_argument("--out", default=RESULTS_PATH)
+    args = ap.parse_args()
+
+    G = load_graph(args.graph, mmap=True)
+    rng = np.random.default_rng(SEED)
+    ids = rng.choice(G.n, size=min(SAMPLE_TITLES, G.n), replace=False)
+    titles = [G.title(int(v)) for v in ids]
+    version = git_version()
+
+    for workers in (args.workers if args.spawn else [None]):
+        proc = None
+        if args.spawn:
+            proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "Serve", "QueryServer.py"),
+                                     "--graph", args.graph, "--host", args.host,
+                                     "--port", str(args.port), "--workers", str(workers)],
+                                    stdout=subprocess.DEVNULL)
+        try:
+            stats = wait_for_server(args.host, args.port, proc)
+            label = f"{workers} worker(s)" if workers else "running server"
+            print(f"\n== {label}: {args.connections} connections for {args.duration:.0f}s "
+                  f"({stats['nodes']:,} nodes) ==")
+            samples, errors, seconds = run_parallel(args.host, args.port, titles, args.connections,
+                                                    args.duration, args.processes)
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+        total, per_endpoint = report(samples, errors, seconds)
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "version": version, "graph": os.path.abspath(args.graph), "nodes": stats["nodes"],
+                "workers": workers, "connections": args.connections, "processes": args.processes, "seconds": seconds,
+                "requests": total, "rps": total / seconds, "endpoints": per_endpoint,
+                "timestamp": time.time(),
+            }) + "\n")
+    print(f"\nResults appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
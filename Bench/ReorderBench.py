@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+BFS / SpMV timings for each node ordering of the same bundle.
+
+Every ordering is applied in memory (Build/Reorder.py), then the same BFS
+sources (mapped through the permutation) and the same number of SpMV
+products (one PageRank-style iteration each) are timed.
+
+Run:
+  python Bench/ReorderBench.py --graph Hewiki_CSR
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph
+from Common.Traversal import bfs_levels
+from Build.Reorder import METHODS, compute_order, apply_order
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+BFS_SOURCES = 20
+SPMV_ROUNDS = 20
+REPEATS = 3
+SEED = 0
+# =========================================
+
+
+def best_of(fn, repeats=REPEATS):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def time_bfs(G, sources):
+    def run():
+        for s in sources:
+            bfs_levels(G.indptr, G.indices, int(s))
+    return best_of(run)
+
+
+def time_spmv(G, rounds=SPMV_ROUNDS):
+    AT = G.to_scipy().T.tocsr()
+    x = np.full(G.n, 1.0 / max(G.n, 1))
+
+    def run():
+        y = x
+        for _ in range(rounds):
+            y = AT @ y
+    return best_of(run)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BFS/SpMV speed per node ordering")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--methods", nargs="+", choices=METHODS, default=list(METHODS))
+    args = ap.parse_args()
+
+    G = load_graph(args.graph)
+    print(f"Nodes: {G.n:,}, Edges: {G.m:,}")
+    rng = np.random.default_rng(SEED)
+    sources = rng.choice(G.n, size=min(BFS_SOURCES, G.n), replace=False)
+
+    base_bfs = time_bfs(G, sources)
+    base_spmv = time_spmv(G)
+    print(f"\n{'ordering':<10} {'order (s)':>10} {'BFS (s)':>10} {'speedup':>8} {'SpMV (s)':>10} {'speedup':>8}")
+    print(f"{'dump':<10} {'-':>10} {base_bfs:>10.3f} {1.0:>7.2f}x {base_spmv:>10.3f} {1.0:>7.2f}x")
+
+    for method in args.methods:
+        t0 = time.perf_counter()
+        order = compute_order(G, method)
+        H, inv = apply_order(G, order)
+        t_order = time.perf_counter() - t0
+        t_bfs = time_bfs(H, inv[sources])
+        t_spmv = time_spmv(H)
+        print(f"{method:<10} {t_order:>10.2f} {t_bfs:>10.3f} {base_bfs / t_bfs:>7.2f}x "
+              f"{t_spmv:>10.3f} {base_spmv / t_spmv:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
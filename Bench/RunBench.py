@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the hot paths, on a synthetic dump (Bench/SyntheticDump.py).
+
+Every case runs in a fresh Python process so its peak RSS is its own. Results
+(seconds, throughput, peak RSS) are appended to a JSON-lines history tagged
+with the git commit, and each new result is compared with the median of the
+previous runs of the same case/size on other commits; slowdowns or memory
+growth beyond the tolerances are flagged as regressions.
+
+Cases:
+  parse.*    iter_pages, the original link / category regexes (separately and
+             as the pair the builds ran per page) vs the single-pass scan_page
+  build.*    graph assembly (networkx DiGraph vs CSR arrays, full CsrBuild)
+  kernel.*   CSR kernels (BFS, SpMV, random walks, triad census, k-core, communities, reordering, …)
+  ooc.*      semi-external kernels over a memory-mapped bundle (Analysis/OutOfCore.py)
+  script.*   the Analysis/ scripts as shipped, run against files written from
+             the synthetic graph (they read fixed file names from the cwd);
+             BetweennessXHarmonic gets a SCRIPT_TIME_LIMIT per measure
+
+Run:
+  python Bench/RunBench.py --articles 20000
+  python Bench/RunBench.py --articles 20000 --cases parse. kernel.bfs --fail-on-regression
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import pickle
+import argparse
+import platform
+import statistics
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ================= CONFIG =================
+DATA_DIR = "bench_data"
+HISTORY_PATH = "bench_history.jsonl"
+ARTICLES = 20000
+REPEATS = 1
+TIME_TOLERANCE = 0.15       # flag if slower than baseline by more than this
+MEM_TOLERANCE = 0.20        # flag if peak RSS grows by more than this
+HISTORY_WINDOW = 5          # baseline = median of the last N runs on other commits
+SCRIPT_TIMEOUT = 30 * 60
+SCRIPT_TIME_LIMIT = 2 * 60  # --time-limit for the time-bounded scripts (per measure)
+# =========================================
+
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark. The function gets the data paths and returns
+    (run, units, unit): `run` is timed, `units / seconds` is the throughput."""
+    def wrap(fn):
+        CASES[name] = fn
+        return fn
+    return wrap
+
+
+# ================= DATA =================
+
+def data_paths(data_dir, articles):
+    d = os.path.join(data_dir, f"a{articles}")
+    return {
+        "dir": d,
+        "dump": os.path.join(d, "synthetic.xml.bz2"),
+        "bundle": os.path.join(d, "csr"),
+        "scripts": os.path.join(d, "scripts"),
+    }
+
+
+def prepare(paths, articles):
+    """Generate the dump, CSR bundle and script inputs once per size (and
+    again whenever the generator's output changed)."""
+    from Bench.SyntheticDump import generate, GENERATOR_VERSION
+    stamp = os.path.join(paths["dir"], "generator.json")
+    if os.path.exists(paths["dir"]):
+        try:
+            with open(stamp, encoding="utf-8") as f:
+                stale = json.load(f)["version"] != GENERATOR_VERSION
+        except (OSError, ValueError, KeyError):
+            stale = True
+        if stale:
+            print(f"Discarding {paths['dir']} (written by another generator version)")
+            shutil.rmtree(paths["dir"])
+    os.makedirs(paths["dir"], exist_ok=True)
+    if not os.path.exists(paths["dump"]):
+        print(f"Generating synthetic dump ({articles:,} articles)…")
+        generate(paths["dump"], articles)
+        with open(stamp, "w", encoding="utf-8") as f:
+            json.dump({"version": GENERATOR_VERSION}, f)
+
+    if not os.path.exists(os.path.join(paths["bundle"], "meta.json")):
+        from Build.CsrBuild import build_from_dump
+        from Common.GraphStore import save_graph, save_categories
+        from Common.Instrument import Monitor
+        print("Building CSR bundle…")
+        mon = Monitor("bench-prepare", quiet=True)
+        G, categories = build_from_dump(paths["dump"], mon)
+        mon.close()
+        save_graph(paths["bundle"], G, meta={"source": "synthetic", "ordering": "dump"})
+        ci, cx = categories.csr(G.n)
+        save_categories(paths["bundle"], ci, cx, categories.names)
+
+    sdir = paths["scripts"]
+    if not os.path.exists(os.path.join(sdir, "Hewiki_BaseGraph.graphml")):
+        import networkx as nx
+        from Common.GraphStore import load_graph
+        print("Writing networkx / GraphML inputs for the Analysis scripts…")
+        os.makedirs(sdir, exist_ok=True)
+        C = load_graph(paths["bundle"])
+        G = nx.DiGraph(name="Hewiki_BaseGraph")
+        for v in range(C.n):
+            G.add_node(v, title=C.title(v))
+        G.add_edges_from(zip(C.sources().tolist(), C.indices.tolist()))
+        with open(os.path.join(sdir, "hewiki_basegraph.gpickle"), "wb") as f:
+            pickle.dump(G, f, pickle.HIGHEST_PROTOCOL)
+        nx.write_graphml(G, os.path.join(sdir, "Hewiki_BaseGraph.graphml"))
+        # the scripts disagree on capitalisation
+        for alias in ("hewiki_BaseGraph.graphml",):
+            shutil.copy(os.path.join(sdir, "Hewiki_BaseGraph.graphml"), os.path.join(sdir, alias))
+        shutil.copy(os.path.join(sdir, "hewiki_basegraph.gpickle"),
+                    os.path.join(sdir, "hewiki_BaseGraph.gpickle"))
+
+
+def article_texts(dump):
+    from Common.DumpParse import iter_pages, is_namespace0
+    return [text for title, text, is_redirect in iter_pages(dump)
+            if is_namespace0(title) and not is_redirect]
+
+
+# ================= CASES =================
+
+@case("parse.iter_pages")
+def bench_iter_pages(p):
+    from Common.DumpParse import iter_pages
+    count = sum(1 for _ in iter_pages(p["dump"]))
+
+    def run():
+        for _ in iter_pages(p["dump"]):
+            pass
+    return run, count, "pages"
+
+
+@case("parse.extract_links")
+def bench_extract_links(p):
+    from Common.DumpParse import extract_links
+    texts = article_texts(p["dump"])
+    links = sum(len(extract_links(t)) for t in texts)
+
+    def run():
+        for t in texts:
+            extract_links(t)
+    return run, links, "links"
+
+
+@case("parse.extract_categories")
+def bench_extract_categories(p):
+    from Common.DumpParse import extract_categories_from_text
+    texts = article_texts(p["dump"])
+
+    def run():
+        for t in texts:
+            extract_categories_from_text(t)
+    return run, len(texts), "pages"
+
+
+@case("parse.regex_pair")
+def bench_regex_pair(p):
+    """What the builds did per page before scan_page: two separate regex scans."""
+    from Common.DumpParse import extract_links, extract_categories_from_text
+    texts = article_texts(p["dump"])
+
+    def run():
+        for t in texts:
+            extract_links(t)
+            extract_categories_from_text(t)
+    return run, len(texts), "pages"
+
+
+@case("parse.scan_page")
+def bench_scan_page(p):
+    from Common.DumpParse import scan_page
+    texts = article_texts(p["dump"])
+
+    def run():
+        for t in texts:
+            scan_page(t)
+    return run, len(texts), "pages"
+
+
+def _edge_list(p):
+    from Common.GraphStore import load_graph
+    G = load_graph(p["bundle"])
+    return G, G.sources(), np.asarray(G.indices)
+
+
+@case("build.assemble_networkx")
+def bench_assemble_networkx(p):
+    import networkx as nx
+    G, src, dst = _edge_list(p)
+    pairs = list(zip(src.tolist(), dst.tolist()))
+
+    def run():
+        H = nx.DiGraph()
+        for u, v in pairs:
+            H.add_edge(u, v)
+    return run, len(pairs), "edges"
+
+
+@case("build.assemble_csr")
+def bench_assemble_csr(p):
+    from Common.GraphStore import csr_from_edges
+    G, src, dst = _edge_list(p)
+    src, dst = src.astype(np.int64), dst.astype(np.int64)
+
+    def run():
+        csr_from_edges(src, dst, G.n)
+    return run, len(src), "edges"
+
+
+@case("build.csr_from_dump")
+def bench_csr_from_dump(p):
+    from Build.CsrBuild import build_from_dump
+    from Common.Instrument import Monitor
+    from Common.GraphStore import load_meta
+    edges = load_meta(p["bundle"])["edges"]
+
+    def run():
+        mon = Monitor("bench", quiet=True)
+        build_from_dump(p["dump"], mon)
+        mon.close()
+    return run, edges, "edges"
+
+
+@case("kernel.bfs")
+def bench_bfs(p):
+    from Common.GraphStore import load_graph
+    from Common.Traversal import bfs_levels
+    G = load_graph(p["bundle"])
+    sources = np.random.default_rng(0).choice(G.n, size=min(50, G.n), replace=False)
+
+    def run():
+        for s in sources:
+            bfs_levels(G.indptr, G.indices, int(s))
+    return run, len(sources), "sources"
+
+
+@case("kernel.spmv")
+def bench_spmv(p):
+    from Common.GraphStore import load_graph
+    G = load_graph(p["bundle"])
+    AT = G.to_scipy().T.tocsr()
+    x = np.full(G.n, 1.0 / G.n)
+    rounds = 50
+
+    def run():
+        y = x
+        for _ in range(rounds):
+            y = AT @ y
+    return run, rounds * G.m, "edges"
+
+
+@case("kernel.walks_uniform")
+def bench_walks_uniform(p):
+    from Common.GraphStore import load_graph
+    from Common.Walks import walk_batch
+    G = load_graph(p["bundle"])
+    starts = np.arange(G.n)
+    length = 40
+
+    def run():
+        walk_batch(G.indptr, G.indices, starts, length, np.random.default_rng(0))
+    return run, G.n * (length - 1), "steps"
+
+
+@case("kernel.walks_node2vec")
+def bench_walks_node2vec(p):
+    from Common.GraphStore import load_graph
+    from Common.Walks import walk_batch, edge_keys
+    G = load_graph(p["bundle"])
+    keys = edge_keys(G.indptr, G.indices)
+    starts = np.arange(G.n)
+    length = 40
+
+    def run():
+        walk_batch(G.indptr, G.indices, starts, length, np.random.default_rng(0), p=0.5, q=2.0, keys=keys)
+    return run, G.n * (length - 1), "steps"
+
+
+@case("kernel.triad_census")
+def bench_triad_census(p):
+    from Common.GraphStore import load_graph
+    from Common.Triads import triad_census
+    G = load_graph(p["bundle"])
+
+    def run():
+        triad_census(G.indptr, G.indices, "native", per_node=True)
+    return run, G.m, "edges"
+
+
+@case("kernel.kcore")
+def bench_kcore(p):
+    from Common.GraphStore import load_graph
+    from Common.Cores import core_numbers
+    G = load_graph(p["bundle"])
+
+    def run():
+        core_numbers(G.indptr, G.indices, "total")
+    return run, G.m, "edges"
+
+
+@case("kernel.communities_lpa")
+def bench_lpa(p):
+    from Common.GraphStore import load_graph
+    from Analysis.Communities import label_propagation
+    U = load_graph(p["bundle"]).symmetrized()
+
+    def run():
+        label_propagation(U)
+    return run, U.m, "edges"
+
+
+@case("kernel.communities_louvain")
+def bench_louvain(p):
+    from Common.GraphStore import load_graph
+    from Analysis.Communities import louvain
+    U = load_graph(p["bundle"]).symmetrized()
+
+    def run():
+        louvain(U)
+    return run, U.m, "edges"
+
+
+@case("kernel.reorder_rcm")
+def bench_reorder_rcm(p):
+    from Common.GraphStore import load_graph
+    from Build.Reorder import compute_order, apply_order
+    G = load_graph(p["bundle"])
+
+    def run():
+        apply_order(G, compute_order(G, "rcm"))
+    return run, G.m, "edges"
+
+
+@case("ooc.streamed_spmv")
+def bench_streamed_spmv(p):
+    from Common.GraphStore import load_graph
+    from Analysis.OutOfCore import streamed_product
+    G = load_graph(p["bundle"], mmap=True)
+    x = np.full(G.n, 1.0 / G.n)
+    rounds = 50
+
+    def run():
+        y = x
+        for _ in range(rounds):
+            y = streamed_product(G, y, max(G.m // 16, 1))
+    return run, rounds * G.m, "edges"
+
+
+@case("ooc.scc")
+def bench_ooc_scc(p):
+    from Common.GraphStore import load_graph
+    from Common.Instrument import Monitor
+    from Analysis.OutOfCore import scc
+    G = load_graph(p["bundle"], mmap=True)
+    in_deg, out_deg = G.in_degree(), G.out_degree()
+
+    def run():
+        mon = Monitor("bench", quiet=True)
+        scc(G, in_deg, out_deg, max(G.m // 16, 1), mon)
+        mon.close()
+    return run, G.m, "edges"
+
+
+# script -> extra arguments; BetweennessXHarmonic runs each measure until its
+# --time-limit (an hour by default), which would outlast SCRIPT_TIMEOUT
+ANALYSIS_SCRIPTS = {
+    "3CentMeasures.py": [],
+    "AsymetryXClustringUndirected.py": [],
+    "BetweennessXHarmonic.py": ["--time-limit", str(SCRIPT_TIME_LIMIT)],
+    "ClusteringDirected.py": [],
+    "Distances.py": [],
+    "TopX01Degrees.py": [],
+}
+
+for _script in ANALYSIS_SCRIPTS:
+    CASES["script." + _script[:-3]] = None   # run by run_script(), not in a child
+
+
+# ================= RUNNERS =================
+
+# runs a script as __main__ and leaves its peak RSS in $BENCH_PEAK_FILE on exit
+SCRIPT_WRAPPER = """
+import atexit, os, runpy, sys
+sys.path.insert(0, os.environ["BENCH_ROOT"])
+from Common.Instrument import peak_rss_bytes
+
+def _dump():
+    with open(os.environ["BENCH_PEAK_FILE"], "w") as f:
+        f.write(str(peak_rss_bytes()))
+
+atexit.register(_dump)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+
+def child_main(name, articles, data_dir, repeats):
+    """Entry point inside the per-case subprocess; prints one JSON line."""
+    from Common.Instrument import peak_rss_bytes
+    paths = data_paths(data_dir, articles)
+    run, units, unit = CASES[name](paths)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    print(json.dumps({"seconds": min(times), "units": units, "unit": unit, "peak_rss": peak_rss_bytes()}))
+
+
+def run_case(name, articles, data_dir, repeats):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", name,
+           "--articles", str(articles), "--data", data_dir, "--repeat", str(repeats)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
+    if proc.returncode != 0:
+        return {"error": (proc.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_script(name, paths):
+    """Run an Analysis script as-is in the scripts dir (wall time + its own peak RSS)."""
+    file_name = name.split(".", 1)[1] + ".py"
+    script = os.path.join(ROOT, "Analysis", file_name)
+    log_path = os.path.join(paths["scripts"], name + ".log")
+    peak_path = os.path.join(paths["scripts"], name + ".peak")
+    env = dict(os.environ, BENCH_ROOT=ROOT, BENCH_PEAK_FILE=os.path.abspath(peak_path),
+               MPLBACKEND="Agg")
+    with open(log_path, "w", encoding="utf-8") as log:
+        t0 = time.perf_counter()
+        cmd = [sys.executable, "-c", SCRIPT_WRAPPER, script, *ANALYSIS_SCRIPTS[file_name]]
+        proc = subprocess.Popen(cmd, cwd=paths["scripts"], stdout=log, stderr=subprocess.STDOUT, env=env)
+        try:
+            proc.wait(timeout=SCRIPT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            return {"error": f"timed out after {SCRIPT_TIMEOUT}s"}
+        seconds = time.perf_counter() - t0
+    if proc.returncode != 0:
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            tail = (f.read().strip().splitlines() or ["failed"])[-1]
+        return {"error": tail}
+    from Common.GraphStore import load_meta
+    return {"seconds": seconds, "units": load_meta(paths["bundle"])["edges"], "unit": "edges",
+            "peak_rss": int(open(peak_path).read())}
+
+
+# ================= HISTORY =================
+
+def git_version():
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return (rev or "unknown") + ("+dirty" if dirty else "")
+    except OSError:
+        return "unknown"
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline(history, name, articles, version, generator):
+    """Median seconds / peak RSS of the last runs of this case on other
+    versions, on data from the same generator version."""
+    prev = [h for h in history
+            if h["case"] == name and h["articles"] == articles
+            and h.get("generator", 1) == generator
+            and h["version"] != version and "seconds" in h]
+    prev = prev[-HISTORY_WINDOW:]
+    if not prev:
+        return None
+    return (statistics.median(h["seconds"] for h in prev),
+            statistics.median(h["peak_rss"] for h in prev))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the hot paths on a synthetic dump")
+    ap.add_argument("--articles", type=int, default=ARTICLES)
+    ap.add_argument("--cases", nargs="*", help="case names or prefixes (default: all)")
+    ap.add_argument("--repeat", type=int, default=REPEATS)
+    ap.add_argument("--data", default=DATA_DIR)
+    ap.add_argument("--history", default=HISTORY_PATH)
+    ap.add_argument("--list", action="store_true")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child_main(args.child, args.articles, args.data, args.repeat)
+        return
+    if args.list:
+        print("\n".join(CASES))
+        return
+
+    selected = [c for c in CASES
+                if not args.cases or any(c == s or c.startswith(s) for s in args.cases)]
+    paths = data_paths(args.data, args.articles)
+    prepare(paths, args.articles)
+
+    from Bench.SyntheticDump import GENERATOR_VERSION
+    version = git_version()
+    history = load_history(args.history)
+    regressions = []
+
+    print(f"\nversion {version} | {args.articles:,} articles | {platform.python_version()}\n")
+    print(f"{'case':<34} {'seconds':>9} {'throughput':>18} {'peak RSS':>10}  vs baseline")
+    for name in selected:
+        if name.startswith("script."):
+            res = run_script(name, paths)
+        else:
+            res = run_case(name, args.articles, args.data, args.repeat)
+
+        record = {"case": name, "articles": args.articles, "version": version,
+                  "generator": GENERATOR_VERSION, "timestamp": time.time(), "python": platform.python_version(), **res}
+        if "error" in res:
+            print(f"{name:<34} {'ERROR':>9}  {res['error'][:80]}")
+        else:
+            rate = res["units"] / res["seconds"] if res["seconds"] > 0 else float("inf")
+            note = "(no baseline)"
+            base = baseline(history, name, args.articles, version, GENERATOR_VERSION)
+            if base:
+                dt = res["seconds"] / base[0] - 1
+                dm = res["peak_rss"] / base[1] - 1 if base[1] else 0.0
+                note = f"time {dt:+.1%} | mem {dm:+.1%}"
+                if dt > TIME_TOLERANCE or dm > MEM_TOLERANCE:
+                    note += "  << REGRESSION"
+                    regressions.append(name)
+            print(f"{name:<34} {res['seconds']:>9.3f} {rate:>12,.0f} {res['unit']:<5}/s "
+                  f"{res['peak_rss'] / 2**20:>7.0f} MB  {note}")
+        with open(args.history, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Synthetic MediaWiki dump generator (offline stand-in for hewiki-latest-pages-articles.xml.bz2).
+
+Writes a MediaWiki export-0.10 style .xml.bz2 with:
+- namespace-0 articles whose out-degree is heavy-tailed and whose link
+  targets follow a Zipf-like popularity (power-law in-degree). The most
+  popular articles have their out-degree capped until the largest eigenvalue
+  is about MAX_EIGENVALUE at most, so Katz with the shipped alpha=0.1 converges
+- redirects (<redirect title=…/> + "#הפניה [[…]]"), and links pointing at them
+- links to missing pages, to other namespaces (קובץ:, תבנית:, ויקיפדיה:),
+  with labels ([[x|y]]), anchors ([[x#y]]), underscore spellings ([[x_y]])
+  and repeated targets
+- article categories ([[קטגוריה:…]] and [[Category:…]])
+- category pages (namespace 14) that sit in parent categories, plus a few
+  template / project pages
+- links hidden inside <!-- --> comments and <nowiki> blocks
+
+Run:
+  python Bench/SyntheticDump.py --articles 20000 --out synthetic-20000.xml.bz2
+"""
+
+import bz2
+import argparse
+from functools import lru_cache
+import numpy as np
+from xml.sax.saxutils import escape, quoteattr
+
+# ================= CONFIG =================
+ARTICLES = 10000
+MEAN_LINKS = 10            # mean out-degree of an article
+MAX_EIGENVALUE = 8.0       # cap on the estimated largest eigenvalue (3CentMeasures' Katz needs < 10)
+ZIPF_EXPONENT = 1.1        # link-target popularity ~ rank^-a
+REDIRECT_SHARE = 0.15      # redirects per article
+CATEGORIES_PER_1000 = 40   # category pages per 1000 articles
+OTHER_NS_SHARE = 0.05      # template / project pages per article
+SEED = 0
+GENERATOR_VERSION = 2      # bump whenever the output changes (RunBench regenerates its data)
+# =========================================
+
+LETTERS = list("אבגדהוזחטיכלמנסעפצקרשת")
+CAT_PREFIXES = ("קטגוריה:", "Category:")
+OTHER_NAMESPACES = ((10, "תבנית:"), (4, "ויקיפדיה:"), (6, "קובץ:"))
+
+HEADER = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.10/" version="0.10" xml:lang="he">
+  <siteinfo>
+    <sitename>ויקיפדיה</sitename>
+    <dbname>hewiki</dbname>
+    <namespaces>
+      <namespace key="0" case="first-letter" />
+      <namespace key="4" case="first-letter">ויקיפדיה</namespace>
+      <namespace key="6" case="first-letter">קובץ</namespace>
+      <namespace key="10" case="first-letter">תבנית</namespace>
+      <namespace key="14" case="first-letter">קטגוריה</namespace>
+    </namespaces>
+  </siteinfo>
+"""
+
+
+def make_titles(rng, n, min_words=1, max_words=3):
+    """n distinct pseudo-Hebrew titles."""
+    seen = set()
+    out = []
+    while len(out) < n:
+        words = rng.integers(min_words, max_words + 1)
+        t = " ".join("".join(rng.choice(LETTERS, size=rng.integers(2, 8))) for _ in range(words))
+        if t not in seen:
+            seen.add(t)
+            out.append(t)
+    return out
+
+
+@lru_cache(maxsize=8)
+def _zipf_cdf(n, exponent):
+    cdf = np.cumsum(1.0 / np.arange(1, n + 1) ** exponent)
+    return cdf / cdf[-1]
+
+
+def zipf_targets(rng, n, size, exponent=ZIPF_EXPONENT):
+    """Ranks 0..n-1 drawn with P(rank r) ~ (r+1)^-exponent (0 = most popular)."""
+    return np.searchsorted(_zipf_cdf(n, exponent), rng.random(size))
+
+
+def page_xml(page_id, ns, title, text, redirect=None):
+    redirect_tag = f"\n    <redirect title={quoteattr(redirect)} />" if redirect else ""
+    return (
+        f"  <page>\n"
+        f"    <title>{escape(title)}</title>\n"
+        f"    <ns>{ns}</ns>\n"
+        f"    <id>{page_id}</id>{redirect_tag}\n"
+        f"    <revision>\n"
+        f"      <id>{page_id + 1000000}</id>\n"
+        f"      <model>wikitext</model>\n"
+        f"      <format>text/x-wiki</format>\n"
+        f"      <text bytes=\"{len(text.encode('utf-8'))}\" xml:space=\"preserve\">{escape(text)}</text>\n"
+        f"    </revision>\n"
+        f"  </page>\n"
+    )
+
+
+def link(rng, target):
+    r = rng.random()
+    if r < 0.2:
+        return f"[[{target}|{target[::-1]}]]"
+    if r < 0.25:
+        return f"[[{target}#פסקה]]"
+    if r < 0.28:
+        return f"[[ {target} ]]"
+    if r < 0.31:
+        return f"[[{target.replace(' ', '_')}]]"
+    return f"[[{target}]]"
+
+
+def article_text(rng, links, cats, missing, other):
+    parts = ["{{תבנית:מידע|שם=ערך}}\n'''ערך''' הוא ערך לדוגמה."]
+    for i, t in enumerate(links):
+        parts.append(link(rng, t))
+        if i % 7 == 6:
+            parts.append("\n\nטקסט מילוי " * int(rng.integers(1, 4)))
+    for t in missing:
+        parts.append(f"[[{t}]]")
+    for t in other:
+        parts.append(f"[[{t}|תמונה]]")
+    if rng.random() < 0.1 and links:
+        parts.append(f"<!-- [[{links[0]}]] הערה מוסתרת -->")
+    if rng.random() < 0.05 and links:
+        parts.append(f"<nowiki>[[{links[-1]}]]</nowiki>")
+    parts.append("\n")
+    for c in cats:
+        prefix = CAT_PREFIXES[0] if rng.random() < 0.9 else CAT_PREFIXES[1]
+        parts.append(f"[[{prefix}{c}]]")
+    return " ".join(parts)
+
+
+def generate(path, articles=ARTICLES, mean_links=MEAN_LINKS, seed=SEED):
+    rng = np.random.default_rng(seed)
+    n_red = int(articles * REDIRECT_SHARE)
+    n_cat = max(1, articles * CATEGORIES_PER_1000 // 1000)
+    n_other = int(articles * OTHER_NS_SHARE)
+
+    titles = make_titles(rng, articles + n_red + n_cat + n_other + articles // 10)
+    art = titles[:articles]
+    red = titles[articles:articles + n_red]
+    cats = titles[articles + n_red:articles + n_red + n_cat]
+    other = titles[articles + n_red + n_cat:articles + n_red + n_cat + n_other]
+    missing = titles[articles + n_red + n_cat + n_other:]
+
+    popularity = rng.permutation(articles)   # rank -> article index
+    red_target = popularity[zipf_targets(rng, articles, n_red)]
+    out_deg = np.minimum(rng.lognormal(np.log(mean_links) - 0.5, 1.0, size=articles).astype(np.int64), articles)
+    # Aᵀ ≈ p·dᵀ (p = target popularity), so the largest eigenvalue is about the
+    # popularity-weighted out-degree; one popular hub with hundreds of
+    # out-links can push it past 1/alpha on its own. Such hubs, most popular
+    # first, get at most mean_links out-links until the estimate fits.
+    share = np.diff(_zipf_cdf(articles, ZIPF_EXPONENT), prepend=0.0)
+    by_rank = out_deg[popularity]
+    excess = np.cumsum(share * np.maximum(by_rank - int(mean_links), 0))
+    over = float((share * by_rank).sum()) - MAX_EIGENVALUE
+    if over > 0:
+        hubs = popularity[:int(np.searchsorted(excess, over)) + 1]
+        out_deg[hubs] = np.minimum(out_deg[hubs], int(mean_links))
+    cat_rank = rng.permutation(n_cat)         # category -> popularity rank
+    rank_to_cat = np.argsort(cat_rank)
+
+    # page order in the dump is shuffled like a real dump (not by popularity)
+    kinds = np.concatenate([np.zeros(articles, int), np.ones(n_red, int),
+                            np.full(n_cat, 2), np.full(n_other, 3)])
+    idx = np.concatenate([np.arange(articles), np.arange(n_red), np.arange(n_cat), np.arange(n_other)])
+    order = rng.permutation(len(kinds))
+
+    stats = {"articles": articles, "redirects": n_red, "category_pages": n_cat, "other_pages": n_other,
+             "mean_out_degree": round(float(out_deg.mean()), 2)}
+    with bz2.open(path, "wt", encoding="utf-8") as f:
+        f.write(HEADER)
+        for page_id, j in enumerate(order, start=1):
+            kind, i = kinds[j], idx[j]
+            if kind == 0:
+                tgt = popularity[zipf_targets(rng, articles, out_deg[i])]
+                links = [art[t] for t in tgt]
+                # some links go through redirects
+                for k in np.nonzero(rng.random(len(links)) < 0.05)[0]:
+                    links[k] = red[int(rng.integers(n_red))] if n_red else links[k]
+                page_cats = [cats[c] for c in rank_to_cat[zipf_targets(rng, n_cat, int(rng.integers(0, 5)))]]
+                miss = [missing[int(m)] for m in rng.integers(0, len(missing), size=int(rng.integers(0, 3)))]
+                oth = [f"{OTHER_NAMESPACES[2][1]}{other[int(o)]}.jpg"
+                       for o in rng.integers(0, max(n_other, 1), size=int(rng.random() < 0.3))] if n_other else []
+                f.write(page_xml(page_id, 0, art[i], article_text(rng, links, page_cats, miss, oth)))
+            elif kind == 1:
+                target = art[red_target[i]]
+                f.write(page_xml(page_id, 0, red[i], f"#הפניה [[{target}]]", redirect=target))
+            elif kind == 2:
+                # category tree: parents are more popular categories, with the
+                # occasional back edge so the tree is not a perfect DAG
+                n_par = int(rng.integers(1, 3)) if cat_rank[i] else 0
+                parents = {cats[p] for p in rank_to_cat[rng.integers(0, max(cat_rank[i], 1), size=n_par)]}
+                if rng.random() < 0.01:
+                    parents.add(cats[rank_to_cat[int(rng.integers(n_cat))]])
+                parents.discard(cats[i])
+                text = "דף קטגוריה.\n" + " ".join(f"[[קטגוריה:{p}]]" for p in sorted(parents))
+                f.write(page_xml(page_id, 14, "קטגוריה:" + cats[i], text))
+            else:
+                ns, prefix = OTHER_NAMESPACES[i % 2]
+                text = " ".join(f"[[{art[t]}]]" for t in popularity[zipf_targets(rng, articles, 5)])
+                f.write(page_xml(page_id, ns, prefix + other[i], text))
+        f.write("</mediawiki>\n")
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a synthetic MediaWiki .xml.bz2 dump")
+    ap.add_argument("--articles", type=int, default=ARTICLES)
+    ap.add_argument("--mean-links", type=float, default=MEAN_LINKS)
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--out", help="default: synthetic-<articles>.xml.bz2")
+    args = ap.parse_args()
+
+    out = args.out or f"synthetic-{args.articles}.xml.bz2"
+    stats = generate(out, args.articles, args.mean_links, args.seed)
+    print(f"Wrote {out}: " + ", ".join(f"{k}={v:,}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
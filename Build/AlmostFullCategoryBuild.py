@@ -11,7 +11,8 @@ Features:
 - Single-run: reads the .bz2 dump, builds directed graph from wikilinks
   (namespace 0 articles only, skips redirects)
 - Extracts categories from page text using fast regex, attaches to nodes
-- Reports progress every minute (thread-safe)
+- Reports progress every minute (Common/Instrument.py: console line, JSON-lines
+  log, Prometheus textfile and crawler_status.json snapshot)
 - Saves GraphML and prints node/edge counts and category-count histogram
 
 Dependencies:
@@ -26,12 +27,10 @@ Notes:
   parsing and graph edge emission, or using a more compact graph writer.
 """
 
-import bz2  
+import os
 import re
+import sys
 import time
-import json
-import threading
-from typing import List
 import numpy as np
 
 # ---- NumPy 2.0 compatibility patch for NetworkX 2.8.x ----
@@ -44,7 +43,10 @@ if not hasattr(np, "bool_"):
 # ---------------------------------------------------------
 
 import networkx as nx
-from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.DumpParse import iter_pages, is_namespace0, scan_page
+from Common.Instrument import Monitor
 
 # ================= CONFIG =================
 DUMP_PATH = r"hewiki-latest-pages-articles.xml.bz2"
@@ -52,55 +54,14 @@ OUTPUT_GRAPH = "Hewiki_CategoryGraph.graphml"
 OUTPUT_PICKLE = "Hewiki_CategoryGraph.gpickle"
 OUTPUT_EDGELIST = "Hewiki_CategoryGraph.edgelist"
 STATUS_PATH = "crawler_status.json"
+METRICS_LOG = "CategoryBuild.metrics.jsonl"
+PROM_PATH = "CategoryBuild.prom"
 
 REPORT_INTERVAL = 60  # seconds
 SLEEP_BETWEEN_PAGES = 0.001  # small pause if you want to throttle IO
-WIKI_LINK_RE = re.compile(r"\[\[([^|\]#]+)")
-CAT_RE = re.compile(r"\[\[(?:קטגוריה:|Category:)([^|\]#]+)", re.IGNORECASE)
 # =========================================
 
 
-def is_namespace0(title: str) -> bool:
-    return ":" not in title
-
-
-def iter_pages(bz2_path):
-    """Stream pages (title, text, is_redirect) from a bz2 XML dump."""
-    with bz2.open(bz2_path, mode="rb") as f:
-        context = etree.iterparse(f, events=("end",), tag="{*}page")
-        for _, elem in context:
-            title_el = elem.find('.//{*}title')
-            text_el = elem.find('.//{*}text')
-            redirect_el = elem.find('.//{*}redirect')
-
-            if title_el is not None and text_el is not None:
-                title = (title_el.text or "").strip()
-                text = text_el.text or ""
-                is_redirect = redirect_el is not None
-                yield title, text, is_redirect
-
-            # free memory
-            elem.clear()
-            while elem.getprevious() is not None:
-                del elem.getparent()[0]
-
-
-def extract_links(text: str) -> List[str]:
-    return [m.group(1).strip() for m in WIKI_LINK_RE.finditer(text)]
-
-
-def extract_categories_from_text(text: str) -> List[str]:
-    # find all category links, preserve order and dedupe
-    out = []
-    seen = set()
-    for m in CAT_RE.finditer(text):
-        c = m.group(1).strip()
-        if c and c not in seen:
-            seen.add(c)
-            out.append(c)
-    return out
-
-
 def sanitize_attr_name(s: str) -> str:
     s2 = s.strip().replace(" ", "_")
     s2 = re.sub(r"[^0-9A-Za-z_\-\u0590-\u05FF]", "_", s2)
@@ -110,41 +71,25 @@ def sanitize_attr_name(s: str) -> str:
     return f"cat_{s2}"
 
 
-def reporter(counter, G, done, lock):
-    while not done.is_set():
-        time.sleep(REPORT_INTERVAL)
-        with lock:
-            pages = counter.get("pages", 0)
-            nodes = G.number_of_nodes()
-            edges = G.number_of_edges()
-        print(f"Processed pages: {pages:,} | Nodes: {nodes:,} | Edges: {edges:,}")
-        try:
-            with open(STATUS_PATH, "w", encoding="utf-8") as f:
-                json.dump({
-                    "pages_processed": pages,
-                    "nodes": nodes,
-                    "edges": edges,
-                    "timestamp": time.time()
-                }, f)
-        except Exception:
-            pass
-
-
 # ================= MAIN =================
 
+mon = Monitor("CategoryBuild", jsonl_path=METRICS_LOG, prom_path=PROM_PATH,
+              status_path=STATUS_PATH, interval=REPORT_INTERVAL)
+
 print("Pass 1 – collecting article titles (namespace 0, skipping redirects)")
 existing_titles = set()
 redirects = 0
-pages_seen = 0
 
-for title, text, is_redirect in iter_pages(DUMP_PATH):
-    if not is_namespace0(title):
-        continue
-    if is_redirect:
-        redirects += 1
-        continue
-    existing_titles.add(title)
-    pages_seen += 1
+with mon.stage("pass1_titles") as st:
+    for title, text, is_redirect in iter_pages(DUMP_PATH):
+        st.count("pages")
+        if not is_namespace0(title):
+            continue
+        if is_redirect:
+            redirects += 1
+            continue
+        existing_titles.add(title)
+        st.count("articles")
 
 print(f"Articles kept: {len(existing_titles):,}")
 print(f"Redirects skipped: {redirects:,}")
@@ -155,19 +100,14 @@ G = nx.DiGraph(name="Hewiki_Graph_With_Categories")
 title_to_id = {}
 next_id = 0
 
-counter = {"pages": 0}
-lock = threading.Lock()
-done = threading.Event()
-threading.Thread(target=reporter, args=(counter, G, done, lock), daemon=True).start()
-
-for title, text, is_redirect in iter_pages(DUMP_PATH):
-    if not is_namespace0(title) or is_redirect:
-        continue
-    if title not in existing_titles:
-        continue
+with mon.stage("pass2_graph", total=len(existing_titles), unit="articles") as st:
+    for title, text, is_redirect in iter_pages(DUMP_PATH):
+        if not is_namespace0(title) or is_redirect:
+            continue
+        if title not in existing_titles:
+            continue
 
-    # ensure node exists (under lock)
-    with lock:
+        # ensure node exists
         if title not in title_to_id:
             title_to_id[title] = next_id
             G.add_node(next_id, title=title)
@@ -176,23 +116,23 @@ for title, text, is_redirect in iter_pages(DUMP_PATH):
         else:
             node_id = title_to_id[title]
 
-    # extract categories directly from the page text (fast, offline)
-    if "categories" not in G.nodes[node_id]:
-        cats = extract_categories_from_text(text)
-        if cats:
-            with lock:
+        # links and categories in one pass over the page text (fast, offline)
+        with st.time("scan"):
+            links, cats = scan_page(text)
+
+        if "categories" not in G.nodes[node_id]:
+            if cats:
                 G.nodes[node_id]["categories"] = "||".join(cats)
                 for c in cats:
                     G.nodes[node_id][sanitize_attr_name(c)] = "1"
-        else:
-            with lock:
+            else:
                 G.nodes[node_id]["categories"] = ""
 
-    # outgoing links -> edges
-    for tgt in extract_links(text):
-        if not is_namespace0(tgt) or tgt not in existing_titles:
-            continue
-        with lock:
+        # outgoing links -> edges
+        edges = 0
+        for tgt in links:
+            if not is_namespace0(tgt) or tgt not in existing_titles:
+                continue
             if tgt not in title_to_id:
                 title_to_id[tgt] = next_id
                 G.add_node(next_id, title=tgt)
@@ -201,25 +141,27 @@ for title, text, is_redirect in iter_pages(DUMP_PATH):
             else:
                 tgt_id = title_to_id[tgt]
             G.add_edge(node_id, tgt_id)
+            edges += 1
 
-    with lock:
-        counter["pages"] += 1
+        st.count("articles")
+        st.count("edges", edges)
 
-    if SLEEP_BETWEEN_PAGES:
-        time.sleep(SLEEP_BETWEEN_PAGES)
+        if SLEEP_BETWEEN_PAGES:
+            time.sleep(SLEEP_BETWEEN_PAGES)
 
 # finish
 
-done.set()
+with mon.stage("save"):
+    print("Saving GraphML (slow, archival)…")
+    nx.write_graphml(G, OUTPUT_GRAPH)
 
-print("Saving GraphML (slow, archival)…")
-nx.write_graphml(G, OUTPUT_GRAPH)
+    print("Saving pickle (FAST reload)…")
+    nx.write_gpickle(G, OUTPUT_PICKLE)
 
-print("Saving pickle (FAST reload)…")
-nx.write_gpickle(G, OUTPUT_PICKLE)
+    print("Saving edgelist (structure only)…")
+    nx.write_edgelist(G, OUTPUT_EDGELIST, data=False)
 
-print("Saving edgelist (structure only)…")
-nx.write_edgelist(G, OUTPUT_EDGELIST, data=False)
+mon.close()
 
 # compute category histogram
 cat_hist = {}
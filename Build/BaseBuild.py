@@ -1,61 +1,39 @@
-import bz2
-import re
 import networkx as nx
-from lxml import etree
+import os
 import sys
 import traceback
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.DumpParse import iter_pages, is_namespace0, scan_page
+from Common.Instrument import Monitor
+
 # -------- CONFIG --------
 DUMP_PATH = r"hewiki-latest-pages-articles.xml.bz2"
 GRAPH_NAME = "Hewiki_BaseGraph"
-REPORT_EVERY = 1000
+REPORT_INTERVAL = 60          # seconds
+METRICS_LOG = "BaseBuild.metrics.jsonl"
+PROM_PATH = "BaseBuild.prom"
 # ------------------------
 
-WIKI_LINK_RE = re.compile(r"\[\[([^|\]#]+)")
-
-def is_namespace0(title: str) -> bool:
-    return ":" not in title
-
-def iter_pages(bz2_path):
-    with bz2.open(bz2_path, mode="rb") as f:
-        context = etree.iterparse(f, events=('end',), tag='{*}page')
-        for _, elem in context:
-            title_el = elem.find('.//{*}title')
-            text_el = elem.find('.//{*}text')
-            redirect_el = elem.find('.//{*}redirect')
-
-            if title_el is not None and text_el is not None:
-                title = (title_el.text or "").strip()
-                text = text_el.text or ""
-                is_redirect = redirect_el is not None
-                yield title, text, is_redirect
-
-            elem.clear()
-            while elem.getprevious() is not None:
-                del elem.getparent()[0]
-
-def extract_links(text):
-    return [m.group(1).strip() for m in WIKI_LINK_RE.finditer(text)]
+mon = Monitor("BaseBuild", jsonl_path=METRICS_LOG, prom_path=PROM_PATH, interval=REPORT_INTERVAL)
 
 # ---------- PASS 1 ----------
 print("Pass 1 – collecting real article titles…")
 
 existing_titles = set()
-pages_processed = 0
 redirects = 0
 
-for title, text, is_redirect in iter_pages(DUMP_PATH):
-    if not is_namespace0(title):
-        continue
-    if is_redirect:
-        redirects += 1
-        continue
-
-    existing_titles.add(title)
+with mon.stage("pass1_titles") as st:
+    for title, text, is_redirect in iter_pages(DUMP_PATH):
+        st.count("pages")
+        if not is_namespace0(title):
+            continue
+        if is_redirect:
+            redirects += 1
+            continue
 
-    pages_processed += 1
-    if pages_processed % REPORT_EVERY == 0:
-        print(f"Collected {pages_processed:,} article titles")
+        existing_titles.add(title)
+        st.count("articles")
 
 print(f"Articles kept: {len(existing_titles):,}")
 print(f"Redirects skipped: {redirects:,}")
@@ -67,48 +45,48 @@ G = nx.DiGraph(name=GRAPH_NAME)
 
 title_to_id = {}
 next_id = 0
-pages_processed = 0
-
-for title, text, is_redirect in iter_pages(DUMP_PATH):
-    if not is_namespace0(title) or is_redirect:
-        continue
-    if title not in existing_titles:
-        continue
-
-    # ensure node exists
-    if title not in title_to_id:
-        title_to_id[title] = next_id
-        G.add_node(next_id, title=title)
-        next_id += 1
-
-    src = title_to_id[title]
 
-    # outgoing links
-    for tgt in extract_links(text):
-        if not is_namespace0(tgt):
+with mon.stage("pass2_graph", total=len(existing_titles), unit="articles") as st:
+    for title, text, is_redirect in iter_pages(DUMP_PATH):
+        if not is_namespace0(title) or is_redirect:
             continue
-        if tgt not in existing_titles:
+        if title not in existing_titles:
             continue
 
-        if tgt not in title_to_id:
-            title_to_id[tgt] = next_id
-            G.add_node(next_id, title=tgt)
+        # ensure node exists
+        if title not in title_to_id:
+            title_to_id[title] = next_id
+            G.add_node(next_id, title=title)
             next_id += 1
 
-        G.add_edge(src, title_to_id[tgt])
+        src = title_to_id[title]
+
+        # outgoing links
+        edges = 0
+        links, _ = scan_page(text)
+        for tgt in links:
+            if not is_namespace0(tgt):
+                continue
+            if tgt not in existing_titles:
+                continue
+
+            if tgt not in title_to_id:
+                title_to_id[tgt] = next_id
+                G.add_node(next_id, title=tgt)
+                next_id += 1
+
+            G.add_edge(src, title_to_id[tgt])
+            edges += 1
 
-    pages_processed += 1
-    if pages_processed % REPORT_EVERY == 0:
-        print(
-            f"Processed {pages_processed:,} | "
-            f"Nodes: {G.number_of_nodes():,} | "
-            f"Edges: {G.number_of_edges():,}"
-        )
+        st.count("articles")
+        st.count("edges", edges)
 
-print("Graph finished. Saving…")
+print(f"Graph finished: {G.number_of_nodes():,} nodes, {G.number_of_edges():,} edges. Saving…")
 
 # ---------- SAVE ----------
-nx.write_graphml(G, GRAPH_NAME + ".graphml")
-nx.write_edgelist(G, GRAPH_NAME + ".edgelist", data=False)
+with mon.stage("save"):
+    nx.write_graphml(G, GRAPH_NAME + ".graphml")
+    nx.write_edgelist(G, GRAPH_NAME + ".edgelist", data=False)
 
+mon.close()
 print("Done.")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Category tree (namespace 14) → CSR bundle.
+
+AlmostFullCategoryBuild.py / CsrBuild.py only read the categories of
+articles. Category pages carry their own [[קטגוריה:…]] links, which give the
+parent categories of every category. This pass reads just those pages and
+stores the child → parent lists next to the article categories, reusing the
+bundle's category ids (categories that no article uses are appended).
+
+The result is "mostly a DAG": Wikipedia's category graph has a few cycles,
+which are reported here and tolerated by Analysis/CategoryLinks.py.
+
+Run:
+  python Build/CategoryTreeBuild.py --graph Hewiki_CSR
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.DumpParse import iter_pages, scan_page, category_name
+from Common.GraphStore import (csr_from_edges, load_graph, load_categories, save_categories,
+                               save_category_tree)
+from Common.Instrument import Monitor
+
+# ================= CONFIG =================
+DUMP_PATH = r"hewiki-latest-pages-articles.xml.bz2"
+GRAPH_DIR = "Hewiki_CSR"
+REPORT_INTERVAL = 60  # seconds
+# =========================================
+
+
+def collect_tree(dump_path, mon):
+    """[(child name, [parent names])] for every category page in the dump.
+
+    Both sides are normalised like scan_page's article categories, so a
+    category has one id whichever page spells it."""
+    pages = []
+    with mon.stage("category_pages") as st:
+        for title, text, is_redirect in iter_pages(dump_path):
+            st.count("pages")
+            child = category_name(title)
+            if not child or is_redirect:
+                continue
+            parents = [p for p in scan_page(text)[1] if p != child]
+            pages.append((child, parents))
+            st.count("categories")
+            st.count("parent_links", len(parents))
+    return pages
+
+
+def build_tree(pages, names):
+    """Child -> parent CSR over category ids; `names` is extended in place."""
+    name_to_id = {c: i for i, c in enumerate(names)}
+
+    def cid(c):
+        i = name_to_id.get(c)
+        if i is None:
+            i = name_to_id[c] = len(names)
+            names.append(c)
+        return i
+
+    child, parent = [], []
+    for c, parents in pages:
+        ci = cid(c)
+        for p in parents:
+            child.append(ci)
+            parent.append(cid(p))
+    return csr_from_edges(np.array(child, dtype=np.int64), np.array(parent, dtype=np.int64), len(names))
+
+
+def report_cycles(tree_indptr, tree_indices):
+    k = len(tree_indptr) - 1
+    H = sparse.csr_matrix((np.ones(len(tree_indices)), tree_indices, tree_indptr), shape=(k, k))
+    _, labels = connected_components(H, directed=True, connection="strong")
+    sizes = np.bincount(labels)
+    cyclic = sizes[sizes > 1]
+    print(f"Category cycles: {len(cyclic):,} strongly connected groups "
+          f"covering {int(cyclic.sum()):,} categories")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Parse the category tree into a CSR bundle")
+    ap.add_argument("--dump", default=DUMP_PATH)
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    args = ap.parse_args()
+
+    G = load_graph(args.graph)
+    cats = load_categories(args.graph)
+    if cats is None:
+        sys.exit(f"{args.graph} has no article categories; build it with Build/CsrBuild.py first")
+    cat_indptr, cat_indices, cat_names = cats
+    # a tree built before appended its own names after the article categories;
+    # drop them so a rerun starts from the article categories again
+    n_article_cats = int(cat_indices.max()) + 1 if len(cat_indices) else 0
+    names = list(cat_names)[:n_article_cats]
+
+    mon = Monitor("CategoryTreeBuild", interval=REPORT_INTERVAL)
+    pages = collect_tree(args.dump, mon)
+    with mon.stage("save"):
+        tree_indptr, tree_indices = build_tree(pages, names)
+        # appended names only; existing article -> category ids stay valid
+        save_categories(args.graph, cat_indptr, cat_indices, names)
+        save_category_tree(args.graph, tree_indptr, tree_indices)
+    mon.close()
+
+    roots = int((np.diff(tree_indptr) == 0).sum())
+    print("Done.")
+    print(f"Article nodes: {G.n:,}")
+    print(f"Category pages: {len(pages):,} | categories: {len(names):,} "
+          f"({len(names) - n_article_cats:,} used by no article)")
+    print(f"Parent links: {len(tree_indices):,} | categories without a parent: {roots:,}")
+    report_cycles(tree_indptr, tree_indices)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Hewiki XML → CSR bundle (see Common/GraphStore.py)
+
+Same two passes as BaseBuild.py / AlmostFullCategoryBuild.py (namespace 0,
+redirects skipped, categories parsed from the page text), but edges are
+collected into integer arrays instead of a networkx DiGraph, so the result can
+be loaded by the CSR kernels in Analysis/ without going through Python objects.
+Each page is tokenized once (Common.DumpParse.scan_page): link targets are
+title-normalised and the number of times a page links a target is kept as a
+uint16 edge weight (weights.npy).
+
+An existing gpickle (e.g. Hewiki_CategoryGraph.gpickle) can be converted
+instead of re-reading the dump.
+
+For wikis whose edge list does not fit in RAM (enwiki), --spill-dir writes
+edges to disk in chunks and assembles the CSR out of core; only titles and
+per-node arrays stay in memory.
+
+Run:
+  python Build/CsrBuild.py                         # from DUMP_PATH
+  python Build/CsrBuild.py --dump enwiki-latest-pages-articles.xml.bz2 --out Enwiki_CSR --spill-dir /scratch/edges
+  python Build/CsrBuild.py --gpickle Hewiki_CategoryGraph.gpickle
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.DumpParse import iter_pages, is_namespace0, scan_page
+from Common.GraphStore import CSRGraph, EdgeSpool, csr_from_edges, save_graph, save_categories, SPILL_EDGES
+from Common.Instrument import Monitor
+
+# ================= CONFIG =================
+DUMP_PATH = r"hewiki-latest-pages-articles.xml.bz2"
+OUTPUT_DIR = "Hewiki_CSR"
+REPORT_INTERVAL = 60  # seconds
+METRICS_LOG = "CsrBuild.metrics.jsonl"
+PROM_PATH = "CsrBuild.prom"
+SPILL_DIR = None      # set (or --spill-dir) to build without holding the edge list in RAM
+# =========================================
+
+
+class Categories:
+    """Node -> category id lists, accumulated as flat arrays."""
+
+    def __init__(self):
+        self.name_to_id = {}
+        self.names = []
+        self.nodes = []
+        self.cats = []
+
+    def add(self, node, cats):
+        for c in cats:
+            cid = self.name_to_id.get(c)
+            if cid is None:
+                cid = self.name_to_id[c] = len(self.names)
+                self.names.append(c)
+            self.nodes.append(node)
+            self.cats.append(cid)
+
+    def csr(self, n):
+        return csr_from_edges(np.array(self.nodes, dtype=np.int64),
+                              np.array(self.cats, dtype=np.int64), n)
+
+
+def build_from_dump(dump_path, mon, out_dir=OUTPUT_DIR, spill_dir=SPILL_DIR, spill_edges=SPILL_EDGES):
+    print("Pass 1 – collecting article titles (namespace 0, skipping redirects)")
+    existing_titles = set()
+    redirects = 0
+    with mon.stage("pass1_titles") as st:
+        for title, text, is_redirect in iter_pages(dump_path):
+            st.count("pages")
+            if not is_namespace0(title):
+                continue
+            if is_redirect:
+                redirects += 1
+                continue
+            existing_titles.add(title)
+            st.count("articles")
+
+    print(f"Articles kept: {len(existing_titles):,}")
+    print(f"Redirects skipped: {redirects:,}")
+
+    print("Pass 2 – collecting edges and categories")
+    title_to_id = {}
+    titles = []
+    edges = EdgeSpool(spill_dir, spill_edges, weighted=True)
+    categories = Categories()
+
+    def node_id(t):
+        i = title_to_id.get(t)
+        if i is None:
+            i = title_to_id[t] = len(titles)
+            titles.append(t)
+        return i
+
+    with mon.stage("pass2_edges", total=len(existing_titles), unit="articles") as st:
+        for title, text, is_redirect in iter_pages(dump_path):
+            if not is_namespace0(title) or is_redirect:
+                continue
+            if title not in existing_titles:
+                continue
+
+            s = node_id(title)
+            with st.time("scan"):
+                links, cats = scan_page(text)
+            categories.add(s, cats)
+
+            targets, counts = [], []
+            for tgt, k in links.items():
+                if is_namespace0(tgt) and tgt in existing_titles:
+                    targets.append(node_id(tgt))
+                    counts.append(k)
+            edges.add(s, targets, counts)
+
+            st.count("articles")
+            st.count("edges", len(targets))
+
+    n = len(titles)
+    with mon.stage("csr"):
+        indptr, indices, weights = edges.to_csr(n, out_dir)
+    edges.cleanup()
+    return CSRGraph(indptr, indices, titles=titles, weights=weights), categories
+
+
+def build_from_gpickle(pickle_path):
+    import pickle
+    with open(pickle_path, "rb") as f:
+        G = pickle.load(f)
+
+    nodes = list(G.nodes())
+    node_index = {v: i for i, v in enumerate(nodes)}
+    titles = [str(G.nodes[v].get("title", v)) for v in nodes]
+
+    src = np.fromiter((node_index[u] for u, _ in G.edges()), dtype=np.int64, count=G.number_of_edges())
+    dst = np.fromiter((node_index[v] for _, v in G.edges()), dtype=np.int64, count=G.number_of_edges())
+
+    categories = Categories()
+    for i, v in enumerate(nodes):
+        cats = G.nodes[v].get("categories", "")
+        if cats:
+            categories.add(i, cats.split("||"))
+
+    indptr, indices = csr_from_edges(src, dst, len(nodes))
+    return CSRGraph(indptr, indices, titles=titles), categories
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dump", default=DUMP_PATH)
+    ap.add_argument("--gpickle", help="convert an existing networkx gpickle instead of the dump")
+    ap.add_argument("--out", default=OUTPUT_DIR)
+    ap.add_argument("--spill-dir", default=SPILL_DIR, help="spill edges here and build the CSR out of core")
+    ap.add_argument("--spill-edges", type=int, default=SPILL_EDGES, help="edges per spilled chunk")
+    args = ap.parse_args()
+
+    mon = Monitor("CsrBuild", jsonl_path=METRICS_LOG, prom_path=PROM_PATH, interval=REPORT_INTERVAL)
+    if args.gpickle:
+        with mon.stage("convert"):
+            G, categories = build_from_gpickle(args.gpickle)
+        source = os.path.basename(args.gpickle)
+    else:
+        G, categories = build_from_dump(args.dump, mon, args.out, args.spill_dir, args.spill_edges)
+        source = os.path.basename(args.dump)
+
+    print(f"Saving bundle to {args.out}/ …")
+    with mon.stage("save"):
+        save_graph(args.out, G, meta={"source": source, "ordering": "dump"})
+        cat_indptr, cat_indices = categories.csr(G.n)
+        save_categories(args.out, cat_indptr, cat_indices, categories.names)
+    mon.close()
+
+    print("Done.")
+    print(f"Final node count: {G.n:,}")
+    print(f"Final edge count: {G.m:,}")
+    print(f"Categories: {len(categories.names):,} (memberships: {len(cat_indices):,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Locality-improving node reordering for a CSR bundle.
+
+CsrBuild.py hands out ids in dump order, so neighbor lists point all over
+memory. This step computes a permutation, rewrites the CSR arrays, title
+table, categories and every metric column with it, and keeps the map back to
+the original ids (node_order.npy: new id -> dump id).
+
+Orderings:
+  degree  – descending total degree (hubs packed together)
+  bfs     – BFS order over the undirected graph, component by component,
+            each started from its highest-degree node
+  rcm     – reverse Cuthill–McKee (scipy), bandwidth-minimising
+  rabbit  – Rabbit-order style: nodes grouped by community (taken from the
+            metric store, or computed with label propagation), communities
+            laid out largest first, hubs first inside each community
+
+Run:
+  python Build/Reorder.py --graph Hewiki_CSR --method rabbit --out Hewiki_CSR_rabbit
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order, connected_components, reverse_cuthill_mckee
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import (CSRGraph, index_dtype, load_graph, save_graph, load_meta,
+                               load_categories, save_categories, csr_from_edges,
+                               list_metrics, read_metric, write_metric)
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+METHODS = ("degree", "bfs", "rcm", "rabbit")
+ORDER_FILE = "node_order.npy"
+# =========================================
+
+
+# ---------- orderings (each returns order[new] = old) ----------
+
+def order_degree(G):
+    deg = G.out_degree() + G.in_degree()
+    return np.argsort(-deg, kind="stable")
+
+
+def order_bfs(G):
+    """One traversal for all components: a virtual root linked to each component's
+    highest-degree node. Each component's nodes keep their relative order in the
+    shared FIFO queue, i.e. the order of a BFS from its own root; isolated nodes
+    need no search and go last."""
+    U = G.symmetrized().to_scipy().tocsr()
+    n = G.n
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    deg = np.diff(U.indptr)
+    ncomp, label = connected_components(U, directed=False)
+    by_deg = np.argsort(-deg, kind="stable")
+    _, first = np.unique(label[by_deg], return_index=True)   # per component: rank of its root
+    roots = by_deg[first]
+    big = np.bincount(label, minlength=ncomp) > 1
+    link = sp.csr_matrix((np.ones(int(big.sum())), (np.zeros(int(big.sum()), dtype=np.int64), roots[big])),
+                         shape=(1, n))
+    A = sp.bmat([[U, sp.csr_matrix((n, 1))], [link, sp.csr_matrix((1, 1))]], format="csr")
+    order = breadth_first_order(A, n, directed=True, return_predecessors=False)[1:]
+    order = order[np.argsort(first[label[order]], kind="stable")]
+    isolated = np.nonzero(~big[label])[0]
+    return np.concatenate([order, isolated]).astype(np.int64)
+
+
+def order_rcm(G):
+    return reverse_cuthill_mckee(G.symmetrized().to_scipy().tocsr(), symmetric_mode=True)
+
+
+def order_rabbit(G, communities=None):
+    if communities is None:
+        from Analysis.Communities import label_propagation
+        communities = label_propagation(G.symmetrized())
+    communities = np.asarray(communities)
+    sizes = np.bincount(communities)
+    deg = G.out_degree() + G.in_degree()
+    # last key is primary: community size (desc), community id, degree (desc)
+    return np.lexsort((-deg, communities, -sizes[communities]))
+
+
+def compute_order(G, method):
+    if method == "degree":
+        return order_degree(G)
+    if method == "bfs":
+        return order_bfs(G)
+    if method == "rcm":
+        return order_rcm(G)
+    if method == "rabbit":
+        comm = None
+        if G.path:
+            for name in ("community_louvain", "community_lpa"):
+                if name in list_metrics(G.path):
+                    comm = read_metric(G.path, name)
+                    break
+        return order_rabbit(G, comm)
+    raise ValueError(f"unknown ordering: {method}")
+
+
+# ---------- applying a permutation ----------
+
+def inverse_permutation(order):
+    inv = np.empty_like(order)
+    inv[order] = np.arange(len(order), dtype=order.dtype)
+    return inv
+
+
+def permute_csr(indptr, indices, order, inv, weights=None, relabel_columns=True):
+    """Rows taken in `order`, column ids mapped through `inv`, rows re-sorted."""
+    n = len(order)
+    lens = np.diff(indptr)[order]
+    new_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lens, out=new_indptr[1:])
+    starts = np.asarray(indptr[:-1], dtype=np.int64)[order]
+    pos = np.repeat(starts - new_indptr[:-1], lens) + np.arange(new_indptr[-1])
+    cols = np.asarray(indices)[pos]
+    if relabel_columns:
+        cols = inv[cols]
+    rows = np.repeat(np.arange(n, dtype=np.int64), lens)
+    # keep neighbor lists sorted (rows are already in order)
+    sort = np.lexsort((cols, rows))
+    new_indices = cols[sort].astype(index_dtype(max(n, int(cols.max(initial=0)) + 1)))
+    new_weights = None if weights is None else np.asarray(weights)[pos][sort]
+    return new_indptr, new_indices, new_weights
+
+
+def apply_order(G, order):
+    order = np.asarray(order, dtype=np.int64)
+    inv = inverse_permutation(order)
+    indptr, indices, weights = permute_csr(G.indptr, G.indices, order, inv, G.weights)
+    titles = [G.titles[int(v)] for v in order] if G.titles is not None else None
+    return CSRGraph(indptr, indices, titles=titles, weights=weights), inv
+
+
+def reorder_bundle(src_dir, out_dir, method):
+    G = load_graph(src_dir)
+    meta = load_meta(src_dir)
+    print(f"Computing {method} ordering for {G.n:,} nodes / {G.m:,} edges…")
+    order = compute_order(G, method)
+    H, inv = apply_order(G, order)
+
+    # compose with an earlier reordering so node_order always points at dump ids
+    prev_path = os.path.join(src_dir, ORDER_FILE)
+    base = np.load(prev_path) if os.path.exists(prev_path) else np.arange(G.n, dtype=np.int64)
+
+    meta["ordering"] = method
+    save_graph(out_dir, H, meta=meta)
+    np.save(os.path.join(out_dir, ORDER_FILE), base[order])
+
+    cats = load_categories(src_dir)
+    if cats is not None:
+        cat_indptr, cat_indices, cat_names = cats
+        ci, cx, _ = permute_csr(cat_indptr, cat_indices, order, inv, relabel_columns=False)
+        save_categories(out_dir, ci, cx, list(cat_names))
+
+    for name in list_metrics(src_dir):
+        write_metric(out_dir, name, read_metric(src_dir, name)[order])
+
+    # any other per-bundle files are copied untouched
+    for f in os.listdir(src_dir):
+        p = os.path.join(src_dir, f)
+        if os.path.isfile(p) and not os.path.exists(os.path.join(out_dir, f)):
+            shutil.copy2(p, out_dir)
+
+    return order, inv
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Reorder a CSR bundle for memory locality")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--method", choices=METHODS, default="rabbit")
+    ap.add_argument("--out", help="output bundle (default: <graph>_<method>)")
+    args = ap.parse_args()
+
+    out = args.out or f"{args.graph.rstrip('/')}_{args.method}"
+    if os.path.abspath(out) == os.path.abspath(args.graph):
+        sys.exit("Refusing to reorder in place; pick a different --out")
+    reorder_bundle(args.graph, out, args.method)
+    print(f"Done. Reordered bundle written to {out}/")
+
+
+if __name__ == "__main__":
+    main()
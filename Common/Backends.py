@@ -0,0 +1,756 @@
+"""
+Pluggable compute backends for the Analysis scripts.
+
+Each metric registers one implementation per backend:
+
+  networkx  reference implementations (pure Python, slow)
+  igraph    igraph's C core
+  native    vectorised NumPy / SciPy kernels over the CSR arrays
+  numba     compiled loops over the CSR arrays (only if numba is installed, and
+            only for metrics with an @njit kernel)
+  python    plain-Python loops over igraph's adjacency lists, where igraph has
+            no primitive for the metric (cross-checks on small graphs only)
+
+A GraphSource wraps one graph file (gpickle, GraphML or a CSR bundle
+directory) and hands each backend the representation it needs, converting
+lazily and only once. Whatever the backend, results are NumPy arrays in the
+node order of the file, so they can be compared directly
+(Bench/BackendCheck.py).
+
+File names are matched case-insensitively, so hewiki_BaseGraph.graphml and
+Hewiki_BaseGraph.graphml both resolve to whichever exists.
+
+open_graph(path, kcore=k) restricts the graph to its k-core first (the
+periphery rarely matters for top lists of the expensive metrics).
+
+Usage:
+  from Common.Backends import open_graph, compute, add_backend_argument
+  src = open_graph("hewiki_basegraph.gpickle")
+  pr = compute("pagerank", "native", src, alpha=0.85)
+"""
+
+import os
+import pickle
+import numpy as np
+
+from Common.GraphStore import CSRGraph, csr_from_edges, load_graph, read_metric, list_metrics
+from Common.Traversal import bfs_levels, expand
+from Common.Triads import triad_census, TRIAD_NAMES
+from Common.Cores import core_numbers, MODES
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("networkx", "igraph", "native", "numba", "python")
+IMPLEMENTATIONS = {}   # metric -> {backend: function(src, **params)}
+IG_SOURCE_BATCH = 32   # sources per igraph distances() call (rows are |targets| long)
+
+
+# ================= GRAPH FILES =================
+
+def resolve_graph_path(path):
+    """`path`, or the entry of its directory whose name matches it ignoring case."""
+    if os.path.exists(path):
+        return path
+    folder, name = os.path.split(path)
+    folder = folder or "."
+    if os.path.isdir(folder):
+        for entry in sorted(os.listdir(folder)):
+            if entry.lower() == name.lower():
+                return os.path.join(folder, entry)
+    raise FileNotFoundError(f"no graph file matching {path!r} (case-insensitive)")
+
+
+class GraphSource:
+    """One graph, available as CSRGraph / networkx / igraph on demand."""
+
+    def __init__(self, path, csr=None):
+        if csr is not None:
+            # an in-memory view (e.g. a k-core) of the graph at `path`
+            self.path, self.kind = path, "view"
+        else:
+            self.path = resolve_graph_path(path)
+            if os.path.isdir(self.path):
+                self.kind = "bundle"
+            elif self.path.lower().endswith(".graphml"):
+                self.kind = "graphml"
+            else:
+                self.kind = "gpickle"
+        self._csr = csr
+        self._nx = None
+        self._ig = None
+        self.nx_nodes = None   # position -> networkx node
+
+    @property
+    def n(self):
+        if self._ig is not None:
+            return self._ig.vcount()
+        if self._nx is not None:
+            return self._nx.number_of_nodes()
+        return self.csr().n
+
+    def csr(self):
+        if self._csr is None:
+            if self.kind == "bundle":
+                self._csr = load_graph(self.path)
+            elif self.kind == "graphml":
+                g = self.igraph()
+                edges = np.array(g.get_edgelist(), dtype=np.int64).reshape(-1, 2)
+                indptr, indices = csr_from_edges(edges[:, 0], edges[:, 1], g.vcount())
+                titles = g.vs["title"] if "title" in g.vs.attributes() else None
+                self._csr = CSRGraph(indptr, indices, titles=titles)
+            else:
+                G = self.networkx()
+                pos = {v: i for i, v in enumerate(self.nx_nodes)}
+                m = G.number_of_edges()
+                src = np.fromiter((pos[u] for u, _ in G.edges()), dtype=np.int64, count=m)
+                dst = np.fromiter((pos[v] for _, v in G.edges()), dtype=np.int64, count=m)
+                indptr, indices = csr_from_edges(src, dst, len(pos))
+                titles = [str(G.nodes[v].get("title", v)) for v in self.nx_nodes]
+                self._csr = CSRGraph(indptr, indices, titles=titles)
+        return self._csr
+
+    def networkx(self):
+        if self._nx is None:
+            import networkx as nx
+            if self.kind == "gpickle":
+                # nx.read_gpickle is gone in networkx 3
+                with open(self.path, "rb") as f:
+                    G = pickle.load(f)
+                if not G.is_directed():
+                    G = G.to_directed()
+            else:
+                C = self.csr()
+                G = nx.DiGraph()
+                G.add_nodes_from((v, {"title": C.title(v)}) for v in range(C.n))
+                G.add_edges_from(zip(C.sources().tolist(), np.asarray(C.indices).tolist()))
+            self._nx = G
+            self.nx_nodes = list(G.nodes())
+        return self._nx
+
+    def igraph(self):
+        if self._ig is None:
+            import igraph as ig
+            if self.kind == "graphml":
+                g = ig.Graph.Read_GraphML(self.path)
+                g.to_directed()
+            else:
+                C = self.csr()
+                g = ig.Graph(n=C.n, edges=np.column_stack([C.sources(), C.indices]).tolist(), directed=True)
+                if C.titles is not None:
+                    g.vs["title"] = list(C.titles)
+            self._ig = g
+        return self._ig
+
+    def load(self, backend):
+        """Load the representation `backend` computes on now, not inside the first compute()."""
+        {"networkx": self.networkx, "igraph": self.igraph, "python": self.igraph}.get(backend, self.csr)()
+        return self
+
+    def titles(self):
+        """Title per node position, from whichever representation is already loaded."""
+        if self._ig is not None and "title" in self._ig.vs.attributes():
+            return self._ig.vs["title"]
+        if self._nx is not None:
+            return [str(self._nx.nodes[v].get("title", v)) for v in self.nx_nodes]
+        C = self.csr()
+        return list(C.titles) if C.titles is not None else [str(v) for v in range(C.n)]
+
+    def nx_array(self, values, default=0.0):
+        """{networkx node: value} -> array in node-position order."""
+        return np.array([values.get(v, default) for v in self.nx_nodes], dtype=np.float64)
+
+    def restrict(self, keep):
+        """View of the subgraph induced by `keep`; results come in its own node order
+        (.csr().ids maps positions back to this graph)."""
+        return GraphSource(self.path, csr=self.csr().subgraph(keep))
+
+
+def coreness(src, mode="total"):
+    """Core numbers, from the bundle's metric store when stored there (Analysis/KCore.py)."""
+    if src.kind == "bundle" and f"core_{mode}" in list_metrics(src.path):
+        return read_metric(src.path, f"core_{mode}")
+    C = src.csr()
+    return core_numbers(C.indptr, C.indices, mode)
+
+
+def open_graph(path, kcore=None, core_mode="total"):
+    """GraphSource for `path`; with kcore=k, restricted to the k-core."""
+    src = GraphSource(path)
+    if kcore:
+        core = coreness(src, core_mode)
+        if core.max() < kcore:
+            raise ValueError(f"the {core_mode} {kcore}-core is empty (degeneracy {int(core.max())})")
+        keep = core >= kcore
+        print(f"Restricting to the {core_mode} {kcore}-core: {int(keep.sum()):,} of {src.n:,} nodes")
+        src = src.restrict(keep)
+    return src
+
+
+def add_kcore_argument(ap):
+    """--kcore / --core-mode for scripts that call open_graph."""
+    ap.add_argument("--kcore", type=int, help="run on the k-core only (nodes with coreness ≥ k)")
+    ap.add_argument("--core-mode", choices=MODES, default="total", help="degree used for --kcore")
+
+
+# ================= REGISTRY =================
+
+def implements(metric, *backends):
+    """Register the decorated function as `metric` for the given backends."""
+    def wrap(fn):
+        for b in backends:
+            IMPLEMENTATIONS.setdefault(metric, {})[b] = fn
+        return fn
+    return wrap
+
+
+def backends_for(metric):
+    return [b for b in BACKENDS if b in IMPLEMENTATIONS.get(metric, {})]
+
+
+def compute(metric, backend, src, **params):
+    impls = IMPLEMENTATIONS.get(metric)
+    if impls is None:
+        raise KeyError(f"unknown metric {metric!r}")
+    if backend not in impls:
+        raise ValueError(f"{metric} has no {backend!r} backend (available: {', '.join(backends_for(metric))})")
+    return impls[backend](src, **params)
+
+
+def add_backend_argument(ap, metrics, default):
+    """--backend restricted to the backends implementing every metric in `metrics`."""
+    choices = [b for b in BACKENDS if all(b in IMPLEMENTATIONS.get(m, {}) for m in metrics)]
+    ap.add_argument("--backend", default=default, choices=choices,
+                    help=f"compute backend (default: {default})")
+
+
+def _sources(src, sources):
+    return np.arange(src.n) if sources is None else np.asarray(sources, dtype=np.int64)
+
+
+def _binary(C, dtype=np.float64):
+    return C.to_scipy(dtype=dtype)
+
+
+# ================= DEGREE =================
+
+@implements("degree", "networkx")
+def _degree_nx(src):
+    G = src.networkx()
+    return (np.array([G.in_degree(v) for v in src.nx_nodes], dtype=np.int64),
+            np.array([G.out_degree(v) for v in src.nx_nodes], dtype=np.int64))
+
+
+@implements("degree", "igraph")
+def _degree_ig(src):
+    g = src.igraph()
+    return np.array(g.indegree(), dtype=np.int64), np.array(g.outdegree(), dtype=np.int64)
+
+
+@implements("degree", "native")
+def _degree_native(src):
+    C = src.csr()
+    return C.in_degree().astype(np.int64), C.out_degree().astype(np.int64)
+
+
+# ================= SPECTRAL =================
+# Native versions follow networkx's formulation and stopping rule
+# (L1 change < n * tol) so the three agree to within tol.
+
+@implements("pagerank", "networkx")
+def _pagerank_nx(src, alpha=0.85, tol=1e-6, max_iter=1000):
+    import networkx as nx
+    return src.nx_array(nx.pagerank(src.networkx(), alpha=alpha, max_iter=max_iter, tol=tol))
+
+
+@implements("pagerank", "igraph")
+def _pagerank_ig(src, alpha=0.85, tol=1e-6, max_iter=1000):
+    return np.array(src.igraph().pagerank(damping=alpha, directed=True))
+
+
+@implements("pagerank", "native")
+def _pagerank_native(src, alpha=0.85, tol=1e-6, max_iter=1000):
+    C = src.csr()
+    n = C.n
+    AT = _binary(C).T.tocsr()
+    out = C.out_degree().astype(np.float64)
+    dangling = out == 0
+    inv_out = np.divide(1.0, out, out=np.zeros(n), where=~dangling)
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        last = x
+        x = alpha * (AT @ (last * inv_out) + last[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(x - last).sum() < n * tol:
+            return x / x.sum()
+    raise RuntimeError(f"PageRank did not converge in {max_iter} iterations")
+
+
+@implements("eigenvector", "networkx")
+def _eigenvector_nx(src, tol=1e-6, max_iter=1000):
+    import networkx as nx
+    return src.nx_array(nx.eigenvector_centrality(src.networkx(), max_iter=max_iter, tol=tol))
+
+
+@implements("eigenvector", "igraph")
+def _eigenvector_ig(src, tol=1e-6, max_iter=1000):
+    x = np.array(src.igraph().eigenvector_centrality(directed=True, scale=False))
+    return x / np.linalg.norm(x)
+
+
+@implements("eigenvector", "native")
+def _eigenvector_native(src, tol=1e-6, max_iter=1000):
+    C = src.csr()
+    n = C.n
+    AT = _binary(C).T.tocsr()
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        last = x
+        x = last + AT @ last      # networkx iterates with A + I
+        x = x / (np.linalg.norm(x) or 1.0)
+        if np.abs(x - last).sum() < n * tol:
+            return x
+    raise RuntimeError(f"eigenvector centrality did not converge in {max_iter} iterations")
+
+
+@implements("katz", "networkx")
+def _katz_nx(src, alpha=0.1, beta=1.0, tol=1e-6, max_iter=1000):
+    import networkx as nx
+    return src.nx_array(nx.katz_centrality(src.networkx(), alpha=alpha, beta=beta,
+                                           max_iter=max_iter, tol=tol))
+
+
+@implements("katz", "native")
+def _katz_native(src, alpha=0.1, beta=1.0, tol=1e-6, max_iter=1000):
+    C = src.csr()
+    n = C.n
+    AT = _binary(C).T.tocsr()
+    x = np.zeros(n)
+    for _ in range(max_iter):
+        last = x
+        x = alpha * (AT @ last) + beta
+        if np.abs(x - last).sum() < n * tol:
+            return x / np.linalg.norm(x)
+    raise RuntimeError(f"Katz did not converge in {max_iter} iterations "
+                       f"(alpha={alpha} must be below 1 / largest eigenvalue)")
+
+
+# ================= PATHS =================
+
+@implements("betweenness", "networkx")
+def _betweenness_nx(src, sources=None):
+    """Unnormalised directed betweenness, summed over `sources` (all by default)."""
+    from networkx.algorithms.centrality.betweenness import _single_source_shortest_path_basic
+    G = src.networkx()
+    pos = {v: i for i, v in enumerate(src.nx_nodes)}
+    bet = np.zeros(len(pos))
+    for i in _sources(src, sources):
+        s = src.nx_nodes[i]
+        S, P, sigma, _ = _single_source_shortest_path_basic(G, s)
+        delta = dict.fromkeys(S, 0.0)
+        while S:
+            w = S.pop()
+            for v in P[w]:
+                delta[v] += (sigma[v] / sigma[w]) * (1 + delta[w])
+            if w != s:
+                bet[pos[w]] += delta[w]
+    return bet
+
+
+@implements("betweenness", "igraph")
+def _betweenness_ig(src, sources=None):
+    g = src.igraph()
+    if sources is None:
+        return np.array(g.betweenness(directed=True))
+    return np.array(g.betweenness(directed=True, sources=[int(s) for s in sources]))
+
+
+@implements("betweenness", "native")
+def _betweenness_native(src, sources=None):
+    """Brandes with each BFS level and its dependency sweep done as array operations."""
+    C = src.csr()
+    n = C.n
+    bet = np.zeros(n)
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    delta = np.zeros(n)
+    for s in _sources(src, sources):
+        dist[s], sigma[s] = 0, 1.0
+        visited = [np.array([s])]
+        levels = []                    # (parent, child) DAG edges per level
+        frontier = visited[0]
+        depth = 0
+        while frontier.size:
+            nbrs, owner = expand(C.indptr, C.indices, frontier)
+            fresh = np.unique(nbrs[dist[nbrs] < 0])
+            dist[fresh] = depth + 1
+            on_dag = dist[nbrs] == depth + 1
+            parent, child = owner[on_dag], nbrs[on_dag]
+            np.add.at(sigma, child, sigma[parent])
+            levels.append((parent, child))
+            visited.append(fresh)
+            frontier = fresh
+            depth += 1
+        for parent, child in reversed(levels):
+            np.add.at(delta, parent, sigma[parent] / sigma[child] * (1 + delta[child]))
+        seen = np.concatenate(visited)
+        bet[seen] += delta[seen]
+        bet[s] -= delta[s]
+        dist[seen], sigma[seen], delta[seen] = -1, 0.0, 0.0
+    return bet
+
+
+@implements("harmonic", "networkx")
+def _harmonic_nx(src, sources=None):
+    """Out-harmonic closeness sum(1 / d(s, t)) for each source (0 for nodes not in `sources`)."""
+    import networkx as nx
+    G = src.networkx()
+    h = np.zeros(src.n)
+    for i in _sources(src, sources):
+        lengths = nx.single_source_shortest_path_length(G, src.nx_nodes[i])
+        h[i] = sum(1.0 / d for d in lengths.values() if d > 0)
+    return h
+
+
+@implements("harmonic", "igraph")
+def _harmonic_ig(src, sources=None):
+    s = _sources(src, sources)
+    h = np.zeros(src.n)
+    h[s] = src.igraph().harmonic_centrality(vertices=s.tolist(), mode="out", normalized=False)
+    return h
+
+
+@implements("harmonic", "native")
+def _harmonic_native(src, sources=None):
+    C = src.csr()
+    h = np.zeros(C.n)
+    for s in _sources(src, sources):
+        d = bfs_levels(C.indptr, C.indices, int(s))
+        d = d[d > 0]
+        h[s] = (1.0 / d).sum()
+    return h
+
+
+@implements("distance_histogram", "networkx")
+def _distances_nx(src, sources=None, within=None):
+    """counts[d] = reachable (source, target) pairs at distance d > 0, targets restricted to `within`."""
+    import networkx as nx
+    G = src.networkx()
+    pos = {v: i for i, v in enumerate(src.nx_nodes)}
+    counts = {}
+    for i in _sources(src, sources):
+        for t, d in nx.single_source_shortest_path_length(G, src.nx_nodes[i]).items():
+            if d > 0 and (within is None or within[pos[t]]):
+                counts[d] = counts.get(d, 0) + 1
+    hist = np.zeros(max(counts, default=0) + 1, dtype=np.int64)
+    for d, c in counts.items():
+        hist[d] = c
+    return hist
+
+
+@implements("distance_histogram", "igraph")
+def _distances_ig(src, sources=None, within=None):
+    """Distance rows for IG_SOURCE_BATCH sources at a time, each folded into the histogram."""
+    g = src.igraph()
+    targets = None if within is None else np.nonzero(within)[0].tolist()
+    sources = _sources(src, sources)
+    hist = np.zeros(1, dtype=np.int64)
+    for a in range(0, len(sources), IG_SOURCE_BATCH):
+        D = np.array(g.distances(source=sources[a:a + IG_SOURCE_BATCH].tolist(), target=targets, mode="out"))
+        hist = _add_hist(hist, np.bincount(D[np.isfinite(D) & (D > 0)].astype(np.int64), minlength=1))
+    return hist
+
+
+@implements("distance_histogram", "native")
+def _distances_native(src, sources=None, within=None):
+    C = src.csr()
+    hist = np.zeros(1, dtype=np.int64)
+    for s in _sources(src, sources):
+        d = bfs_levels(C.indptr, C.indices, int(s))
+        keep = d > 0 if within is None else (d > 0) & within
+        hist = _add_hist(hist, np.bincount(d[keep]))
+    return hist
+
+
+def _add_hist(a, b):
+    if len(b) > len(a):
+        a, b = b, a
+    a = a.copy()
+    a[:len(b)] += b
+    return a
+
+
+@implements("largest_component", "networkx")
+def _largest_nx(src, mode="strong"):
+    import networkx as nx
+    G = src.networkx()
+    comps = nx.strongly_connected_components(G) if mode == "strong" else nx.weakly_connected_components(G)
+    best = max(comps, key=len)
+    return np.array([v in best for v in src.nx_nodes])
+
+
+@implements("largest_component", "igraph")
+def _largest_ig(src, mode="strong"):
+    membership = np.array(src.igraph().connected_components(mode=mode.upper()).membership)
+    return membership == np.argmax(np.bincount(membership))
+
+
+@implements("largest_component", "native")
+def _largest_native(src, mode="strong"):
+    from scipy.sparse.csgraph import connected_components
+    _, labels = connected_components(_binary(src.csr()), directed=True, connection=mode)
+    return labels == np.argmax(np.bincount(labels))
+
+
+# ================= CLUSTERING =================
+# ClusteringDirected.py's definition: the neighbours of v are its in- and
+# out-neighbours together (k of them); C_v = ordered neighbour pairs u -> w
+# that are linked / k(k-1). Self loops are ignored.
+
+@implements("clustering_directed", "python")
+def _clustering_py(src):
+    g = src.igraph()
+    n = g.vcount()
+    out = [set(g.neighbors(v, mode="OUT")) - {v} for v in range(n)]
+    local = np.zeros(n)
+    num = den = 0
+    for v in range(n):
+        neigh = (set(g.neighbors(v, mode="IN")) | out[v]) - {v}
+        k = len(neigh)
+        if k < 2:
+            continue
+        tri = sum(len(neigh & out[u]) for u in neigh)
+        local[v] = tri / (k * (k - 1))
+        num += tri
+        den += k * (k - 1)
+    return local, (num / den if den else 0.0)
+
+
+@implements("clustering_directed", "networkx")
+def _clustering_nx(src):
+    G = src.networkx()
+    pos = {v: i for i, v in enumerate(src.nx_nodes)}
+    local = np.zeros(len(pos))
+    num = den = 0
+    for v in src.nx_nodes:
+        neigh = (set(G.pred[v]) | set(G.succ[v])) - {v}
+        k = len(neigh)
+        if k < 2:
+            continue
+        tri = sum(len(neigh.intersection(G.succ[u])) - (u in G.succ[u]) for u in neigh)
+        local[pos[v]] = tri / (k * (k - 1))
+        num += tri
+        den += k * (k - 1)
+    return local, (num / den if den else 0.0)
+
+
+@implements("clustering_directed", "native")
+def _clustering_native(src):
+    """tri_v = (U·A·U)[v, v] with U the undirected neighbour matrix."""
+    C = src.csr()
+    from scipy import sparse
+    A = _binary(C)
+    A = (A - sparse.diags(A.diagonal())).tocsr()
+    A.eliminate_zeros()
+    U = ((A + A.T) > 0).astype(np.float64)
+    tri = np.asarray((U @ A).multiply(U).sum(axis=1)).ravel()
+    k = np.asarray(U.sum(axis=1)).ravel()
+    den = k * (k - 1)
+    local = np.divide(tri, den, out=np.zeros(C.n), where=den > 0)
+    return local, (tri.sum() / den.sum() if den.sum() else 0.0)
+
+
+# ================= TRIADS =================
+# 16-type directed census in TRIAD_NAMES order; self loops are ignored.
+
+@implements("triad_census", "networkx")
+def _triads_nx(src):
+    import networkx as nx
+    G = src.networkx().copy()
+    G.remove_edges_from(nx.selfloop_edges(G))
+    census = nx.triadic_census(G)
+    return np.array([census[name] for name in TRIAD_NAMES], dtype=np.int64)
+
+
+@implements("triad_census", "igraph")
+def _triads_ig(src):
+    return np.array(list(src.igraph().triad_census()), dtype=np.int64)
+
+
+@implements("triad_census", "native")
+def _triads_native(src):
+    C = src.csr()
+    return np.array(triad_census(C.indptr, C.indices, "native")[0], dtype=np.int64)
+
+
+# ================= CORES =================
+# coreness by total / in / out degree, self loops ignored
+
+@implements("core_number", "networkx")
+def _cores_nx(src, mode="total"):
+    import networkx as nx
+    if mode != "total":
+        raise ValueError("networkx only has total-degree cores")
+    G = src.networkx().copy()
+    G.remove_edges_from(nx.selfloop_edges(G))
+    return src.nx_array(nx.core_number(G)).astype(np.int64)
+
+
+@implements("core_number", "igraph")
+def _cores_ig(src, mode="total"):
+    g = src.igraph().copy()
+    g.simplify(multiple=True, loops=True)
+    return np.array(g.coreness(mode={"total": "all", "in": "in", "out": "out"}[mode]), dtype=np.int64)
+
+
+@implements("core_number", "native")
+def _cores_native(src, mode="total"):
+    C = src.csr()
+    return core_numbers(C.indptr, C.indices, mode, engine="native")
+
+
+# ================= NUMBA =================
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _nb_bfs(indptr, indices, s, dist, order):
+        """BFS from s into dist / order; returns the number of nodes reached."""
+        dist[s] = 0
+        order[0] = s
+        head, tail = 0, 1
+        while head < tail:
+            v = order[head]
+            head += 1
+            for k in range(indptr[v], indptr[v + 1]):
+                w = indices[k]
+                if dist[w] < 0:
+                    dist[w] = dist[v] + 1
+                    order[tail] = w
+                    tail += 1
+        return tail
+
+    @numba.njit(cache=True)
+    def _nb_brandes(indptr, indices, sources, n):
+        bet = np.zeros(n)
+        dist = np.full(n, -1, np.int64)
+        sigma = np.zeros(n)
+        delta = np.zeros(n)
+        order = np.empty(n, np.int64)
+        for s in sources:
+            reached = _nb_bfs(indptr, indices, s, dist, order)
+            sigma[s] = 1.0
+            for i in range(reached):
+                v = order[i]
+                for k in range(indptr[v], indptr[v + 1]):
+                    w = indices[k]
+                    if dist[w] == dist[v] + 1:
+                        sigma[w] += sigma[v]
+            # dependencies through successors, deepest level first
+            for i in range(reached - 1, -1, -1):
+                v = order[i]
+                acc = 0.0
+                for k in range(indptr[v], indptr[v + 1]):
+                    w = indices[k]
+                    if dist[w] == dist[v] + 1:
+                        acc += sigma[v] / sigma[w] * (1.0 + delta[w])
+                delta[v] = acc
+                if v != s:
+                    bet[v] += acc
+            for i in range(reached):
+                v = order[i]
+                dist[v] = -1
+                sigma[v] = 0.0
+                delta[v] = 0.0
+        return bet
+
+    @numba.njit(cache=True)
+    def _nb_distances(indptr, indices, sources, within, n):
+        """(harmonic per source, distance histogram) over targets in `within`."""
+        dist = np.full(n, -1, np.int64)
+        order = np.empty(n, np.int64)
+        harmonic = np.zeros(n)
+        hist = np.zeros(n + 1, np.int64)
+        for s in sources:
+            reached = _nb_bfs(indptr, indices, s, dist, order)
+            for i in range(1, reached):
+                v = order[i]
+                harmonic[s] += 1.0 / dist[v]
+                if within[v]:
+                    hist[dist[v]] += 1
+            for i in range(reached):
+                dist[order[i]] = -1
+        return harmonic, hist
+
+    @numba.njit(cache=True)
+    def _nb_clustering(indptr, indices, t_indptr, t_indices, n):
+        local = np.zeros(n)
+        stamp = np.full(n, -1, np.int64)
+        neigh = np.empty(n, np.int64)
+        num = 0.0
+        den = 0.0
+        for v in range(n):
+            k = 0
+            for j in range(indptr[v], indptr[v + 1]):
+                u = indices[j]
+                if u != v and stamp[u] != v:
+                    stamp[u] = v
+                    neigh[k] = u
+                    k += 1
+            for j in range(t_indptr[v], t_indptr[v + 1]):
+                u = t_indices[j]
+                if u != v and stamp[u] != v:
+                    stamp[u] = v
+                    neigh[k] = u
+                    k += 1
+            if k < 2:
+                continue
+            tri = 0
+            for a in range(k):
+                u = neigh[a]
+                for j in range(indptr[u], indptr[u + 1]):
+                    w = indices[j]
+                    if w != u and stamp[w] == v:
+                        tri += 1
+            local[v] = tri / (k * (k - 1))
+            num += tri
+            den += k * (k - 1)
+        return local, (num / den if den > 0 else 0.0)
+
+    @implements("betweenness", "numba")
+    def _betweenness_numba(src, sources=None):
+        C = src.csr()
+        return _nb_brandes(np.asarray(C.indptr), np.asarray(C.indices), _sources(src, sources), C.n)
+
+    @implements("harmonic", "numba")
+    def _harmonic_numba(src, sources=None):
+        C = src.csr()
+        h, _ = _nb_distances(np.asarray(C.indptr), np.asarray(C.indices), _sources(src, sources),
+                             np.ones(C.n, dtype=np.bool_), C.n)
+        return h
+
+    @implements("distance_histogram", "numba")
+    def _distances_numba(src, sources=None, within=None):
+        C = src.csr()
+        within = np.ones(C.n, dtype=np.bool_) if within is None else np.asarray(within, dtype=np.bool_)
+        _, hist = _nb_distances(np.asarray(C.indptr), np.asarray(C.indices), _sources(src, sources),
+                                within, C.n)
+        return np.trim_zeros(hist, "b") if hist.any() else hist[:1]
+
+    @implements("clustering_directed", "numba")
+    def _clustering_numba(src):
+        C = src.csr()
+        T = C.transpose()
+        return _nb_clustering(np.asarray(C.indptr), np.asarray(C.indices),
+                              np.asarray(T.indptr), np.asarray(T.indices), C.n)
+
+    @implements("triad_census", "numba")
+    def _triads_numba(src):
+        C = src.csr()
+        return np.array(triad_census(C.indptr, C.indices, "numba")[0], dtype=np.int64)
+
+    @implements("core_number", "numba")
+    def _cores_numba(src, mode="total"):
+        C = src.csr()
+        return core_numbers(C.indptr, C.indices, mode, engine="numba")
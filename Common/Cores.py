@@ -0,0 +1,134 @@
+"""
+k-core decomposition over CSR arrays.
+
+The k-core is the largest subgraph in which every node keeps degree ≥ k; a
+node's coreness is the largest k whose core contains it. For a directed graph
+"degree" is one of
+
+  total  in + out degree (a mutual pair counts twice; networkx's core_number)
+  in     in-degree: removing v lowers the degree of its out-neighbours
+  out    out-degree: removing v lowers the degree of its in-neighbours
+
+Self loops are ignored. Two engines:
+
+  numba   Batagelj & Zaveršnik's bucket algorithm, O(n + m): nodes sit in an
+          array sorted by current degree, and dropping a neighbour's degree
+          is a swap to the front of its bucket
+  native  level peeling with array operations: remove every node of degree
+          ≤ k at once, lower its neighbours' degrees, repeat on the nodes
+          that dropped to ≤ k; raise k when nothing is left at k
+"""
+
+import numpy as np
+
+from Common.GraphStore import csr_from_edges
+from Common.Traversal import expand
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+MODES = ("total", "in", "out")
+
+
+def _loop_free(indptr, indices):
+    """(out CSR, in CSR) without self loops."""
+    n = len(indptr) - 1
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(np.asarray(indptr)))
+    dst = np.asarray(indices, dtype=np.int64)
+    keep = src != dst
+    out = csr_from_edges(src[keep], dst[keep], n, dedupe=False)
+    inn = csr_from_edges(dst[keep], src[keep], n, dedupe=False)
+    return out, inn
+
+
+def _setup(indptr, indices, mode):
+    """Initial degrees and the lists whose degrees drop when a node goes."""
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    (oi, ox), (ii, ix) = _loop_free(indptr, indices)
+    if mode == "in":
+        return np.diff(ii), [(oi, ox)]
+    if mode == "out":
+        return np.diff(oi), [(ii, ix)]
+    return np.diff(oi) + np.diff(ii), [(oi, ox), (ii, ix)]
+
+
+def core_numbers_native(indptr, indices, mode="total"):
+    deg, lists = _setup(indptr, indices, mode)
+    n = len(deg)
+    core = np.full(n, -1, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+    left = n
+    k = 0
+    while left:
+        k = max(k, int(deg[alive].min()))
+        frontier = np.nonzero(alive & (deg <= k))[0]
+        while frontier.size:
+            core[frontier] = k
+            alive[frontier] = False
+            left -= len(frontier)
+            nbrs = np.concatenate([expand(ip, ix, frontier)[0] for ip, ix in lists])
+            nbrs = nbrs[alive[nbrs]]
+            touched, drop = np.unique(nbrs, return_counts=True)
+            deg[touched] -= drop
+            frontier = touched[deg[touched] <= k]
+    return core
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _nb_cores(deg, a_indptr, a_indices, b_indptr, b_indices, use_b):
+        n = len(deg)
+        md = 0
+        for v in range(n):
+            md = max(md, deg[v])
+        start = np.zeros(md + 2, np.int64)
+        for v in range(n):
+            start[deg[v] + 1] += 1
+        for d in range(md + 1):
+            start[d + 1] += start[d]
+        pos = np.empty(n, np.int64)
+        vert = np.empty(n, np.int64)
+        fill = start[:-1].copy()
+        for v in range(n):
+            pos[v] = fill[deg[v]]
+            vert[pos[v]] = v
+            fill[deg[v]] += 1
+        for i in range(n):
+            v = vert[i]
+            for side in range(2 if use_b else 1):
+                ip = a_indptr if side == 0 else b_indptr
+                ix = a_indices if side == 0 else b_indices
+                for j in range(ip[v], ip[v + 1]):
+                    u = ix[j]
+                    if deg[u] > deg[v]:
+                        du = deg[u]
+                        pu = pos[u]
+                        pw = start[du]
+                        w = vert[pw]
+                        if u != w:
+                            pos[u], pos[w] = pw, pu
+                            vert[pu], vert[pw] = w, u
+                        start[du] += 1
+                        deg[u] -= 1
+        return deg
+
+
+def core_numbers_numba(indptr, indices, mode="total"):
+    deg, lists = _setup(indptr, indices, mode)
+    (a_ip, a_ix), (b_ip, b_ix) = lists[0], lists[-1]
+    return _nb_cores(deg.astype(np.int64), a_ip, np.asarray(a_ix, dtype=np.int64),
+                     b_ip, np.asarray(b_ix, dtype=np.int64), len(lists) == 2)
+
+
+ENGINES = {"native": core_numbers_native}
+if numba is not None:
+    ENGINES["numba"] = core_numbers_numba
+
+
+def core_numbers(indptr, indices, mode="total", engine=None):
+    """Coreness of every node (engine: numba when installed, else native)."""
+    return ENGINES[engine or ("numba" if "numba" in ENGINES else "native")](indptr, indices, mode)
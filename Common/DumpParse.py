@@ -0,0 +1,136 @@
+"""
+Shared dump-reading helpers (same logic as the Build scripts).
+
+scan_page() is the single-pass tokenizer used by the builds: one regex walks
+the text once, skipping <!-- comments --> and <nowiki> blocks (pages with
+neither get a plain [[ regex), and every [[...]] target is normalised the way
+MediaWiki resolves titles (underscores to spaces, runs of whitespace
+collapsed, first letter upper-cased), so [[foo_bar]] and [[Foo bar]] land on
+the same article. Each distinct raw target is normalised once and remembered,
+so a repeated link costs one dict lookup. extract_links() /
+extract_categories_from_text() are the original per-purpose regexes, kept for
+comparison (Bench/RunBench.py parse.*).
+"""
+
+import bz2
+import re
+from typing import Dict, List, Optional, Tuple
+from lxml import etree
+
+WIKI_LINK_RE = re.compile(r"\[\[([^|\]#]+)")
+CAT_RE = re.compile(r"\[\[(?:קטגוריה:|Category:)([^|\]#]+)", re.IGNORECASE)
+
+CATEGORY_PREFIXES = ("קטגוריה:", "category:")
+# skipped regions first, so a [[ inside them is never seen as a link
+TOKEN_RE = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<nowiki\s*>.*?(?:</nowiki\s*>|\Z)"
+    r"|<nowiki\s*/>"
+    r"|\[\[([^|\[\]#<>{}\n]*)",
+    re.DOTALL | re.IGNORECASE,
+)
+LINK_TOKEN_RE = re.compile(r"\[\[([^|\[\]#<>{}\n]+)")
+SKIPPED_RE = re.compile(r"<(?:!--|nowiki)", re.IGNORECASE)
+
+# raw [[...]] target -> link name ("" for a category or nothing), raw -> category
+_LINK_NAMES = {}
+_CATEGORY_NAMES = {}
+_NAMES_MAX = 1 << 20
+
+
+def is_namespace0(title: str) -> bool:
+    return ":" not in title
+
+
+def iter_pages(bz2_path):
+    """Stream pages (title, text, is_redirect) from a bz2 XML dump."""
+    with bz2.open(bz2_path, mode="rb") as f:
+        context = etree.iterparse(f, events=("end",), tag="{*}page")
+        for _, elem in context:
+            title_el = elem.find('.//{*}title')
+            text_el = elem.find('.//{*}text')
+            redirect_el = elem.find('.//{*}redirect')
+
+            if title_el is not None and text_el is not None:
+                title = (title_el.text or "").strip()
+                text = text_el.text or ""
+                is_redirect = redirect_el is not None
+                yield title, text, is_redirect
+
+            # free memory
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def extract_links(text: str) -> List[str]:
+    return [m.group(1).strip() for m in WIKI_LINK_RE.finditer(text)]
+
+
+def extract_categories_from_text(text: str) -> List[str]:
+    # find all category links, preserve order and dedupe
+    out = []
+    seen = set()
+    for m in CAT_RE.finditer(text):
+        c = m.group(1).strip()
+        if c and c not in seen:
+            seen.add(c)
+            out.append(c)
+    return out
+
+
+def normalize_title(t: str) -> str:
+    """Canonical form of a link target: "foo_bar  baz" -> "Foo bar baz"."""
+    t = " ".join(t.replace("_", " ").split())
+    return t[:1].upper() + t[1:]
+
+
+def category_name(title: str) -> Optional[str]:
+    """Normalised name of a "Category:foo_bar" title (page or link); None otherwise."""
+    prefix, sep, rest = title.partition(":")
+    if sep and prefix.strip().lower() + ":" in CATEGORY_PREFIXES:
+        return normalize_title(rest)
+    return None
+
+
+def _classify(raw: str) -> Tuple[bool, str]:
+    """Raw [[...]] target -> (is category membership, normalised name)."""
+    target = raw.strip()
+    if target.startswith(":"):
+        return False, normalize_title(target[1:])
+    name = category_name(target)
+    if name is not None:
+        return True, name
+    return False, normalize_title(target)
+
+
+def _learn(raw: str) -> str:
+    is_cat, name = _classify(raw)
+    if is_cat:
+        if name:
+            _CATEGORY_NAMES[raw] = name
+        name = ""
+    _LINK_NAMES[raw] = name
+    return name
+
+
+def scan_page(text: str) -> Tuple[Dict[str, int], List[str]]:
+    """One pass over the wikitext -> ({link target: count}, categories).
+
+    Targets keep first-seen order; categories are deduped in order. A leading
+    colon ([[:Category:X]]) makes a plain link instead of a membership.
+    """
+    if len(_LINK_NAMES) >= _NAMES_MAX:
+        _LINK_NAMES.clear()
+        _CATEGORY_NAMES.clear()
+    raws = (TOKEN_RE if SKIPPED_RE.search(text) else LINK_TOKEN_RE).findall(text)
+    links = {}
+    known = _LINK_NAMES.get
+    for raw in raws:
+        name = known(raw)
+        if name is None:
+            name = _learn(raw)   # "" for comments / nowiki and empty [[#anchor]]s too
+        if name:
+            links[name] = links.get(name, 0) + 1
+    cats = dict.fromkeys(filter(None, map(_CATEGORY_NAMES.get, raws)))
+    return links, list(cats)
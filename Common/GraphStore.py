@@ -0,0 +1,490 @@
+"""
+CSR graph bundle + per-node metric store.
+
+The networkx / igraph objects used by the original scripts keep every edge as
+a Python object, which is what makes the heavier analyses slow. A bundle is a
+plain directory of NumPy arrays that every kernel can load (or memory-map)
+directly:
+
+  meta.json                        node/edge counts and build info
+  indptr.npy, indices.npy          out-adjacency (row = source, sorted rows)
+  weights.npy                      uint16 link count per edge (optional)
+  titles.bin, titles_offsets.npy   node id -> title (UTF-8, concatenated)
+  cat_indptr.npy, cat_indices.npy  node -> category ids (optional)
+  cat_names.bin, cat_names_offsets.npy
+  cattree_indptr.npy, cattree_indices.npy   category -> parent categories (optional)
+  metrics/<name>.npy               one column per metric, length n
+
+Graphs that do not fit in RAM are built with an EdgeSpool (edges spilled to
+disk in chunks, CSR assembled by csr_from_edge_chunks) and analysed with
+load_graph(mmap=True) + iter_edge_blocks, which keep only node-sized arrays
+and one block of edges in memory.
+
+Usage:
+  from Common.GraphStore import load_graph, write_metric
+  G = load_graph("Hewiki_CSR")
+  write_metric("Hewiki_CSR", "pagerank", pr)
+"""
+
+import os
+import json
+from array import array
+from itertools import repeat
+import numpy as np
+
+META_FILE = "meta.json"
+METRICS_DIR = "metrics"
+BLOCK_EDGES = 8_000_000     # edges per streamed block
+SPILL_EDGES = 50_000_000    # edges an EdgeSpool buffers before writing a chunk
+WEIGHT_DTYPE = np.uint16    # per-edge link counts (saturating)
+
+
+# ================= TITLES =================
+
+class TitleTable:
+    """Read-only id -> string table backed by one UTF-8 blob and an offsets array."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+        self._index = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        a, b = int(self.offsets[i]), int(self.offsets[i + 1])
+        return bytes(self.blob[a:b]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def lookup(self, title):
+        """Title -> id (or None). Builds the reverse dict on first use."""
+        if self._index is None:
+            self._index = {t: i for i, t in enumerate(self)}
+        return self._index.get(title)
+
+
+class SubsetTitles:
+    """Titles of a node subset by position in the subset (`ids`: sorted original ids)."""
+
+    def __init__(self, titles, ids):
+        self.titles = titles
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return self.titles[int(self.ids[i])]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def lookup(self, title):
+        v = self.titles.lookup(title)
+        if v is None:
+            return None
+        i = int(np.searchsorted(self.ids, v))
+        return i if i < len(self.ids) and self.ids[i] == v else None
+
+
+def save_strings(path, prefix, strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    with open(os.path.join(path, prefix + ".bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(os.path.join(path, prefix + "_offsets.npy"), offsets)
+
+
+def load_strings(path, prefix, mmap=False):
+    offsets_path = os.path.join(path, prefix + "_offsets.npy")
+    if not os.path.exists(offsets_path):
+        return None
+    offsets = np.load(offsets_path, mmap_mode="r" if mmap else None)
+    blob_path = os.path.join(path, prefix + ".bin")
+    if mmap and os.path.getsize(blob_path) > 0:
+        blob = np.memmap(blob_path, dtype=np.uint8, mode="r")
+    else:
+        with open(blob_path, "rb") as f:
+            blob = np.frombuffer(f.read(), dtype=np.uint8)
+    return TitleTable(blob, offsets)
+
+
+# ================= CSR =================
+
+def index_dtype(n):
+    return np.int32 if n < 2**31 else np.int64
+
+
+def csr_from_edges(src, dst, n, dedupe=True, weights=None):
+    """Edge arrays -> (indptr, indices) with sorted neighbor lists.
+
+    With `weights` (e.g. link counts) returns (indptr, indices, weights);
+    duplicate edges are merged by summing, clipped to WEIGHT_DTYPE.
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    key = src * n + dst
+    if weights is None:
+        key = np.unique(key) if dedupe else np.sort(key, kind="stable")
+    else:
+        order = np.argsort(key, kind="stable")
+        key, w = key[order], np.asarray(weights, dtype=np.int64)[order]
+        if dedupe:
+            key, first = np.unique(key, return_index=True)
+            w = np.add.reduceat(w, first) if len(w) else w
+    rows = key // n
+    indices = (key - rows * n).astype(index_dtype(n))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    if weights is None:
+        return indptr, indices
+    return indptr, indices, clip_weights(w)
+
+
+def clip_weights(w):
+    return np.minimum(w, np.iinfo(WEIGHT_DTYPE).max).astype(WEIGHT_DTYPE)
+
+
+# ================= EXTERNAL BUILD =================
+
+class EdgeSpool:
+    """Append-only (src, dst[, weight]) list that spills to .npy chunks in `spill_dir`.
+
+    Without a spill_dir everything stays in memory, as before.
+    """
+
+    def __init__(self, spill_dir=None, spill_edges=SPILL_EDGES, weighted=False):
+        self.spill_dir = spill_dir
+        self.spill_edges = spill_edges
+        self.weighted = weighted
+        self.chunks = []
+        self.spilled = 0
+        self._reset()
+
+    def _reset(self):
+        self.src, self.dst, self.w = array("q"), array("q"), array("q")
+
+    def __len__(self):
+        return self.spilled + len(self.src)
+
+    def add(self, s, targets, counts=None):
+        self.src.extend(repeat(s, len(targets)))
+        self.dst.extend(targets)
+        if self.weighted:
+            self.w.extend(counts)
+        if self.spill_dir and len(self.src) >= self.spill_edges:
+            self.spill()
+
+    def _arrays(self):
+        cols = [self.src, self.dst] + ([self.w] if self.weighted else [])
+        return [np.frombuffer(c, dtype=np.int64) for c in cols]
+
+    def spill(self):
+        if not self.src:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"edges_{len(self.chunks):05d}.npy")
+        np.save(path, np.stack(self._arrays()))
+        self.chunks.append(path)
+        self.spilled += len(self.src)
+        self._reset()
+
+    def to_csr(self, n, out_dir):
+        """(indptr, indices[, weights]); written into out_dir and memory-mapped if anything was spilled."""
+        if not self.chunks:
+            src, dst, *w = self._arrays()
+            return csr_from_edges(src, dst, n, weights=w[0] if w else None)
+        self.spill()
+        return csr_from_edge_chunks(self.chunks, n, out_dir)
+
+    def cleanup(self):
+        for path in self.chunks:
+            os.remove(path)
+        self.chunks = []
+
+
+def csr_from_edge_chunks(chunk_paths, n, out_dir, block_edges=BLOCK_EDGES):
+    """Out-of-core csr_from_edges over (2, k) edge chunk files ((3, k) with weights).
+
+    Rows are counted, edges scattered into a scratch file at their row
+    offsets, then each block of rows is sorted, de-duplicated and compacted in
+    place. Writes indptr.npy / indices.npy (/ weights.npy) into out_dir and
+    returns them with the edge arrays memory-mapped; memory is
+    O(n + chunk + block).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = np.zeros(n, dtype=np.int64)
+    for path in chunk_paths:
+        counts += np.bincount(np.load(path, mmap_mode="r")[0], minlength=n)
+    starts = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=starts[1:])
+    weighted = np.load(chunk_paths[0], mmap_mode="r").shape[0] == 3
+
+    dtype = index_dtype(n)
+    size = max(int(starts[-1]), 1)
+    scratch_path = os.path.join(out_dir, "indices.scratch.tmp")
+    scratch = np.memmap(scratch_path, dtype=dtype, mode="w+", shape=(size,))
+    if weighted:
+        wscratch_path = os.path.join(out_dir, "weights.scratch.tmp")
+        wscratch = np.memmap(wscratch_path, dtype=np.int64, mode="w+", shape=(size,))
+    cursor = starts[:-1].copy()
+    for path in chunk_paths:
+        chunk = np.load(path)
+        order = np.argsort(chunk[0], kind="stable")
+        src = chunk[0][order]
+        pos = cursor[src] + np.arange(len(src)) - np.searchsorted(src, src, side="left")
+        scratch[pos] = chunk[1][order]
+        if weighted:
+            wscratch[pos] = chunk[2][order]
+        cursor += np.bincount(src, minlength=n)
+
+    lengths = np.zeros(n, dtype=np.int64)
+    written = 0
+    for lo, hi in iter_row_blocks(starts, block_edges):
+        a, b = int(starts[lo]), int(starts[hi])
+        rows = np.repeat(np.arange(hi - lo, dtype=np.int64), counts[lo:hi])
+        key = rows * n + scratch[a:b]
+        if weighted:
+            order = np.argsort(key, kind="stable")
+            key, first = np.unique(key[order], return_index=True)
+            if len(key):
+                wscratch[written:written + len(key)] = np.add.reduceat(wscratch[a:b][order], first)
+        else:
+            key = np.unique(key)
+        r = key // n
+        scratch[written:written + len(key)] = key - r * n
+        lengths[lo:hi] = np.bincount(r, minlength=hi - lo)
+        written += len(key)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    np.save(os.path.join(out_dir, "indptr.npy"), indptr)
+    out = [indptr]
+    parts = [("indices.npy", scratch, dtype)]
+    if weighted:
+        parts.append(("weights.npy", wscratch, WEIGHT_DTYPE))
+    for name, source, out_dtype in parts:
+        target = np.lib.format.open_memmap(os.path.join(out_dir, name), mode="w+",
+                                           dtype=out_dtype, shape=(written,))
+        for a in range(0, written, block_edges):
+            b = min(a + block_edges, written)
+            target[a:b] = clip_weights(source[a:b]) if name == "weights.npy" else source[a:b]
+        target.flush()
+        del target
+        out.append(np.load(os.path.join(out_dir, name), mmap_mode="r"))
+    del scratch
+    os.remove(scratch_path)
+    if weighted:
+        del wscratch
+        os.remove(wscratch_path)
+    return tuple(out)
+
+
+# ================= STREAMING =================
+
+def iter_row_blocks(indptr, block_edges=BLOCK_EDGES):
+    """(lo, hi) row ranges of about `block_edges` edges each (at least one row)."""
+    n = len(indptr) - 1
+    lo = 0
+    while lo < n:
+        hi = int(np.searchsorted(indptr, int(indptr[lo]) + block_edges, side="right")) - 1
+        hi = min(max(hi, lo + 1), n)
+        yield lo, hi
+        lo = hi
+
+
+def iter_edge_blocks(G, block_edges=BLOCK_EDGES):
+    """(src, dst) arrays of G's edges, one block of rows at a time."""
+    for lo, hi in iter_row_blocks(G.indptr, block_edges):
+        ptr = np.asarray(G.indptr[lo:hi + 1], dtype=np.int64)
+        dst = np.asarray(G.indices[ptr[0]:ptr[-1]])
+        yield np.repeat(np.arange(lo, hi, dtype=dst.dtype), np.diff(ptr)), dst
+
+
+class CSRGraph:
+    """Directed graph as CSR arrays; the transpose is built lazily."""
+
+    def __init__(self, indptr, indices, titles=None, path=None, weights=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.titles = titles
+        self.path = path
+        self.weights = weights
+        self.ids = None          # original node ids, for a subgraph()
+        self._transpose = None
+
+    @property
+    def n(self):
+        return len(self.indptr) - 1
+
+    @property
+    def m(self):
+        return int(self.indptr[-1])
+
+    def title(self, v):
+        return self.titles[v] if self.titles is not None else str(v)
+
+    def neighbors(self, v):
+        return self.indices[self.indptr[v]:self.indptr[v + 1]]
+
+    def out_degree(self):
+        return np.diff(self.indptr)
+
+    def in_degree(self):
+        return np.bincount(self.indices, minlength=self.n)
+
+    def sources(self):
+        """Row id of every edge (the COO 'src' array)."""
+        return np.repeat(np.arange(self.n, dtype=self.indices.dtype), self.out_degree())
+
+    def transpose(self):
+        if self._transpose is None:
+            indptr, indices = csr_from_edges(self.indices, self.sources(), self.n, dedupe=False)
+            self._transpose = CSRGraph(indptr, indices, titles=self.titles)
+        return self._transpose
+
+    def symmetrized(self):
+        """Undirected view: u-v kept once per direction, self loops dropped."""
+        src, dst = self.sources(), self.indices
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        indptr, indices = csr_from_edges(
+            np.concatenate([src, dst]), np.concatenate([dst, src]), self.n)
+        return CSRGraph(indptr, indices, titles=self.titles)
+
+    def subgraph(self, keep):
+        """Induced subgraph on the nodes where `keep` is true, renumbered in order; .ids maps back."""
+        ids = np.nonzero(np.asarray(keep, dtype=bool))[0]
+        new_id = np.full(self.n, -1, dtype=np.int64)
+        new_id[ids] = np.arange(len(ids))
+        src, dst = new_id[self.sources()], new_id[np.asarray(self.indices)]
+        e = (src >= 0) & (dst >= 0)
+        titles = SubsetTitles(self.titles, ids) if self.titles is not None else None
+        if self.weights is None:
+            indptr, indices = csr_from_edges(src[e], dst[e], len(ids), dedupe=False)
+            H = CSRGraph(indptr, indices, titles=titles)
+        else:
+            indptr, indices, w = csr_from_edges(src[e], dst[e], len(ids), weights=np.asarray(self.weights)[e])
+            H = CSRGraph(indptr, indices, titles=titles, weights=w)
+        H.ids = ids if self.ids is None else self.ids[ids]
+        return H
+
+    def to_scipy(self, dtype=np.float64, weighted=False):
+        """Adjacency matrix; weighted=True uses the stored link counts (if any)."""
+        from scipy.sparse import csr_matrix
+        if weighted and self.weights is not None:
+            data = np.asarray(self.weights).astype(dtype)
+        else:
+            data = np.ones(self.m, dtype=dtype)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.n, self.n))
+
+
+# ================= BUNDLE I/O =================
+
+def _save_array(path, name, arr):
+    target = os.path.join(path, name)
+    if isinstance(arr, np.memmap) and os.path.abspath(arr.filename) == os.path.abspath(target):
+        return  # already written in place by csr_from_edge_chunks
+    np.save(target, np.asarray(arr))
+
+
+def save_graph(path, G, meta=None):
+    os.makedirs(path, exist_ok=True)
+    _save_array(path, "indptr.npy", G.indptr)
+    _save_array(path, "indices.npy", G.indices)
+    if G.weights is not None:
+        _save_array(path, "weights.npy", G.weights)
+    if G.titles is not None:
+        save_strings(path, "titles", G.titles)
+    info = dict(meta or {})
+    info.update({"nodes": G.n, "edges": G.m})
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+    G.path = path
+
+
+def load_graph(path, mmap=False):
+    """Load a bundle. mmap=True keeps the arrays on disk (read-only)."""
+    mode = "r" if mmap else None
+    indptr = np.load(os.path.join(path, "indptr.npy"), mmap_mode=mode)
+    indices = np.load(os.path.join(path, "indices.npy"), mmap_mode=mode)
+    weights_path = os.path.join(path, "weights.npy")
+    weights = np.load(weights_path, mmap_mode=mode) if os.path.exists(weights_path) else None
+    titles = load_strings(path, "titles", mmap=mmap)
+    return CSRGraph(indptr, indices, titles=titles, path=path, weights=weights)
+
+
+def load_meta(path):
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_meta(path, **fields):
+    """Merge `fields` into meta.json (replaced atomically)."""
+    info = load_meta(path)
+    info.update(fields)
+    tmp = os.path.join(path, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, META_FILE))
+
+
+# ================= CATEGORIES =================
+
+def save_categories(path, cat_indptr, cat_indices, cat_names):
+    np.save(os.path.join(path, "cat_indptr.npy"), np.asarray(cat_indptr, dtype=np.int64))
+    np.save(os.path.join(path, "cat_indices.npy"), np.asarray(cat_indices, dtype=np.int32))
+    save_strings(path, "cat_names", cat_names)
+
+
+def load_categories(path, mmap=False):
+    """Return (cat_indptr, cat_indices, cat_names) or None if the bundle has none."""
+    indptr_path = os.path.join(path, "cat_indptr.npy")
+    if not os.path.exists(indptr_path):
+        return None
+    mode = "r" if mmap else None
+    cat_indptr = np.load(indptr_path, mmap_mode=mode)
+    cat_indices = np.load(os.path.join(path, "cat_indices.npy"), mmap_mode=mode)
+    return cat_indptr, cat_indices, load_strings(path, "cat_names", mmap=mmap)
+
+
+def save_category_tree(path, tree_indptr, tree_indices):
+    """Category -> parent category ids (ids index cat_names)."""
+    np.save(os.path.join(path, "cattree_indptr.npy"), np.asarray(tree_indptr, dtype=np.int64))
+    np.save(os.path.join(path, "cattree_indices.npy"), np.asarray(tree_indices, dtype=np.int32))
+
+
+def load_category_tree(path):
+    """Return (tree_indptr, tree_indices) or None if the tree was never built."""
+    indptr_path = os.path.join(path, "cattree_indptr.npy")
+    if not os.path.exists(indptr_path):
+        return None
+    return np.load(indptr_path), np.load(os.path.join(path, "cattree_indices.npy"))
+
+
+# ================= METRIC STORE =================
+
+def write_metric(path, name, values):
+    d = os.path.join(path, METRICS_DIR)
+    os.makedirs(d, exist_ok=True)
+    tmp = os.path.join(d, name + ".tmp.npy")
+    np.save(tmp, np.asarray(values))
+    os.replace(tmp, os.path.join(d, name + ".npy"))
+
+
+def read_metric(path, name, mmap=False):
+    return np.load(os.path.join(path, METRICS_DIR, name + ".npy"),
+                   mmap_mode="r" if mmap else None)
+
+
+def list_metrics(path):
+    d = os.path.join(path, METRICS_DIR)
+    if not os.path.isdir(d):
+        return []
+    return sorted(f[:-4] for f in os.listdir(d) if f.endswith(".npy") and ".tmp" not in f)
@@ -0,0 +1,314 @@
+"""
+Progress and performance instrumentation shared by the Build and Analysis
+scripts.
+
+A Monitor owns a set of named stages. Each stage has counters (pages, edges,
+sources, …) with rates, optional accumulated timers, and an optional total for
+an ETA (capped at the time left when the stage has a deadline, e.g. a
+script's time limit). A background thread samples RSS and, every `interval`
+seconds, prints a progress line, appends a JSON line to `jsonl_path` and
+rewrites a Prometheus textfile (`prom_path`, for node_exporter's textfile
+collector). Files are written under a lock, each rewrite through its own
+temporary file; a failed write is reported once on stderr and the run goes on.
+
+Usage:
+  mon = Monitor("BaseBuild", jsonl_path="BaseBuild.metrics.jsonl", prom_path="BaseBuild.prom")
+  with mon.stage("pass2", total=len(titles), unit="pages") as st:
+      for page in pages:
+          with st.time("parse"):
+              links = extract_links(text)
+          st.count("pages")
+          st.count("edges", len(links))
+  mon.close()
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# ================= MEMORY =================
+
+def rss_bytes():
+    """Current resident set size (0 if it can't be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return 0
+
+
+def peak_rss_bytes():
+    """Peak RSS as reported by the OS.
+
+    VmHWM is preferred on Linux: ru_maxrss survives exec(), so a freshly
+    started child would otherwise report its parent's peak.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return psutil.Process().memory_info().peak_wset if psutil is not None else 0
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def fmt_bytes(b):
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if b < 1024 or unit == "TB":
+            return f"{b:.1f} {unit}"
+        b /= 1024
+
+
+def fmt_seconds(s):
+    if s is None:
+        return "?"
+    s = int(s)
+    return f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}"
+
+
+# ================= STAGES =================
+
+class Stage:
+    def __init__(self, monitor, name, total=None, unit=None, deadline=None):
+        self.monitor = monitor
+        self.name = name
+        self.total = total
+        self.unit = unit
+        self.deadline = deadline      # time.time() at which the caller stops the stage
+        self.counters = {}
+        self.timers = {}
+        self.start = time.time()
+        self.end = None
+
+    def count(self, counter, n=1):
+        with self.monitor.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def set(self, counter, value):
+        with self.monitor.lock:
+            self.counters[counter] = value
+
+    @contextmanager
+    def time(self, timer):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            with self.monitor.lock:
+                self.timers[timer] = self.timers.get(timer, 0.0) + dt
+
+    def elapsed(self):
+        return (self.end or time.time()) - self.start
+
+    def snapshot(self):
+        """Plain-dict view (call with the monitor lock held)."""
+        elapsed = self.elapsed()
+        rates = {k: v / elapsed for k, v in self.counters.items()} if elapsed > 0 else {}
+        eta = None
+        if self.total and self.unit and rates.get(self.unit):
+            eta = max(self.total - self.counters.get(self.unit, 0), 0) / rates[self.unit]
+            if self.deadline is not None:
+                eta = min(eta, max(self.deadline - time.time(), 0.0))
+        return {
+            "stage": self.name,
+            "elapsed": elapsed,
+            "done": self.end is not None,
+            "total": self.total,
+            "counters": dict(self.counters),
+            "rates": rates,
+            "timers": dict(self.timers),
+            "eta": eta,
+        }
+
+
+# ================= MONITOR =================
+
+class Monitor:
+    def __init__(self, job, jsonl_path=None, prom_path=None, status_path=None,
+                 interval=60, sample_every=5, quiet=False):
+        self.job = job
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.status_path = status_path
+        self.interval = interval
+        self.sample_every = min(sample_every, interval)
+        self.quiet = quiet
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()   # the reporter thread and the caller both write files
+        self.stages = []
+        self.current = None
+        self.peak_sampled = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def stage(self, name, total=None, unit=None, deadline=None):
+        st = Stage(self, name, total=total, unit=unit, deadline=deadline)
+        with self.lock:
+            self.stages.append(st)
+            self.current = st
+        self._emit("stage_start", st)
+        try:
+            yield st
+        finally:
+            st.end = time.time()
+            self._emit("stage_end", st)
+            if not self.quiet:
+                print(self._line(st, final=True))
+
+    def report(self):
+        """Force a progress report now (also done by the background thread)."""
+        st = self.current
+        if st is None:
+            return
+        self._emit("progress", st)
+        if not self.quiet:
+            print(self._line(st))
+
+    def close(self):
+        self._done.set()
+        self._thread.join(timeout=self.sample_every + 1)
+        self._write_prom()
+
+    # ---------- internals ----------
+
+    def _sample_memory(self):
+        rss = rss_bytes()
+        self.peak_sampled = max(self.peak_sampled, rss)
+        return rss
+
+    def _run(self):
+        last_report = time.time()
+        while not self._done.wait(self.sample_every):
+            self._sample_memory()
+            if time.time() - last_report >= self.interval:
+                last_report = time.time()
+                cur = self.current
+                if cur is not None and cur.end is None:
+                    self.report()
+
+    def _line(self, st, final=False):
+        with self.lock:
+            snap = st.snapshot()
+        parts = [f"[{self.job}:{st.name}]"]
+        for k, v in snap["counters"].items():
+            parts.append(f"{k}: {v:,} ({snap['rates'].get(k, 0):,.1f}/s)")
+        parts.append(f"elapsed {fmt_seconds(snap['elapsed'])}")
+        if not final and snap["eta"] is not None:
+            parts.append(f"ETA {fmt_seconds(snap['eta'])}")
+        parts.append(f"RSS {fmt_bytes(self._sample_memory())} (peak {fmt_bytes(peak_rss_bytes())})")
+        if final:
+            parts.append("done")
+        return " | ".join(parts)
+
+    def _emit(self, event, st):
+        with self.lock:
+            snap = st.snapshot()
+        snap.update({
+            "job": self.job,
+            "event": event,
+            "timestamp": time.time(),
+            "rss": self._sample_memory(),
+            "peak_rss": max(peak_rss_bytes(), self.peak_sampled),
+        })
+        with self.write_lock:
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(snap) + "\n")
+                except OSError as e:
+                    _warn(self.jsonl_path, e)
+            if self.status_path:
+                _atomic_write(self.status_path, json.dumps(snap))
+        self._write_prom()
+
+    def _write_prom(self):
+        if not self.prom_path:
+            return
+        job = self.job
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP hewiki_{name} {help_text}")
+            lines.append(f"# TYPE hewiki_{name} gauge")
+            for labels, value in samples:
+                lab = ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+                lines.append(f"hewiki_{name}{{{lab}}} {value}")
+
+        with self.lock:
+            snaps = [st.snapshot() for st in self.stages]
+
+        metric("stage_elapsed_seconds", "Wall time spent in a stage.",
+               [({"job": job, "stage": s["stage"]}, f"{s['elapsed']:.3f}") for s in snaps])
+        metric("stage_done", "1 once the stage has finished.",
+               [({"job": job, "stage": s["stage"]}, int(s["done"])) for s in snaps])
+        metric("stage_eta_seconds", "Estimated time left in the stage.",
+               [({"job": job, "stage": s["stage"]}, f"{s['eta']:.1f}") for s in snaps
+                if s["eta"] is not None and not s["done"]])
+        metric("counter_total", "Items processed in a stage.",
+               [({"job": job, "stage": s["stage"], "counter": k}, v)
+                for s in snaps for k, v in s["counters"].items()])
+        metric("counter_rate", "Items per second over the stage so far.",
+               [({"job": job, "stage": s["stage"], "counter": k}, f"{v:.3f}")
+                for s in snaps for k, v in s["rates"].items()])
+        metric("timer_seconds", "Accumulated time in a named section of a stage.",
+               [({"job": job, "stage": s["stage"], "timer": k}, f"{v:.3f}")
+                for s in snaps for k, v in s["timers"].items()])
+        metric("rss_bytes", "Resident set size.", [({"job": job}, rss_bytes())])
+        metric("peak_rss_bytes", "Peak resident set size.",
+               [({"job": job}, max(peak_rss_bytes(), self.peak_sampled))])
+
+        with self.write_lock:
+            _atomic_write(self.prom_path, "\n".join(lines) + "\n")
+
+
+def _label(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+_warned = set()
+
+
+def _warn(path, err):
+    if path not in _warned:
+        _warned.add(path)
+        print(f"warning: could not write {path}: {err} (further errors not shown)", file=sys.stderr)
+
+
+def _atomic_write(path, text):
+    # per process and thread, so concurrent writers never share a temporary file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError as e:
+        _warn(path, e)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
@@ -0,0 +1,234 @@
+"""
+Sharded, checkpointed runs of the source-iterating metrics
+(betweenness, harmonic, distance_histogram from Common/Backends.py).
+
+A job directory fixes everything that must agree between runs and hosts:
+
+  job.json                    graph, metrics, shard count, seed, job id
+  sources_<metric>.npy        the metric's source list, randomly permuted
+  within.npy                  target mask for distance_histogram
+  <metric>/shard_00007.npz    checkpoint: partial accumulator + sources done
+
+Shard k of a metric is sources[k::shards]. The permutation makes every shard
+a uniform sample of the sources (so shards take similar time and any prefix of
+a shard is an unbiased sample). All three metrics are sums over sources, so a
+checkpoint is just the running sum and the count of shard sources folded in;
+an interrupted run resumes from it, and merging adds up the shards. A shard
+being worked on has a <metric>/shard_00007.lock file.
+
+Hosts can each run a subset of the shards in their own copy of the job
+directory (job.json and the source files copied over), opening their own copy
+of the graph if it lives at another path (open_job_graph checks the node
+count); merge() takes any
+number of directories of the same job and, per shard, uses the checkpoint
+that got furthest.
+"""
+
+import os
+import json
+import time
+import socket
+import hashlib
+import numpy as np
+
+from Common.Backends import open_graph, compute
+
+# ================= CONFIG =================
+JOB_FILE = "job.json"
+SOURCE_BATCH = 16                 # sources per backend call
+CHECKPOINT_EVERY = 10 * 60        # seconds
+# =========================================
+
+METRICS = ("betweenness", "harmonic", "distance_histogram")
+
+
+class JobError(Exception):
+    pass
+
+
+# ================= JOB DEFINITION =================
+
+def create_job(job_dir, graph, metrics=METRICS, shards=64, seed=0, samples=None, backend="native"):
+    """Write job.json and the source lists. `samples` caps distance_histogram's sources."""
+    for metric in metrics:
+        if metric not in METRICS:
+            raise JobError(f"{metric} is not a source-iterating metric ({', '.join(METRICS)})")
+    if os.path.exists(os.path.join(job_dir, JOB_FILE)):
+        raise JobError(f"{job_dir} already holds a job")
+    os.makedirs(job_dir, exist_ok=True)
+    src = open_graph(graph)
+    rng = np.random.default_rng(seed)
+    for metric in metrics:
+        if metric == "distance_histogram":
+            within = compute("largest_component", backend, src, mode="strong")
+            if within.sum() <= 10:
+                within = compute("largest_component", backend, src, mode="weak")
+            np.save(os.path.join(job_dir, "within.npy"), within)
+            pool = np.nonzero(within)[0]
+            sources = rng.permutation(pool)[:samples] if samples else rng.permutation(pool)
+        else:
+            sources = rng.permutation(src.n)
+        np.save(os.path.join(job_dir, f"sources_{metric}.npy"), sources)
+    job = {"graph": os.path.abspath(src.path), "nodes": src.n, "metrics": list(metrics),
+           "shards": shards, "seed": seed, "samples": samples, "created": time.time()}
+    job["id"] = hashlib.sha1(json.dumps(job, sort_keys=True).encode()).hexdigest()[:12]
+    with open(os.path.join(job_dir, JOB_FILE), "w", encoding="utf-8") as f:
+        json.dump(job, f, indent=1)
+    return job
+
+
+def load_job(job_dir):
+    path = os.path.join(job_dir, JOB_FILE)
+    if not os.path.exists(path):
+        raise JobError(f"no {JOB_FILE} in {job_dir}")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_job_graph(job, graph=None):
+    """The job's graph, or `graph` (e.g. the same bundle at another path on this host)."""
+    path = graph or job["graph"]
+    try:
+        src = open_graph(path)
+    except FileNotFoundError as e:
+        raise JobError(f"{e}; pass the graph's path on this host with --graph") from None
+    if src.n != job["nodes"]:
+        raise JobError(f"{path} has {src.n:,} nodes, the job was made for {job['nodes']:,}")
+    return src
+
+
+def shard_sources(job_dir, job, metric, k):
+    return np.load(os.path.join(job_dir, f"sources_{metric}.npy"), mmap_mode="r")[k::job["shards"]]
+
+
+def parse_shards(spec, shards):
+    """'0-7,12' -> [0, …, 7, 12]."""
+    out = []
+    for part in spec.split(","):
+        a, _, b = part.partition("-")
+        out.extend(range(int(a), int(b or a) + 1))
+    bad = [k for k in out if not 0 <= k < shards]
+    if bad:
+        raise JobError(f"shards {bad} out of range 0-{shards - 1}")
+    return sorted(set(out))
+
+
+# ================= CHECKPOINTS =================
+
+def checkpoint_path(job_dir, metric, k):
+    return os.path.join(job_dir, metric, f"shard_{k:05d}.npz")
+
+
+def _digest(sources):
+    return hashlib.sha1(np.ascontiguousarray(sources, dtype=np.int64).tobytes()).hexdigest()
+
+
+def load_checkpoint(path, sources):
+    """-> (accumulator, done) or None; refuses checkpoints of another source list."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as z:
+        if str(z["digest"]) != _digest(sources):
+            raise JobError(f"{path} was written for a different source list")
+        return z["accum"].copy(), int(z["done"])
+
+
+def save_checkpoint(path, accum, done, sources):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, accum=accum, done=done, digest=_digest(sources), host=socket.gethostname(),
+                 saved=time.time())
+    os.replace(tmp, path)
+
+
+def _add(total, part):
+    """Sum of two accumulators as a new array (neither is modified); histograms may differ in length."""
+    if total is None:
+        return part.copy()
+    size = max(len(total), len(part))
+    return np.pad(total, (0, size - len(total))) + np.pad(part, (0, size - len(part)))
+
+
+def _lock(job_dir, metric, k, steal):
+    path = checkpoint_path(job_dir, metric, k)[:-4] + ".lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if steal and os.path.exists(path):
+        os.remove(path)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return None
+    os.write(fd, f"{socket.gethostname()}:{os.getpid()}\n".encode())
+    os.close(fd)
+    return path
+
+
+# ================= RUNNING =================
+
+def run_shard(job_dir, job, src, metric, k, backend, stage=None, deadline=None,
+              checkpoint_every=CHECKPOINT_EVERY, steal_locks=False):
+    """Advance one shard until it is complete or `deadline` (time.time()) passes.
+
+    Returns (done, total) for the shard, or None if another process holds it.
+    """
+    sources = np.asarray(shard_sources(job_dir, job, metric, k))
+    path = checkpoint_path(job_dir, metric, k)
+    state = load_checkpoint(path, sources)
+    accum, done = state if state else (None, 0)
+    if done >= len(sources):
+        return done, len(sources)
+    lock = _lock(job_dir, metric, k, steal_locks)
+    if lock is None:
+        return None
+    params = {}
+    if metric == "distance_histogram":
+        params["within"] = np.load(os.path.join(job_dir, "within.npy"))
+    try:
+        if done:
+            print(f"  {metric} shard {k}: resuming at {done:,}/{len(sources):,}")
+        last_save = time.time()
+        while done < len(sources) and (deadline is None or time.time() < deadline):
+            batch = sources[done:done + SOURCE_BATCH]
+            part = np.asarray(compute(metric, backend, src, sources=batch, **params))
+            accum, done = _add(accum, part), done + len(batch)
+            if stage is not None:
+                stage.count("sources", len(batch))
+            if time.time() - last_save >= checkpoint_every:
+                save_checkpoint(path, accum, done, sources)
+                last_save = time.time()
+    finally:
+        # also on Ctrl-C / errors: accum and done are only ever assigned together
+        if accum is not None:
+            save_checkpoint(path, accum, done, sources)
+        os.remove(lock)
+    return done, len(sources)
+
+
+# ================= MERGING =================
+
+def merge(job_dirs, metric):
+    """Sum the furthest checkpoint of every shard found in `job_dirs` (copies of one job).
+
+    Returns (accumulator or None, sources done, total sources, complete shards).
+    """
+    jobs = [load_job(d) for d in job_dirs]
+    job = jobs[0]
+    for d, other in zip(job_dirs[1:], jobs[1:]):
+        if other["id"] != job["id"]:
+            raise JobError(f"{d} belongs to job {other['id']}, not {job['id']}")
+    total, done, complete, n_sources = None, 0, 0, 0
+    for k in range(job["shards"]):
+        sources = np.asarray(shard_sources(job_dirs[0], job, metric, k))
+        n_sources += len(sources)
+        best = None
+        for d in job_dirs:
+            state = load_checkpoint(checkpoint_path(d, metric, k), sources)
+            if state and (best is None or state[1] > best[1]):
+                best = state
+        if best is None:
+            continue
+        total = _add(total, best[0])
+        done += best[1]
+        complete += best[1] == len(sources)
+    return total, done, n_sources, complete
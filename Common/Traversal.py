@@ -0,0 +1,52 @@
+"""
+Frontier-at-a-time traversal helpers over CSR arrays.
+
+Each BFS level is a handful of array operations over the whole frontier
+instead of a Python loop per edge.
+"""
+
+import numpy as np
+
+
+def expand(indptr, indices, nodes):
+    """Concatenated neighbor lists of `nodes` (with the owning node per entry)."""
+    nodes = np.asarray(nodes, dtype=np.int64)
+    starts = np.asarray(indptr[nodes], dtype=np.int64)
+    lens = np.asarray(indptr[nodes + 1], dtype=np.int64) - starts
+    total = int(lens.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - (np.cumsum(lens) - lens), lens) + np.arange(total)
+    return np.asarray(indices[offsets], dtype=np.int64), np.repeat(nodes, lens)
+
+
+def frontier_chunks(indptr, nodes, max_edges):
+    """Split sorted `nodes` into runs whose neighbor lists total about `max_edges`."""
+    lens = np.asarray(indptr[nodes + 1], dtype=np.int64) - np.asarray(indptr[nodes], dtype=np.int64)
+    cut = np.searchsorted(np.cumsum(lens), np.arange(max_edges, int(lens.sum()), max_edges), side="right")
+    return np.split(nodes, np.unique(cut))
+
+
+def bfs_levels(indptr, indices, source, max_depth=None, block_edges=None):
+    """Hop distance from `source` to every node (-1 = unreachable).
+
+    With block_edges the frontier is expanded in chunks of about that many
+    edges, so a memory-mapped graph is read in sorted runs and the temporary
+    arrays stay bounded however large a level gets.
+    """
+    n = len(indptr) - 1
+    dist = np.full(n, -1, dtype=np.int32)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    depth = 0
+    while frontier.size and (max_depth is None or depth < max_depth):
+        depth += 1
+        chunks = [frontier] if block_edges is None else frontier_chunks(indptr, frontier, block_edges)
+        reached = []
+        for chunk in chunks:
+            nbrs, _ = expand(indptr, indices, chunk)
+            nbrs = np.unique(nbrs[dist[nbrs] < 0])
+            dist[nbrs] = depth
+            reached.append(nbrs)
+        frontier = np.sort(np.concatenate(reached)) if len(reached) > 1 else reached[0]
+    return dist
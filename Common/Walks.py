@@ -0,0 +1,102 @@
+"""
+Random walks over CSR arrays, all walkers advanced in lock-step.
+
+Each step is a few array operations over every live walker: pick a uniform
+offset into the current node's neighbor list, gather the target. node2vec's
+second-order bias (return parameter p, in-out parameter q) is applied by
+rejection sampling: propose a uniform neighbor x of the current node v (having
+come from t) and accept it with probability w(x) / max(w), where
+
+    w(x) = 1/p if x == t,   1 if t -> x is an edge,   1/q otherwise.
+
+Rejected walkers propose again; the "t -> x is an edge" test is a
+searchsorted over the sorted src*n+dst keys of the graph (8 bytes per edge),
+where alias tables per (t, v) pair would need memory proportional to the sum
+of squared degrees.
+
+With a restart probability each walker jumps back to its start node with that
+probability at every step (random walk with restart). A walker at a node with
+no out-links restarts if restarts are on, otherwise its walk ends there and the
+rest of its row is -1.
+"""
+
+import numpy as np
+
+
+def edge_keys(indptr, indices):
+    """Sorted int64 keys src*n+dst of every edge (CSR rows hold sorted neighbor lists)."""
+    n = len(indptr) - 1
+    src = np.repeat(np.arange(n, dtype=np.int64), np.diff(indptr))
+    return src * n + np.asarray(indices, dtype=np.int64)
+
+
+def has_edges(keys, n, src, dst):
+    """Vectorized "src -> dst is an edge" test against edge_keys()."""
+    q = np.asarray(src, dtype=np.int64) * n + dst
+    pos = np.minimum(np.searchsorted(keys, q), len(keys) - 1)
+    return keys[pos] == q
+
+
+def _uniform_step(indptr, indices, cur, rng):
+    starts = indptr[cur]
+    deg = indptr[cur + 1] - starts
+    return np.asarray(indices[starts + (rng.random(len(cur)) * deg).astype(np.int64)], dtype=np.int64)
+
+
+def _biased_step(indptr, indices, keys, cur, prev, p, q, rng):
+    """One node2vec step by rejection sampling; walkers with prev < 0 step uniformly."""
+    n = len(indptr) - 1
+    w_return, w_out = 1.0 / p, 1.0 / q
+    w_max = max(w_return, 1.0, w_out)
+    nxt = np.empty(len(cur), dtype=np.int64)
+    todo = np.arange(len(cur))
+    while todo.size:
+        x = _uniform_step(indptr, indices, cur[todo], rng)
+        t = prev[todo]
+        w = np.full(len(todo), w_out)
+        w[has_edges(keys, n, np.maximum(t, 0), x)] = 1.0
+        w[x == t] = w_return
+        w[t < 0] = w_max
+        ok = rng.random(len(todo)) * w_max < w
+        nxt[todo[ok]] = x[ok]
+        todo = todo[~ok]
+    return nxt
+
+
+def walk_batch(indptr, indices, starts, length, rng, p=1.0, q=1.0, restart=0.0, keys=None):
+    """Walks of `length` nodes from each of `starts` -> (len(starts), length) int64 array.
+
+    `keys` (edge_keys) is needed when p or q differ from 1.
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    biased = p != 1.0 or q != 1.0
+    if biased and keys is None:
+        keys = edge_keys(indptr, indices)
+    starts = np.asarray(starts, dtype=np.int64)
+    walks = np.full((len(starts), length), -1, dtype=np.int64)
+    walks[:, 0] = starts
+    cur = starts.copy()
+    prev = np.full(len(starts), -1, dtype=np.int64)
+    live = np.arange(len(starts))
+    for step in range(1, length):
+        c = cur[live]
+        jump = indptr[c + 1] == indptr[c]
+        if restart > 0:
+            jump |= rng.random(len(live)) < restart
+        elif jump.any():
+            live, c = live[~jump], c[~jump]        # dead end: the walk stops
+            jump = jump[~jump]
+            if not live.size:
+                break
+        nxt = np.empty(len(live), dtype=np.int64)
+        home = live[jump]
+        nxt[jump] = starts[home]
+        go = ~jump
+        if biased:
+            nxt[go] = _biased_step(indptr, indices, keys, c[go], prev[live[go]], p, q, rng)
+        else:
+            nxt[go] = _uniform_step(indptr, indices, c[go], rng)
+        prev[live] = np.where(jump, -1, c)
+        cur[live] = nxt
+        walks[live, step] = nxt
+    return walks
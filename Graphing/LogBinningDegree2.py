@@ -1,10 +1,16 @@
-import networkx as nx
+import os
+import sys
+import argparse
 import numpy as np
 from collections import Counter
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.Backends import open_graph, compute, add_backend_argument
+
 # -------- parameters --------
 GPICKLE_PATH = "hewiki_BaseGraph.gpickle"
+BACKEND = "networkx"
 BINS = 20
 # ----------------------------
 
@@ -44,15 +50,19 @@ def log_binned_distribution_from_degrees(degrees, bins=20):
 
 
 def main():
+    ap = argparse.ArgumentParser(description="Log-binned in/out-degree distributions")
+    ap.add_argument("--graph", default=GPICKLE_PATH, help="gpickle, GraphML or CSR bundle")
+    add_backend_argument(ap, ("degree",), BACKEND)
+    args = ap.parse_args()
+
     print("Loading graph...")
-    G = nx.read_gpickle(GPICKLE_PATH)
+    src = open_graph(args.graph)
+    in_degrees, out_degrees = compute("degree", args.backend, src)
 
     print("Computing in-degree distribution...")
-    in_degrees = [d for _, d in G.in_degree()]
     k_in, p_in = log_binned_distribution_from_degrees(in_degrees, BINS)
 
     print("Computing out-degree distribution...")
-    out_degrees = [d for _, d in G.out_degree()]
     k_out, p_out = log_binned_distribution_from_degrees(out_degrees, BINS)
 
     print("Plotting...")
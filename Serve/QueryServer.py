@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/JSON query server over a CSR bundle.
+
+The parent process memory-maps the bundle (edges, titles, metric columns),
+builds the transpose, the title index and the per-metric rankings, binds the
+listening socket and then forks WORKERS children. The children share all of
+it: the mapped files through the page cache and the rest copy-on-write (gc is
+frozen before the fork so refcount updates don't un-share the title index).
+Each child runs an asyncio loop on the shared socket, with at most
+MAX_INFLIGHT requests in progress and MAX_PENDING waiting (503 beyond that).
+
+Endpoints (GET, JSON responses; a node is ?title=… or ?id=…):
+  /node?title=…                       id, title, degrees, every stored metric
+  /neighbors?title=…&dir=out|in&limit=100
+  /top?metric=pagerank&k=20           also in_degree / out_degree
+  /distance?from=…&to=…&max_depth=10  directed hop distance (bidirectional BFS)
+  /stats                              graph size, metrics, workers
+  /metrics                            Prometheus text: per-endpoint latency
+                                      histograms summed over all workers
+
+Run:
+  python Serve/QueryServer.py --graph Hewiki_CSR --port 8765 --workers 8
+  curl 'http://127.0.0.1:8765/neighbors?title=ירושלים&limit=10'
+Load test: Bench/QueryLoad.py
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import signal
+import socket
+import asyncio
+import argparse
+import multiprocessing
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import load_graph, read_metric, list_metrics
+from Common.Traversal import expand
+
+# ================= CONFIG =================
+GRAPH_DIR = "Hewiki_CSR"
+HOST = "127.0.0.1"
+PORT = 8765
+WORKERS = os.cpu_count() or 1
+MAX_INFLIGHT = 64          # requests being handled per worker
+MAX_PENDING = 1024         # requests waiting per worker before 503
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+DEFAULT_K = 20
+MAX_K = 10000
+DEFAULT_DEPTH = 10
+MAX_DEPTH = 50
+BACKLOG = 1024
+# latency histogram bucket upper bounds, seconds (Prometheus "le")
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# =========================================
+
+ENDPOINTS = ("/node", "/neighbors", "/top", "/distance", "/stats", "/metrics", "other")
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ================= SNAPSHOT =================
+
+class Snapshot:
+    """Everything the workers read, loaded once in the parent before forking."""
+
+    def __init__(self, path):
+        self.path = path
+        self.G = load_graph(path, mmap=True)
+        self.T = self.G.transpose()
+        self.G.titles.lookup("")   # build the title index now, not in every worker
+        self.metrics = {name: read_metric(path, name, mmap=True) for name in list_metrics(path)}
+        self.metrics.setdefault("out_degree", self.G.out_degree())
+        self.metrics.setdefault("in_degree", np.diff(self.T.indptr))
+        self.ranking = {name: np.argsort(-np.asarray(v), kind="stable")
+                        for name, v in self.metrics.items() if len(v) == self.G.n}
+
+    def node(self, q):
+        if "id" in q:
+            try:
+                v = int(q["id"])
+            except ValueError:
+                raise QueryError(400, f"bad id {q['id']!r}")
+            if not 0 <= v < self.G.n:
+                raise QueryError(404, f"no node {v}")
+            return v
+        if "title" in q:
+            v = self.G.titles.lookup(q["title"])
+            if v is None:
+                raise QueryError(404, f"no article titled {q['title']!r}")
+            return v
+        raise QueryError(400, "give ?title= or ?id=")
+
+    def describe(self, v):
+        return {"id": int(v), "title": self.G.title(v)}
+
+
+def _int(q, name, default, high):
+    try:
+        value = int(q.get(name, default))
+    except ValueError:
+        raise QueryError(400, f"bad {name} {q[name]!r}")
+    return max(0, min(value, high))
+
+
+# ================= QUERIES =================
+
+def q_node(snap, q):
+    v = snap.node(q)
+    out = snap.describe(v)
+    out["metrics"] = {name: np.asarray(values[v]).item() for name, values in snap.metrics.items()}
+    return out
+
+
+def q_neighbors(snap, q):
+    v = snap.node(q)
+    direction = q.get("dir", "out")
+    if direction not in ("out", "in"):
+        raise QueryError(400, "dir must be out or in")
+    graph = snap.G if direction == "out" else snap.T
+    nbrs = graph.neighbors(v)
+    limit = _int(q, "limit", DEFAULT_LIMIT, MAX_LIMIT)
+    return {"node": snap.describe(v), "dir": direction, "count": int(len(nbrs)),
+            "neighbors": [snap.describe(u) for u in nbrs[:limit]]}
+
+
+def q_top(snap, q):
+    name = q.get("metric", "pagerank")
+    if name not in snap.ranking:
+        raise QueryError(404, f"no metric {name!r} (have: {', '.join(sorted(snap.ranking))})")
+    values = snap.metrics[name]
+    k = _int(q, "k", DEFAULT_K, MAX_K)
+    return {"metric": name, "top": [dict(snap.describe(v), value=np.asarray(values[v]).item())
+                                    for v in snap.ranking[name][:k]]}
+
+
+def bidirectional_distance(G, T, s, t, max_depth):
+    """Hop distance s -> t, expanding whichever frontier has fewer edges (None if > max_depth)."""
+    if s == t:
+        return 0
+    seen = [np.array([s]), np.array([t])]          # sorted visited ids per side
+    dist = [np.zeros(1, dtype=np.int64)] * 2        # distance of each visited id
+    frontier = [np.array([s]), np.array([t])]
+    depth = [0, 0]
+    graphs = (G, T)
+    while frontier[0].size and frontier[1].size and depth[0] + depth[1] < max_depth:
+        cost = [int((graphs[i].indptr[frontier[i] + 1] - graphs[i].indptr[frontier[i]]).sum()) for i in (0, 1)]
+        side = 0 if cost[0] <= cost[1] else 1
+        nbrs, _ = expand(graphs[side].indptr, graphs[side].indices, frontier[side])
+        nbrs = np.setdiff1d(nbrs, seen[side])
+        depth[side] += 1
+        other = seen[1 - side]
+        pos = np.minimum(np.searchsorted(other, nbrs), len(other) - 1)
+        met = other[pos] == nbrs
+        if met.any():
+            return depth[side] + int(dist[1 - side][pos[met]].min())
+        order = np.argsort(np.concatenate([seen[side], nbrs]), kind="stable")
+        seen[side] = np.concatenate([seen[side], nbrs])[order]
+        dist[side] = np.concatenate([dist[side], np.full(len(nbrs), depth[side])])[order]
+        frontier[side] = nbrs
+    return None
+
+
+def q_distance(snap, q):
+    s = snap.node({"title": q["from"]} if "from" in q else {"id": q.get("from_id", "")})
+    t = snap.node({"title": q["to"]} if "to" in q else {"id": q.get("to_id", "")})
+    max_depth = _int(q, "max_depth", DEFAULT_DEPTH, MAX_DEPTH)
+    d = bidirectional_distance(snap.G, snap.T, s, t, max_depth)
+    return {"from": snap.describe(s), "to": snap.describe(t), "distance": d, "max_depth": max_depth}
+
+
+def q_stats(snap, q):
+    return {"nodes": snap.G.n, "edges": snap.G.m, "metrics": sorted(snap.metrics),
+            "worker_pid": os.getpid()}
+
+
+# cheap lookups run on the loop; BFS goes to a thread so it can't stall the worker
+ROUTES = {
+    "/node": (q_node, False),
+    "/neighbors": (q_neighbors, False),
+    "/top": (q_top, False),
+    "/distance": (q_distance, True),
+    "/stats": (q_stats, False),
+}
+
+
+# ================= LATENCY HISTOGRAMS =================
+
+class Latency:
+    """Per-worker, per-endpoint histograms in one shared array (summed by /metrics)."""
+
+    def __init__(self, workers):
+        self.width = len(BUCKETS) + 3            # buckets, +Inf, sum, count
+        self.workers = workers
+        self.data = multiprocessing.RawArray("d", workers * len(ENDPOINTS) * self.width)
+        self.slot = 0
+
+    def _base(self, worker, endpoint):
+        return (worker * len(ENDPOINTS) + ENDPOINTS.index(endpoint)) * self.width
+
+    def observe(self, endpoint, seconds):
+        base = self._base(self.slot, endpoint)
+        i = next((i for i, b in enumerate(BUCKETS) if seconds <= b), len(BUCKETS))
+        self.data[base + i] += 1
+        self.data[base + len(BUCKETS) + 1] += seconds
+        self.data[base + len(BUCKETS) + 2] += 1
+
+    def prometheus(self):
+        arr = np.frombuffer(self.data, dtype=np.float64).reshape(self.workers, len(ENDPOINTS), self.width)
+        total = arr.sum(axis=0)
+        lines = ["# HELP hewiki_query_seconds Query latency per endpoint.",
+                 "# TYPE hewiki_query_seconds histogram"]
+        for e, endpoint in enumerate(ENDPOINTS):
+            counts = np.cumsum(total[e, :len(BUCKETS) + 1])
+            for b, c in zip(BUCKETS + ("+Inf",), counts):
+                lines.append(f'hewiki_query_seconds_bucket{{endpoint="{endpoint}",le="{b}"}} {int(c)}')
+            lines.append(f'hewiki_query_seconds_sum{{endpoint="{endpoint}"}} {total[e, -2]:.6f}')
+            lines.append(f'hewiki_query_seconds_count{{endpoint="{endpoint}"}} {int(total[e, -1])}')
+        return "\n".join(lines) + "\n"
+
+
+# ================= HTTP =================
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def http_response(status, body, content_type="application/json; charset=utf-8", keep_alive=True):
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("latin-1") + body
+
+
+class Worker:
+    def __init__(self, snap, latency):
+        self.snap = snap
+        self.latency = latency
+        self.inflight = None
+        self.pending = 0
+
+    async def dispatch(self, method, target):
+        """-> (endpoint name, status, body bytes, content type)"""
+        url = urlsplit(target)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/metrics":
+            return "/metrics", 200, self.latency.prometheus().encode(), "text/plain; version=0.0.4"
+        route = ROUTES.get(url.path)
+        endpoint = url.path if route else "other"
+        try:
+            if method != "GET":
+                raise QueryError(405, "GET only")
+            if route is None:
+                raise QueryError(404, f"no endpoint {url.path}")
+            fn, blocking = route
+            if blocking:
+                result = await asyncio.get_running_loop().run_in_executor(None, fn, self.snap, q)
+            else:
+                result = fn(self.snap, q)
+            status = 200
+        except QueryError as e:
+            status, result = e.status, {"error": str(e)}
+        except Exception as e:   # a bad query must not take the worker down
+            status, result = 500, {"error": f"{type(e).__name__}: {e}"}
+        return endpoint, status, json.dumps(result, ensure_ascii=False).encode("utf-8"), \
+            "application/json; charset=utf-8"
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                if len(parts) != 3:
+                    writer.write(http_response(400, b'{"error": "bad request line"}', keep_alive=False))
+                    break
+                method, target, version = parts
+                if int(headers.get("content-length", 0) or 0):
+                    await reader.readexactly(int(headers["content-length"]))
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                t0 = time.perf_counter()
+                if self.pending >= MAX_PENDING:
+                    endpoint, status = "other", 503
+                    body, ctype = b'{"error": "overloaded"}', "application/json; charset=utf-8"
+                else:
+                    self.pending += 1
+                    try:
+                        async with self.inflight:
+                            endpoint, status, body, ctype = await self.dispatch(method, target)
+                    finally:
+                        self.pending -= 1
+                self.latency.observe(endpoint, time.perf_counter() - t0)
+
+                writer.write(http_response(status, body, ctype, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, sock):
+        self.inflight = asyncio.Semaphore(MAX_INFLIGHT)
+        server = await asyncio.start_server(self.handle, sock=sock, backlog=BACKLOG)
+        async with server:
+            await server.serve_forever()
+
+
+# ================= PROCESSES =================
+
+def bind(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(BACKLOG)
+    sock.setblocking(False)
+    return sock
+
+
+def run_worker(snap, latency, slot, sock):
+    latency.slot = slot
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    asyncio.run(Worker(snap, latency).serve(sock))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="HTTP/JSON queries over a memory-mapped CSR bundle")
+    ap.add_argument("--graph", default=GRAPH_DIR)
+    ap.add_argument("--host", default=HOST)
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    args = ap.parse_args()
+
+    t0 = time.time()
+    snap = Snapshot(args.graph)
+    print(f"Loaded {args.graph}: {snap.G.n:,} nodes, {snap.G.m:,} edges, "
+          f"metrics: {', '.join(sorted(snap.metrics))} ({time.time() - t0:.1f}s)")
+    sock = bind(args.host, args.port)
+    workers = args.workers if hasattr(os, "fork") else 1
+    latency = Latency(workers)
+    print(f"Serving on http://{args.host}:{args.port} with {workers} worker(s)", flush=True)
+
+    if workers == 1:
+        asyncio.run(Worker(snap, latency).serve(sock))
+        return
+
+    gc.freeze()
+    children = []
+    for slot in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(snap, latency, slot, sock)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+if __name__ == "__main__":
+    main()
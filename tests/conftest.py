@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Common.GraphStore import CSRGraph, csr_from_edges
+
+
+def random_graph(n, m, seed, loops=True):
+    """CSRGraph with m random arcs (duplicates merged), some reciprocal, optionally self loops."""
+    rng = np.random.default_rng(seed)
+    src = rng.integers(0, n, m)
+    dst = rng.integers(0, n, m)
+    back = rng.random(m) < 0.3
+    src, dst = np.concatenate([src, dst[back]]), np.concatenate([dst, src[back]])
+    if not loops:
+        src, dst = src[src != dst], dst[src != dst]
+    indptr, indices = csr_from_edges(src, dst, n)
+    return CSRGraph(indptr, indices, titles=[f"T{v}" for v in range(n)])
+
+
+@pytest.fixture(params=[0, 1, 2])
+def graph(request):
+    return random_graph(60, 240, request.param)
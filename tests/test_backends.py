@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from Bench.BackendCheck import TOLERANCE, params_for, difference
+from Common.Backends import GraphSource, IMPLEMENTATIONS, IG_SOURCE_BATCH, compute, backends_for
+
+
+@pytest.mark.parametrize("metric", sorted(IMPLEMENTATIONS))
+def test_backends_agree(graph, metric):
+    src = GraphSource("random", csr=graph)
+    sources = np.arange(0, graph.n, 3)
+    within = compute("largest_component", "native", src)
+    params = params_for(metric, src, sources, within)
+    backends = backends_for(metric)
+    reference = compute(metric, backends[0], src, **params)
+    for b in backends[1:]:
+        assert difference(compute(metric, b, src, **params), reference) <= TOLERANCE.get(metric, 1e-6), b
+
+
+def test_distance_histogram_batches(graph):
+    src = GraphSource("random", csr=graph)
+    sources = np.arange(graph.n)           # more than one IG_SOURCE_BATCH
+    assert len(sources) > IG_SOURCE_BATCH
+    within = np.arange(graph.n) % 2 == 0
+    native = compute("distance_histogram", "native", src, sources=sources, within=within)
+    assert np.array_equal(compute("distance_histogram", "igraph", src, sources=sources, within=within), native)
+
+
+def test_restrict_is_induced_subgraph(graph):
+    keep = np.arange(graph.n) % 4 != 1
+    sub = GraphSource("random", csr=graph).restrict(keep)
+    A = graph.to_scipy().toarray()
+    assert np.array_equal(sub.csr().to_scipy().toarray(), A[np.ix_(keep, keep)])
+
+
+@pytest.mark.parametrize("metric", sorted(IMPLEMENTATIONS))
+def test_numba_is_a_separate_kernel(metric):
+    impls = IMPLEMENTATIONS[metric]
+    if "numba" in impls:
+        assert impls["numba"] is not impls.get("native")
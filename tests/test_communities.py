@@ -0,0 +1,58 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from Analysis.Communities import (label_propagation, louvain, modularity, category_contingency,
+                                  compact)
+from Common.GraphStore import CSRGraph, csr_from_edges
+
+
+def planted(seed, blocks=4, size=30, p_in=0.3, p_out=0.01):
+    """Symmetrized planted-partition graph and its block of each node."""
+    rng = np.random.default_rng(seed)
+    n = blocks * size
+    block = np.repeat(np.arange(blocks), size)
+    p = np.where(block[:, None] == block[None, :], p_in, p_out)
+    src, dst = np.nonzero(np.triu(rng.random((n, n)) < p, k=1))
+    indptr, indices = csr_from_edges(src, dst, n)
+    return CSRGraph(indptr, indices).symmetrized(), block
+
+
+def same_partition(a, b):
+    return len(np.unique(a)) == len(np.unique(b)) == len(np.unique(a * (b.max() + 1) + b))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_louvain_recovers_blocks(seed):
+    U, block = planted(seed)
+    comm = louvain(U, seed=seed)
+    assert same_partition(comm, block)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_modularity_matches_networkx(seed):
+    U, block = planted(seed)
+    comm = louvain(U, seed=seed)
+    A = U.to_scipy()
+    G = nx.from_scipy_sparse_array(A)
+    groups = [set(np.flatnonzero(comm == c).tolist()) for c in range(comm.max() + 1)]
+    assert modularity(A, comm) == pytest.approx(nx.community.modularity(G, groups))
+    assert modularity(A, block) == pytest.approx(
+        nx.community.modularity(G, [set(np.flatnonzero(block == b).tolist()) for b in range(4)]))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_label_propagation_stays_inside_blocks(seed):
+    U, block = planted(seed)
+    comm = label_propagation(U, workers=2, seed=seed)
+    assert np.array_equal(comm, compact(comm))
+    # every LPA community lies within one planted block
+    assert same_partition(comm, comm * (block.max() + 1) + block)
+
+
+def test_category_contingency():
+    comm = np.array([0, 0, 1, 1, 2])
+    cat_indptr = np.array([0, 2, 3, 3, 5, 6])
+    cat_indices = np.array([0, 1, 1, 0, 2, 2])
+    T = category_contingency(comm, cat_indptr, cat_indices, 3).toarray()
+    assert T.tolist() == [[1, 2, 0], [1, 0, 1], [0, 0, 1]]
@@ -0,0 +1,62 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from Common.Backends import GraphSource, compute, open_graph
+from Common.Cores import MODES, ENGINES, core_numbers
+from Common.GraphStore import save_graph, write_metric
+
+
+def brute_force(G, mode):
+    """Coreness by repeatedly deleting every node below k, for k = 1, 2, …"""
+    A = G.to_scipy().toarray() > 0
+    np.fill_diagonal(A, False)
+    core = np.zeros(G.n, dtype=np.int64)
+    alive = np.ones(G.n, dtype=bool)
+    k = 0
+    while alive.any():
+        k += 1
+        while True:
+            sub = A & alive[:, None] & alive[None, :]
+            deg = {"total": sub.sum(0) + sub.sum(1), "in": sub.sum(0), "out": sub.sum(1)}[mode]
+            drop = alive & (deg < k)
+            if not drop.any():
+                break
+            alive &= ~drop
+        core[alive] = k
+    return core
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("mode", MODES)
+def test_engines_match_brute_force(graph, engine, mode):
+    assert np.array_equal(core_numbers(graph.indptr, graph.indices, mode, engine=engine),
+                          brute_force(graph, mode))
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_matches_networkx_and_igraph(graph, mode):
+    src = GraphSource("random", csr=graph)
+    native = compute("core_number", "native", src, mode=mode)
+    assert np.array_equal(compute("core_number", "igraph", src, mode=mode), native)
+    if mode == "total":
+        H = nx.DiGraph(list(zip(graph.sources().tolist(), graph.indices.tolist())))
+        H.add_nodes_from(range(graph.n))
+        H.remove_edges_from(nx.selfloop_edges(H))
+        ref = nx.core_number(H)
+        assert np.array_equal(native, [ref[v] for v in range(graph.n)])
+
+
+def test_open_graph_restricts_to_kcore(tmp_path, graph):
+    path = str(tmp_path / "bundle")
+    save_graph(path, graph)
+    core = core_numbers(graph.indptr, graph.indices)
+    write_metric(path, "core_total", core)
+    k = int(core.max())
+    src = open_graph(path, kcore=k)
+    keep = core >= k
+    assert np.array_equal(src.csr().ids, np.nonzero(keep)[0])
+    A = graph.to_scipy().toarray()
+    assert np.array_equal(src.csr().to_scipy().toarray(), A[np.ix_(keep, keep)])
+    with pytest.raises(ValueError):
+        open_graph(path, kcore=k + 1)
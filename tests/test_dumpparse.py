@@ -0,0 +1,44 @@
+from Common.DumpParse import (extract_links, extract_categories_from_text, normalize_title, scan_page,
+                              category_name)
+
+
+def test_normalize_title():
+    assert normalize_title(" foo_bar  baz ") == "Foo bar baz"
+    assert normalize_title("") == ""
+
+
+def test_scan_page_links_and_counts():
+    text = "[[foo_bar]] and [[Foo bar|label]] then [[Baz#section]] [[#anchor]] [[foo bar]]"
+    links, cats = scan_page(text)
+    assert links == {"Foo bar": 3, "Baz": 1}
+    assert list(links) == ["Foo bar", "Baz"]
+    assert cats == []
+
+
+def test_scan_page_categories():
+    text = ("[[Category:B]] [[קטגוריה:A]] [[category : b]] [[:Category:C]] "
+            "[[Category:B|sort key]] [[x]]")
+    links, cats = scan_page(text)
+    assert cats == ["B", "A"]
+    assert links == {"Category:C": 1, "X": 1}
+
+
+def test_scan_page_skips_comments_and_nowiki():
+    text = "[[a]] <!-- [[b]] --> <NoWiki>[[c]]</nowiki> <nowiki/>[[d]] <!-- [[e]]"
+    assert scan_page(text) == ({"A": 1, "D": 1}, [])
+
+
+def test_same_targets_as_regex_pair_on_plain_text():
+    text = "[[Alpha]] [[Beta|b]] [[Category:Gamma]] [[Alpha]]"
+    links, cats = scan_page(text)
+    assert set(links) | {"Category:" + c for c in cats} == set(extract_links(text))
+    assert cats == extract_categories_from_text(text)
+
+
+def test_category_name_matches_scan_page():
+    assert category_name("Category:foo_bar") == "Foo bar"
+    assert category_name("קטגוריה: שם  ארוך") == "שם ארוך"
+    assert category_name("Talk:foo") is None
+    assert category_name("foo") is None
+    _, cats = scan_page("[[category:foo_bar]] [[Category: Foo bar|x]]")
+    assert cats == [category_name("CATEGORY:foo bar")]
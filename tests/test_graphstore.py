@@ -0,0 +1,56 @@
+import numpy as np
+
+from Common.GraphStore import (CSRGraph, csr_from_edges, save_graph, load_graph,
+                               write_metric, read_metric, list_metrics)
+
+
+def test_csr_rows_sorted_and_deduped():
+    src = [2, 0, 2, 0, 1, 2]
+    dst = [1, 2, 1, 1, 1, 0]
+    indptr, indices = csr_from_edges(src, dst, 3)
+    assert indptr.tolist() == [0, 2, 3, 5]
+    assert indices.tolist() == [1, 2, 1, 0, 1]
+
+
+def test_csr_keeps_duplicates_without_dedupe():
+    indptr, indices = csr_from_edges([1, 1, 0], [0, 0, 1], 2, dedupe=False)
+    assert indptr.tolist() == [0, 1, 3]
+    assert indices.tolist() == [1, 0, 0]
+
+
+def test_csr_weights_summed_on_dedupe():
+    indptr, indices, w = csr_from_edges([0, 0, 1, 0], [1, 1, 0, 2], 3, weights=[2, 3, 1, 1])
+    assert indices.tolist() == [1, 2, 0]
+    assert w.tolist() == [5, 1, 1]
+
+
+def test_degrees_transpose_symmetrized(graph):
+    A = graph.to_scipy().toarray()
+    assert np.array_equal(graph.out_degree(), A.sum(axis=1))
+    assert np.array_equal(graph.in_degree(), A.sum(axis=0))
+    assert np.array_equal(graph.transpose().to_scipy().toarray(), A.T)
+    U = graph.symmetrized().to_scipy().toarray()
+    expected = ((A + A.T) > 0).astype(float)
+    np.fill_diagonal(expected, 0)
+    assert np.array_equal(U, expected)
+
+
+def test_subgraph_maps_back(graph):
+    keep = np.arange(graph.n) % 3 != 0
+    H = graph.subgraph(keep)
+    A = graph.to_scipy().toarray()
+    assert np.array_equal(H.to_scipy().toarray(), A[np.ix_(keep, keep)])
+    assert [H.title(v) for v in range(H.n)] == [graph.title(v) for v in H.ids]
+
+
+def test_bundle_and_metric_round_trip(tmp_path, graph):
+    path = str(tmp_path / "bundle")
+    save_graph(path, graph)
+    G = load_graph(path, mmap=True)
+    assert np.array_equal(G.indptr, graph.indptr)
+    assert np.array_equal(G.indices, graph.indices)
+    assert list(G.titles) == list(graph.titles)
+    values = np.linspace(0, 1, graph.n)
+    write_metric(path, "score", values)
+    assert list_metrics(path) == ["score"]
+    assert np.array_equal(read_metric(path, "score"), values)
@@ -0,0 +1,91 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import Analysis.IncrementalCentrality as inc
+from Analysis.IncrementalCentrality import (pagerank_full, katz_full, align_nodes, edge_diff,
+                                            update_degrees, incremental_pagerank, incremental_katz,
+                                            write_full)
+from Common.GraphStore import CSRGraph, csr_from_edges, save_graph, list_metrics, load_meta
+
+
+def snapshots(seed, n=400, m=2400, changes=60):
+    """Two versions of a graph: some links added and removed, two pages gone, one new page."""
+    rng = np.random.default_rng(seed)
+    src, dst = rng.integers(0, n, m), rng.integers(0, n, m)
+    ip, ix = csr_from_edges(src, dst, n)
+    old = CSRGraph(ip, ix, titles=[f"T{v}" for v in range(n)])
+
+    keep = np.ones(m, dtype=bool)
+    keep[rng.choice(m, changes, replace=False)] = False
+    src2 = np.concatenate([src[keep], rng.integers(0, n + 1, changes)])
+    dst2 = np.concatenate([dst[keep], rng.integers(0, n + 1, changes)])
+    gone = {3, 17}
+    alive = ~np.isin(src2, list(gone)) & ~np.isin(dst2, list(gone))
+    titles = [f"T{v}" for v in range(n + 1) if v not in gone]
+    remap = np.full(n + 1, -1)
+    remap[[v for v in range(n + 1) if v not in gone]] = np.arange(len(titles))
+    ip, ix = csr_from_edges(remap[src2[alive]], remap[dst2[alive]], len(titles))
+    return old, CSRGraph(ip, ix, titles=titles)
+
+
+def test_pagerank_full_matches_networkx():
+    G, _ = snapshots(0)
+    H = nx.DiGraph(list(zip(G.sources().tolist(), G.indices.tolist())))
+    H.add_nodes_from(range(G.n))
+    ref = nx.pagerank(H, alpha=0.85, tol=1e-12, max_iter=1000)
+    assert np.allclose(pagerank_full(G), [ref[v] for v in range(G.n)], atol=1e-9)
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_incremental_matches_full(seed):
+    old, new = snapshots(seed)
+    old_to_new = align_nodes(old.titles, new.titles)
+    diff = edge_diff(old, new, old_to_new)
+
+    in_deg, out_deg = update_degrees(old.in_degree(), old.out_degree(), new.n, old_to_new, diff)
+    assert np.array_equal(in_deg, new.in_degree())
+    assert np.array_equal(out_deg, new.out_degree())
+
+    pr, _ = incremental_pagerank(old, new, pagerank_full(old), old_to_new, diff)
+    exact = pagerank_full(new)
+    assert np.abs(pr - exact).sum() / exact.sum() < 1e-4
+
+    katz, _ = incremental_katz(old, new, katz_full(old, alpha=0.05), old_to_new, diff, alpha=0.05)
+    exact = katz_full(new, alpha=0.05)
+    assert np.abs(katz - exact).sum() / np.abs(exact).sum() < 1e-4
+
+
+def test_katz_divergence_detected_early():
+    G, _ = snapshots(0)
+    with pytest.raises(RuntimeError, match="diverges"):
+        katz_full(G, alpha=0.5, max_iter=100_000)
+
+
+def run_main(monkeypatch, *argv):
+    monkeypatch.setattr("sys.argv", ["IncrementalCentrality.py", *argv])
+    inc.main()
+
+
+def test_full_writes_nothing_when_katz_diverges(tmp_path):
+    G, _ = snapshots(0)
+    save_graph(str(tmp_path), G)
+    with pytest.raises(RuntimeError):
+        write_full(str(tmp_path), katz_alpha=0.5)
+    assert list_metrics(str(tmp_path)) == []
+    assert "centrality" not in load_meta(str(tmp_path))
+
+
+def test_update_refuses_other_alphas(tmp_path, monkeypatch):
+    old, new = snapshots(1)
+    a, b = str(tmp_path / "a"), str(tmp_path / "b")
+    save_graph(a, old)
+    save_graph(b, new)
+    run_main(monkeypatch, "--full", a, "--katz-alpha", "0.05")
+    assert load_meta(a)["centrality"] == {"pagerank_alpha": 0.85, "katz_alpha": 0.05}
+    with pytest.raises(SystemExit, match="computed with"):
+        run_main(monkeypatch, "--old", a, "--new", b, "--katz-alpha", "0.04")
+    assert list_metrics(b) == []
+    run_main(monkeypatch, "--old", a, "--new", b, "--katz-alpha", "0.05", "--check")
+    assert load_meta(b)["centrality"] == load_meta(a)["centrality"]
+    assert set(list_metrics(b)) == {"in_degree", "out_degree", "pagerank", "katz"}
@@ -0,0 +1,64 @@
+import json
+import os
+import threading
+import time
+
+from Common.Instrument import Monitor, fmt_seconds
+
+
+def test_monitor_logs_stages(tmp_path):
+    jsonl, prom = str(tmp_path / "run.jsonl"), str(tmp_path / "run.prom")
+    mon = Monitor("job", jsonl_path=jsonl, prom_path=prom, interval=60, quiet=True)
+    with mon.stage("load", total=10, unit="pages") as st:
+        st.count("pages", 4)
+        with st.time("parse"):
+            pass
+    mon.close()
+    events = [json.loads(line) for line in open(jsonl, encoding="utf-8")]
+    assert [e["event"] for e in events] == ["stage_start", "stage_end"]
+    assert events[-1]["counters"] == {"pages": 4} and "parse" in events[-1]["timers"]
+    text = open(prom, encoding="utf-8").read()
+    assert 'hewiki_counter_total{job="job",stage="load",counter="pages"} 4' in text
+
+
+def test_prom_labels_escaped_once(tmp_path):
+    prom = str(tmp_path / "run.prom")
+    mon = Monitor('a\\b"c', prom_path=prom, interval=60, quiet=True)
+    with mon.stage("load"):
+        pass
+    mon.close()
+    text = open(prom, encoding="utf-8").read()
+    assert 'hewiki_rss_bytes{job="a\\\\b\\"c"}' in text
+
+
+def test_eta_capped_by_deadline(tmp_path):
+    mon = Monitor("job", interval=60, quiet=True)
+    with mon.stage("slow", total=1_000_000, unit="items", deadline=time.time() + 30) as st:
+        time.sleep(0.01)
+        st.count("items")
+        with mon.lock:
+            eta = st.snapshot()["eta"]
+    mon.close()
+    assert 0 <= eta <= 30
+
+
+def test_concurrent_prom_writes(tmp_path):
+    prom = str(tmp_path / "run.prom")
+    mon = Monitor("job", prom_path=prom, interval=60, quiet=True)
+    with mon.stage("s") as st:
+        def write():
+            for _ in range(50):
+                st.count("n")
+                mon._write_prom()
+        threads = [threading.Thread(target=write) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    mon.close()
+    assert os.listdir(tmp_path) == ["run.prom"]
+
+
+def test_fmt_seconds():
+    assert fmt_seconds(3725) == "01:02:05"
+    assert fmt_seconds(None) == "?"
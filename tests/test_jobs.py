@@ -0,0 +1,106 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import Common.Jobs as jobs
+from Common.Backends import compute
+from Common.GraphStore import save_graph
+from Common.Jobs import (JobError, create_job, load_job, open_job_graph, shard_sources, checkpoint_path,
+                         load_checkpoint, run_shard, merge)
+from conftest import random_graph
+
+SHARDS = 3
+
+
+@pytest.fixture
+def job(tmp_path):
+    graph = str(tmp_path / "bundle")
+    save_graph(graph, random_graph(80, 400, 7))
+    job_dir = str(tmp_path / "job")
+    create_job(job_dir, graph, shards=SHARDS, samples=30)
+    return job_dir, load_job(job_dir), open_job_graph(load_job(job_dir))
+
+
+def full(src, metric, job_dir):
+    params = {"within": np.load(os.path.join(job_dir, "within.npy"))} if metric == "distance_histogram" else {}
+    sources = np.load(os.path.join(job_dir, f"sources_{metric}.npy"))
+    return np.asarray(compute(metric, "native", src, sources=sources, **params))
+
+
+def test_interrupted_shard_resumes(job, monkeypatch):
+    job_dir, spec, src = job
+    monkeypatch.setattr(jobs, "SOURCE_BATCH", 4)
+    calls = []
+
+    def flaky(metric, backend, src, sources, **params):
+        calls.append(len(sources))
+        if len(calls) == 3:
+            raise KeyboardInterrupt
+        return compute(metric, backend, src, sources=sources, **params)
+
+    monkeypatch.setattr(jobs, "compute", flaky)
+    with pytest.raises(KeyboardInterrupt):
+        run_shard(job_dir, spec, src, "harmonic", 0, "native")
+    sources = np.asarray(shard_sources(job_dir, spec, "harmonic", 0))
+    accum, done = load_checkpoint(checkpoint_path(job_dir, "harmonic", 0), sources)
+    assert done == 8
+    assert np.allclose(accum, compute("harmonic", "native", src, sources=sources[:8]))
+    assert not os.path.exists(checkpoint_path(job_dir, "harmonic", 0)[:-4] + ".lock")
+
+    assert run_shard(job_dir, spec, src, "harmonic", 0, "native") == (len(sources), len(sources))
+    accum, done = load_checkpoint(checkpoint_path(job_dir, "harmonic", 0), sources)
+    assert np.allclose(accum, compute("harmonic", "native", src, sources=sources))
+
+
+def test_merge_across_hosts(job, tmp_path):
+    job_dir, spec, src = job
+    other = str(tmp_path / "host2")
+    os.makedirs(other)
+    for f in os.listdir(job_dir):
+        if os.path.isfile(os.path.join(job_dir, f)):
+            shutil.copy(os.path.join(job_dir, f), other)
+    for metric in spec["metrics"]:
+        for k in range(SHARDS):
+            run_shard(job_dir if k % 2 == 0 else other, spec, src, metric, k, "native")
+        accum, done, total, complete = merge([job_dir, other], metric)
+        assert done == total and complete == SHARDS
+        expected = full(src, metric, job_dir)
+        n = max(len(accum), len(expected))
+        assert np.allclose(np.pad(accum, (0, n - len(accum))), np.pad(expected, (0, n - len(expected))))
+
+
+def test_partial_merge_and_deadline(job):
+    job_dir, spec, src = job
+    assert run_shard(job_dir, spec, src, "betweenness", 1, "native", deadline=0) is not None
+    accum, done, total, complete = merge([job_dir], "betweenness")
+    assert accum is None and done == 0 and complete == 0
+    run_shard(job_dir, spec, src, "betweenness", 1, "native")
+    _, done, total, complete = merge([job_dir], "betweenness")
+    assert done == len(shard_sources(job_dir, spec, "betweenness", 1)) < total and complete == 1
+
+
+def test_checkpoint_of_other_sources_refused(job):
+    job_dir, spec, src = job
+    run_shard(job_dir, spec, src, "harmonic", 0, "native")
+    with pytest.raises(JobError):
+        load_checkpoint(checkpoint_path(job_dir, "harmonic", 0), np.arange(5))
+
+
+def test_locked_shard_skipped(job):
+    job_dir, spec, src = job
+    lock = checkpoint_path(job_dir, "harmonic", 2)[:-4] + ".lock"
+    os.makedirs(os.path.dirname(lock), exist_ok=True)
+    open(lock, "w").close()
+    assert run_shard(job_dir, spec, src, "harmonic", 2, "native") is None
+    assert run_shard(job_dir, spec, src, "harmonic", 2, "native", steal_locks=True) is not None
+
+
+def test_graph_must_match_job(job, tmp_path):
+    _, spec, _ = job
+    other = str(tmp_path / "other")
+    save_graph(other, random_graph(50, 100, 1))
+    with pytest.raises(JobError):
+        open_job_graph(spec, other)
+    assert open_job_graph(spec, spec["graph"]).n == spec["nodes"]
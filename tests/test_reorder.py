@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import breadth_first_order
+
+from Build.Reorder import (METHODS, compute_order, apply_order, inverse_permutation,
+                           order_bfs, reorder_bundle)
+from Common.GraphStore import save_graph, load_graph, write_metric, read_metric
+from conftest import random_graph
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_permutation_round_trip(graph, method):
+    order = compute_order(graph, method)
+    assert np.array_equal(np.sort(order), np.arange(graph.n))
+    H, inv = apply_order(graph, order)
+    A, B = graph.to_scipy().toarray(), H.to_scipy().toarray()
+    assert np.array_equal(B, A[np.ix_(order, order)])
+    assert [H.title(v) for v in range(H.n)] == [graph.title(int(v)) for v in order]
+    back, _ = apply_order(H, inv)
+    assert np.array_equal(back.indptr, graph.indptr)
+    assert np.array_equal(back.indices, graph.indices)
+    assert np.array_equal(inverse_permutation(inv), order)
+
+
+def test_bfs_matches_one_search_per_component():
+    G = random_graph(3000, 500, 5)       # mostly isolated nodes and small components
+    U = G.symmetrized().to_scipy()
+    seen = np.zeros(G.n, dtype=bool)
+    parts = []
+    for root in np.argsort(-np.diff(U.indptr), kind="stable"):
+        if not seen[root]:
+            part = breadth_first_order(U, root, directed=False, return_predecessors=False)
+            seen[part] = True
+            parts.append(part)
+    assert np.array_equal(order_bfs(G), np.concatenate(parts))
+
+
+def test_reorder_bundle_composes_node_order(tmp_path, graph):
+    src = str(tmp_path / "a")
+    save_graph(src, graph)
+    values = np.arange(graph.n, dtype=np.float64)
+    write_metric(src, "id", values)
+    reorder_bundle(src, str(tmp_path / "b"), "degree")
+    reorder_bundle(str(tmp_path / "b"), str(tmp_path / "c"), "bfs")
+    C = load_graph(str(tmp_path / "c"))
+    order = np.load(tmp_path / "c" / "node_order.npy")
+    assert np.array_equal(read_metric(str(tmp_path / "c"), "id"), values[order])
+    A = graph.to_scipy().toarray()
+    assert np.array_equal(C.to_scipy().toarray(), A[np.ix_(order, order)])
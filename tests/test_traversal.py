@@ -0,0 +1,27 @@
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+from Common.Traversal import expand, frontier_chunks, bfs_levels
+
+
+def test_expand(graph):
+    nodes = np.array([5, 0, 5, 17])
+    nbrs, owner = expand(graph.indptr, graph.indices, nodes)
+    assert nbrs.tolist() == [int(u) for v in nodes for u in graph.neighbors(v)]
+    assert owner.tolist() == [int(v) for v in nodes for _ in graph.neighbors(v)]
+
+
+def test_frontier_chunks_cover_nodes(graph):
+    nodes = np.arange(0, graph.n, 2)
+    chunks = frontier_chunks(graph.indptr, nodes, 10)
+    assert np.array_equal(np.concatenate(chunks), nodes)
+
+
+def test_bfs_levels_match_shortest_paths(graph):
+    D = shortest_path(graph.to_scipy(), unweighted=True)
+    for s in (0, 7, 31):
+        expected = np.where(np.isinf(D[s]), -1, D[s]).astype(np.int64)
+        assert np.array_equal(bfs_levels(graph.indptr, graph.indices, s), expected)
+        assert np.array_equal(bfs_levels(graph.indptr, graph.indices, s, block_edges=5), expected)
+        capped = bfs_levels(graph.indptr, graph.indices, s, max_depth=2)
+        assert np.array_equal(capped, np.where(expected <= 2, expected, -1))
@@ -0,0 +1,39 @@
+from itertools import combinations
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from Common.Backends import GraphSource, compute
+from Common.Triads import TRIAD_NAMES, TRICODE_TYPES, ENGINES, triad_census
+
+
+def brute_force(G):
+    """Per-node counts of every type, from all C(n, 3) triples (self loops ignored)."""
+    A = G.to_scipy().toarray() > 0
+    np.fill_diagonal(A, False)
+    counts = np.zeros((16, G.n), dtype=np.int64)
+    for v, u, w in combinations(range(G.n), 3):
+        code = (A[v, u] + 2 * A[u, v] + 4 * A[v, w] + 8 * A[w, v] + 16 * A[u, w] + 32 * A[w, u])
+        counts[TRICODE_TYPES[code], [v, u, w]] += 1
+    return counts
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+def test_census_matches_networkx_and_brute_force(graph, engine):
+    census, per_node = triad_census(graph.indptr, graph.indices, engine, per_node=True)
+    H = nx.DiGraph(list(zip(graph.sources().tolist(), graph.indices.tolist())))
+    H.add_nodes_from(range(graph.n))
+    H.remove_edges_from(nx.selfloop_edges(H))
+    ref = nx.triadic_census(H)
+    assert census == [ref[name] for name in TRIAD_NAMES]
+    expected = brute_force(graph)
+    assert np.array_equal(expected.sum(axis=1) // 3, census)
+    connected = list(range(3, 16))
+    assert np.array_equal(per_node[connected], expected[connected])
+
+
+def test_backends_agree(graph):
+    src = GraphSource("random", csr=graph)
+    native = compute("triad_census", "native", src)
+    assert np.array_equal(compute("triad_census", "igraph", src), native)
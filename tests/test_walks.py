@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from Common.Walks import edge_keys, has_edges, walk_batch
+
+
+def test_has_edges(graph):
+    keys = edge_keys(graph.indptr, graph.indices)
+    A = graph.to_scipy().toarray() > 0
+    src, dst = np.nonzero(np.ones_like(A))
+    assert np.array_equal(has_edges(keys, graph.n, src, dst), A[src, dst])
+
+
+@pytest.mark.parametrize("p, q, restart", [(1.0, 1.0, 0.0), (0.5, 2.0, 0.0), (1.0, 1.0, 0.2)])
+def test_walks_follow_edges_and_repeat(graph, p, q, restart):
+    starts = np.arange(graph.n).repeat(3)
+    walks = walk_batch(graph.indptr, graph.indices, starts, 12, np.random.default_rng(4), p, q, restart)
+    again = walk_batch(graph.indptr, graph.indices, starts, 12, np.random.default_rng(4), p, q, restart)
+    assert np.array_equal(walks, again)
+    assert np.array_equal(walks[:, 0], starts)
+    A = graph.to_scipy().toarray() > 0
+    for row, start in zip(walks, starts):
+        steps = row[row >= 0]
+        assert (row[len(steps):] == -1).all()          # a walk only ends at a dead end
+        for a, b in zip(steps[:-1], steps[1:]):
+            assert A[a, b] or (restart and b == start)